@@ -0,0 +1,174 @@
+"""
+Benchmark de un worker frente a la latencia del proveedor: WSGI vs ASGI
+
+Levanta un proveedor falso (API de 1oT) que tarda --latency segundos en
+responder y mide cuántos requests por segundo atiende un solo worker con:
+
+- wsgi: worker sync de gunicorn, un request a la vez (vista sync)
+- asgi + vista sync: Django ejecuta la vista en su hilo thread-sensitive,
+  así que sigue siendo uno a la vez
+- asgi + vista async: create_1ot_esim_async / check_1ot_usage_async con
+  --concurrency requests en vuelo sobre el mismo event loop
+
+Se usan las vistas de 1oT porque las de Twilio dependen del SDK; el patrón
+es el mismo. Se ejecuta en proceso, sin gunicorn ni uvicorn:
+
+    python benchmarks/async_provider_latency.py --latency 0.2 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+
+import django
+
+django.setup()
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.test import AsyncRequestFactory, RequestFactory
+
+from esim_backend import api_1ot_views
+from esim_backend.provider_config import provider_config
+from services.esim_providers import async_http as async_http_module
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """API de 1oT simulada: responde tras la latencia configurada"""
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0.2
+
+    def respond(self, status, payload):
+        time.sleep(self.latency)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.respond(201, {'iccid': '8901000000000000000', 'status': 'active'})
+
+    def do_GET(self):
+        self.respond(200, {'data_used_mb': 120, 'data_limit_mb': 1000})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_provider(latency):
+    FakeProviderHandler.latency = latency
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeProviderHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure(base_url):
+    """Apuntar la configuración de 1oT al proveedor falso, ignorando .env.1ot"""
+    os.environ.update({
+        'IOT_API_KEY': 'benchmark', 'IOT_BASE_URL': base_url, 'IOT_TEST_MODE': 'false',
+    })
+    settings.PROVIDER_CONFIG_DIRS = [tempfile.mkdtemp(prefix='hablaris_providers_')]
+    provider_config.reload()
+
+
+def build_requests(factory, count):
+    payload = json.dumps({'country': 'ES', 'data_plan': '1GB', 'email': 'bench@hablaris.com'})
+    requests_ = []
+    for i in range(count):
+        if i % 2:
+            requests_.append(('usage', factory.get(f'/api/1ot/esim/usage/{i}/'), str(i)))
+        else:
+            requests_.append(('create', factory.post(
+                '/api/1ot/esim/create/', payload, content_type='application/json'), None))
+    return requests_
+
+
+def call(views, kind, request, esim_id):
+    create, usage = views
+    return create(request) if kind == 'create' else usage(request, esim_id)
+
+
+def check(response):
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"Respuesta inesperada {response.status_code}: {response.content[:200]}")
+
+
+def run_wsgi(count):
+    views = (api_1ot_views.create_1ot_esim, api_1ot_views.check_1ot_usage)
+    start = time.perf_counter()
+    for kind, request, esim_id in build_requests(RequestFactory(), count):
+        check(call(views, kind, request, esim_id))
+    return time.perf_counter() - start
+
+
+async def run_asgi(count, concurrency, native):
+    if native:
+        views = (api_1ot_views.create_1ot_esim_async, api_1ot_views.check_1ot_usage_async)
+    else:
+        # Así ejecuta Django una vista sync bajo ASGI
+        views = (
+            sync_to_async(api_1ot_views.create_1ot_esim, thread_sensitive=True),
+            sync_to_async(api_1ot_views.check_1ot_usage, thread_sensitive=True),
+        )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(kind, request, esim_id):
+        async with semaphore:
+            check(await call(views, kind, request, esim_id))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*item) for item in build_requests(AsyncRequestFactory(), count)))
+    elapsed = time.perf_counter() - start
+    await async_http_module.async_http.aclose()
+    return elapsed
+
+
+def report(name, count, elapsed, baseline=None):
+    rps = count / elapsed
+    speedup = f"  ({rps / baseline:.1f}x)" if baseline else ''
+    print(f"📊 {name:<28} {count:>5} requests en {elapsed:6.2f}s → {rps:8.1f} req/s{speedup}")
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.2, help='Segundos que tarda el proveedor')
+    parser.add_argument('--concurrency', type=int, default=50, help='Requests en vuelo por worker ASGI')
+    parser.add_argument('--requests', type=int, default=500, help='Requests del escenario async')
+    parser.add_argument('--sync-requests', type=int, default=20, help='Requests de los escenarios sync')
+    options = parser.parse_args()
+
+    server = start_provider(options.latency)
+    configure(f"http://127.0.0.1:{server.server_address[1]}")
+    transport = 'httpx' if async_http_module.httpx is not None else 'requests en hilos'
+    print(f"⏱️  Proveedor falso con {options.latency * 1000:.0f} ms de latencia; cliente async: {transport}\n")
+
+    try:
+        baseline = report('wsgi (worker sync)', options.sync_requests, run_wsgi(options.sync_requests))
+        report('asgi + vista sync', options.sync_requests,
+               asyncio.run(run_asgi(options.sync_requests, options.concurrency, native=False)), baseline)
+        report(f'asgi + vista async (c={options.concurrency})', options.requests,
+               asyncio.run(run_asgi(options.requests, options.concurrency, native=True)), baseline)
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark de consultas de autenticación por request
+
+Simula a la app móvil consultando un endpoint DRF autenticado, con token y
+con sesión, y cuenta las consultas SQL por request:
+
+- anterior: TokenAuthentication + ModelBackend + sesiones en base de datos
+- cache: CachedTokenAuthentication + CachedModelBackend + sesiones cached_db
+
+Las consultas a la tabla de cache (L2 de TwoTierCache en SQLite) se cuentan
+aparte; con Redis no serían consultas SQL. Usa una base SQLite temporal:
+
+    python benchmarks/auth_queries.py --requests 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp(prefix='hablaris_auth_')}/auth.sqlite3"
+os.environ.pop('REDIS_URL', None)
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+
+class ESimPollView(APIView):
+    """Endpoint mínimo: solo autenticación, sin consultas propias"""
+
+    def get_authenticators(self):
+        # authentication_classes se fija al importar; leerlo en cada escenario
+        return [authentication() for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+    def get(self, request):
+        return Response({'user': request.user.username})
+
+
+urlpatterns = [path('api/esims/', ESimPollView.as_view())]
+
+PREVIOUS = {
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'REST_FRAMEWORK': dict(settings.REST_FRAMEWORK, DEFAULT_AUTHENTICATION_CLASSES=[
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.TokenAuthentication',
+    ]),
+}
+
+
+def poll(client, requests, **headers):
+    client.get('/api/esims/', **headers)  # calentar cache/sesión
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = client.get('/api/esims/', **headers)
+            assert response.status_code == 200, response.content
+        elapsed = time.perf_counter() - start
+    cache_queries = sum('hablaris_cache' in query['sql'] for query in queries.captured_queries)
+    auth_queries = len(queries.captured_queries) - cache_queries
+    return auth_queries / requests, cache_queries / requests, elapsed / requests * 1000
+
+
+def scenario(name, requests, user, token):
+    session_client = Client()
+    session_client.force_login(user)
+    results = {
+        'token': poll(Client(), requests, HTTP_AUTHORIZATION=f'Token {token.key}'),
+        'sesión': poll(session_client, requests),
+    }
+    print(f"📊 {name}")
+    for kind, (auth_queries, cache_queries, ms) in results.items():
+        print(f"   {kind:<7} {auth_queries:4.2f} consultas auth/request + {cache_queries:4.2f} de cache "
+              f"({ms:.2f} ms/request)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='Requests por escenario')
+    options = parser.parse_args()
+
+    call_command('migrate', verbosity=0)
+    call_command('createcachetable', verbosity=0)
+    user = User.objects.create_user('mobile', 'mobile@hablaris.com', 'secret-password')
+    token = Token.objects.create(user=user)
+
+    with override_settings(ROOT_URLCONF=__name__, **PREVIOUS):
+        scenario('Anterior (base de datos)', options.requests, user, token)
+
+    cache.clear()
+    with override_settings(ROOT_URLCONF=__name__):
+        scenario('Autenticación en cache', options.requests, user, token)
+
+
+if __name__ == '__main__':
+    main()
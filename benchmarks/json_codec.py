@@ -0,0 +1,132 @@
+"""
+Benchmark del codec JSON: stdlib vs esim_backend.json_codec
+
+Serializa un catálogo de planes (Decimal, fechas) y una serie de uso grande
+con los encoders anteriores (JsonResponse de Django y JSONRenderer de DRF) y
+con el codec, y parsea el resultado con json.loads y con el codec:
+
+    python benchmarks/json_codec.py --plans 5000 --points 20000
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+
+import django
+
+django.setup()
+
+from django.http import JsonResponse as DjangoJsonResponse
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from esim_backend import json_codec
+from esim_backend.synthetic import PLAN_SIZES, REGIONS
+
+
+def plan_catalog(count):
+    regions = list(REGIONS.values())
+    now = timezone.now()
+    return {
+        'count': count,
+        'results': [
+            {
+                'id': i,
+                'region': {'id': i % len(regions), 'name': regions[i % len(regions)]},
+                'data_gb': PLAN_SIZES[i % len(PLAN_SIZES)][0],
+                'duration_days': 30,
+                'price': Decimal(f'{5 + i % 90}.{i % 100:02d}'),
+                'created_at': now - timedelta(minutes=i),
+                'countries': ['ES', 'FR', 'DE', 'IT', 'PT'][:1 + i % 5],
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def usage_series(points):
+    start = timezone.now() - timedelta(hours=points)
+    return {
+        'sim_sid': 'HS' + '0' * 32,
+        'usage_records': [
+            {
+                'period': start + timedelta(hours=i),
+                'download': 1000000 + i * 37,
+                'upload': 100000 + i * 11,
+                'download_mb': round((1000000 + i * 37) / 1048576, 2),
+                'upload_mb': round((100000 + i * 11) / 1048576, 2),
+            }
+            for i in range(points)
+        ],
+    }
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(name, previous, fast, repeat):
+    previous_time, previous_body = timed(previous, repeat)
+    fast_time, fast_body = timed(fast, repeat)
+    if json.loads(previous_body) != json.loads(fast_body):
+        raise RuntimeError(f"{name}: el codec no produce el mismo JSON")
+    print(f"📊 {name:<34} {previous_time * 1000:8.1f} ms → {fast_time * 1000:7.1f} ms "
+          f"({previous_time / fast_time:.1f}x, {len(previous_body) / 1024:.0f} → {len(fast_body) / 1024:.0f} KiB)")
+
+
+def compare_parse(name, previous, fast, repeat):
+    previous_time, previous_data = timed(previous, repeat)
+    fast_time, fast_data = timed(fast, repeat)
+    if previous_data != fast_data:
+        raise RuntimeError(f"{name}: el codec no produce los mismos datos")
+    print(f"📊 {name:<34} {previous_time * 1000:8.1f} ms → {fast_time * 1000:7.1f} ms "
+          f"({previous_time / fast_time:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--plans', type=int, default=5000, help='Planes en el catálogo')
+    parser.add_argument('--points', type=int, default=20000, help='Registros en la serie de uso')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones (se toma la mejor)')
+    options = parser.parse_args()
+
+    backend = 'orjson' if json_codec.orjson is not None else 'stdlib (orjson no instalado)'
+    print(f"⏱️  Codec: {backend}\n")
+
+    catalog = plan_catalog(options.plans)
+    series = usage_series(options.points)
+
+    compare('JsonResponse catálogo', lambda: DjangoJsonResponse(catalog).content,
+            lambda: json_codec.JsonResponse(catalog).content, options.repeat)
+    compare('JsonResponse serie de uso', lambda: DjangoJsonResponse(series).content,
+            lambda: json_codec.JsonResponse(series).content, options.repeat)
+    compare('DRF renderer catálogo', lambda: JSONRenderer().render(catalog),
+            lambda: json_codec.FastJSONRenderer().render(catalog), options.repeat)
+    compare('DRF renderer serie de uso', lambda: JSONRenderer().render(series),
+            lambda: json_codec.FastJSONRenderer().render(series), options.repeat)
+
+    body = JSONRenderer().render(catalog)
+    compare_parse('json.loads catálogo', lambda: json.loads(body),
+                  lambda: json_codec.loads(body), options.repeat)
+    compare_parse('DRF parser catálogo', lambda: JSONParser().parse(io.BytesIO(body)),
+                  lambda: json_codec.FastJSONParser().parse(io.BytesIO(body)), options.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+"""
+Prueba de carga por escenarios: navegación, cuenta, compra y consumo
+
+Usuarios virtuales llegan según un proceso de Poisson con la tasa del perfil
+(--rate usuarios/s) y cada uno recorre un journey elegido por peso (--mix):
+
+- browse: landing, tienda, shop y acceso a la tienda
+- account: registro y login
+- purchase: login o registro y compra de una eSIM (Twilio en modo test)
+- usage: consulta repetida del consumo de una eSIM comprada
+
+purchase y usage usan rutas de api_urls.py, que no está montado en urls.py:
+medirían solo respuestas 404. Por eso el mix por defecto es browse y, si
+--mix los incluye, se omiten con un aviso salvo con --include-unmounted
+(p. ej. contra un --base-url que sí las sirva).
+
+Es un modelo abierto: si el servidor se satura las llegadas no esperan, se
+acumulan usuarios activos hasta --max-users y a partir de ahí se descartan
+(se informan). Perfiles de llegada (--profile):
+
+- constant: --rate durante toda la prueba
+- ramp: de 0 a --rate en --ramp segundos y se mantiene
+- step: cuatro escalones de --rate/4
+- spike: --rate con un pico de 3x entre el 40% y el 60% de la duración
+
+Sin --base-url levanta un servidor local como en producción (gunicorn -c
+gunicorn.conf.py, o uvicorn si gunicorn no está instalado) con --workers
+workers sobre una base temporal con datos sintéticos, para dimensionar
+WEB_CONCURRENCY antes de una promoción:
+
+    python benchmarks/load_test.py --workers 4 --rate 20 --duration 60 --profile ramp
+    python benchmarks/load_test.py --base-url https://staging.hablaris.com --mix browse=80,usage=20
+    python benchmarks/load_test.py --workers 2 --database-url postgres://localhost/hablaris --json report.json
+
+Con SQLite las escrituras concurrentes se serializan; para cifras de
+capacidad con registro y compra usa --database-url con PostgreSQL.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = 'browse=100'
+# Journeys cuyas rutas (api_urls.py) no están montadas en urls.py
+UNMOUNTED_JOURNEYS = ('purchase', 'usage')
+COUNTRIES = ['ES', 'FR', 'IT', 'DE', 'US', 'MX', 'JP', 'TH', 'BR', 'GB']
+PASSWORD = 'LoadTest-2025!'
+
+
+# ----- Perfiles de llegada -----
+
+def arrival_rate(profile: str, rate: float, elapsed: float, duration: float, ramp: float) -> float:
+    """Usuarios nuevos por segundo en el instante elapsed"""
+    if profile == 'ramp':
+        return rate * min(1.0, elapsed / ramp) if ramp > 0 else rate
+    if profile == 'step':
+        return rate * min(4, math.floor(4 * elapsed / duration) + 1) / 4
+    if profile == 'spike':
+        return rate * 3 if 0.4 * duration <= elapsed < 0.6 * duration else rate
+    return rate
+
+
+# ----- Estadísticas -----
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Stats:
+    """Latencias y resultados por endpoint y por intervalo"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.timeline = defaultdict(list)
+        self.failures = defaultdict(int)
+        self.journeys = defaultdict(int)
+        self.arrivals = 0
+        self.dropped = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def record(self, name: str, status, seconds: float) -> None:
+        self.latencies[name].append(seconds * 1000)
+        self.statuses[name][status] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.failures[name] += 1
+        slot = int((time.perf_counter() - self.started) // self.interval)
+        self.timeline[slot].append(seconds * 1000)
+
+    def user_started(self) -> None:
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                'requests': len(values),
+                'failures': self.failures[name],
+                'rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(values, 0.50), 1),
+                'p90_ms': round(percentile(values, 0.90), 1),
+                'p95_ms': round(percentile(values, 0.95), 1),
+                'p99_ms': round(percentile(values, 0.99), 1),
+                'max_ms': round(values[-1], 1),
+                'statuses': {str(status): count for status, count in self.statuses[name].items()},
+            }
+        everything = sorted(itertools.chain.from_iterable(self.latencies.values()))
+        timeline = []
+        for slot in sorted(self.timeline):
+            values = sorted(self.timeline[slot])
+            timeline.append({
+                'second': slot * self.interval,
+                'rps': round(len(values) / self.interval, 1),
+                'p95_ms': round(percentile(values, 0.95), 1),
+            })
+        return {
+            'duration_s': round(elapsed, 1),
+            'users': {'arrived': self.arrivals, 'dropped': self.dropped, 'peak_active': self.peak_active},
+            'journeys': dict(self.journeys),
+            'total': {
+                'requests': len(everything),
+                'failures': sum(self.failures.values()),
+                'rps': round(len(everything) / elapsed, 2),
+                'p50_ms': round(percentile(everything, 0.50), 1),
+                'p90_ms': round(percentile(everything, 0.90), 1),
+                'p95_ms': round(percentile(everything, 0.95), 1),
+                'p99_ms': round(percentile(everything, 0.99), 1),
+                'max_ms': round(everything[-1], 1) if everything else 0.0,
+            },
+            'endpoints': endpoints,
+            'timeline': timeline,
+        }
+
+
+def print_report(report: dict) -> None:
+    users = report['users']
+    print(f"\n📊 {report['duration_s']}s, {users['arrived']} usuarios "
+          f"({users['dropped']} descartados, pico de {users['peak_active']} activos)")
+    print(f"   Journeys completados: {report['journeys']}")
+    print(f"\n   {'Endpoint':<34} {'reqs':>7} {'fallos':>7} {'req/s':>8} "
+          f"{'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['total'])]
+    for name, row in rows:
+        print(f"   {name:<34} {row['requests']:>7} {row['failures']:>7} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+              f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    print("\n⏱️  Evolución (req/s y p95 en ms por intervalo)")
+    for point in report['timeline']:
+        print(f"   {point['second']:>6.0f}s {point['rps']:>8.1f} req/s  p95 {point['p95_ms']:>8.1f} ms")
+    failing = {name: row['statuses'] for name, row in report['endpoints'].items() if row['failures']}
+    if failing:
+        print(f"\n⚠️  Endpoints con fallos (status: veces): {failing}")
+
+
+# ----- Usuarios virtuales y journeys -----
+
+class VirtualUser:
+    """Un cliente con su propia sesión, IP y tiempos de espera"""
+
+    ip_counter = itertools.count(1)
+
+    def __init__(self, base_url: str, stats: Stats, shared: dict, think: float, timeout: float):
+        number = next(self.ip_counter)
+        # Cada usuario con su IP (NUM_PROXIES=1) para no compartir el throttle de login
+        ip = f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}'
+        self.client = httpx.AsyncClient(
+            base_url=base_url, timeout=timeout, headers={'X-Forwarded-For': ip, 'Accept-Encoding': 'br, gzip'}
+        )
+        self.stats = stats
+        self.shared = shared
+        self.think_time = think
+        self.rng = random.Random(number)
+
+    async def request(self, method: str, url: str, name: str = None, **kwargs):
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+            return None
+        finally:
+            self.stats.record(name or f'{method} {url}', status, time.perf_counter() - start)
+
+    async def think(self):
+        if self.think_time > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+
+    def json(self, response) -> dict:
+        try:
+            return response.json() if response is not None and response.status_code < 400 else {}
+        except ValueError:
+            return {}
+
+    async def register(self) -> str:
+        email = f"load_{time.time_ns()}_{self.rng.randrange(10 ** 6)}@loadtest.hablaris.com"
+        response = await self.request('POST', '/api/auth/register/', json={
+            'email': email, 'password': PASSWORD, 'first_name': 'Carga', 'last_name': 'Prueba'
+        })
+        if response is not None and response.status_code < 400:
+            self.shared['accounts'].append(email)
+        return email
+
+    async def login(self, email: str) -> None:
+        await self.request('POST', '/api/auth/login/', json={'email': email, 'password': PASSWORD})
+
+    async def browse(self):
+        await self.request('GET', '/')
+        await self.think()
+        await self.request('GET', '/store/')
+        if self.rng.random() < 0.5:
+            await self.think()
+            await self.request('GET', '/shop/')
+        if self.rng.random() < 0.3:
+            await self.think()
+            await self.request('GET', '/store/auth/')
+
+    async def account(self):
+        email = await self.register()
+        await self.think()
+        await self.login(email)
+
+    async def purchase(self):
+        if self.shared['accounts'] and self.rng.random() < 0.7:
+            email = self.rng.choice(self.shared['accounts'])
+            await self.login(email)
+        else:
+            email = await self.register()
+        await self.think()
+        await self.request('GET', '/store/')
+        await self.think()
+        response = await self.request('POST', '/api/esim/create/', json={
+            'email': email,
+            'country': self.rng.choice(COUNTRIES),
+            'data_plan': f"{self.rng.choice([1, 3, 5, 10, 20])}GB",
+            'customer_name': 'Carga Prueba',
+        })
+        sim_sid = self.json(response).get('sim_sid')
+        if sim_sid:
+            self.shared['sims'].append(sim_sid)
+
+    async def usage(self, polls: int):
+        sim_sid = self.rng.choice(self.shared['sims']) if self.shared['sims'] else 'HS' + '0' * 32
+        for poll in range(polls):
+            if poll:
+                await self.think()
+            await self.request('GET', f'/api/esim/usage/{sim_sid}/', name='GET /api/esim/usage/{sid}/')
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in ('browse', 'account', 'purchase', 'usage'):
+            raise argparse.ArgumentTypeError(f'Journey desconocido: {name}')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def run_user(options, stats: Stats, shared: dict, journey: str):
+    user = VirtualUser(options.base_url, stats, shared, options.think, options.timeout)
+    stats.user_started()
+    try:
+        if journey == 'usage':
+            await user.usage(options.polls)
+        else:
+            await getattr(user, journey)()
+        stats.journeys[journey] += 1
+    finally:
+        stats.active -= 1
+        await user.close()
+
+
+async def run_load(options) -> dict:
+    stats = Stats(options.interval)
+    shared = {'accounts': [], 'sims': []}
+    journeys, weights = zip(*options.mix.items())
+    rng = random.Random(options.seed)
+    tasks = set()
+
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < options.duration:
+        rate = arrival_rate(options.profile, options.rate, elapsed, options.duration, options.ramp)
+        if rate <= 0:
+            await asyncio.sleep(0.1)
+            continue
+        await asyncio.sleep(rng.expovariate(rate))
+        stats.arrivals += 1
+        if stats.active >= options.max_users:
+            stats.dropped += 1
+            continue
+        journey = rng.choices(journeys, weights)[0]
+        task = asyncio.create_task(run_user(options, stats, shared, journey))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    # Los journeys en curso terminan (o se cancelan tras --drain segundos)
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=options.drain)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return stats.report(time.perf_counter() - start)
+
+
+# ----- Servidor local -----
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(options):
+    """Base temporal con datos sintéticos y servidor con --workers workers"""
+    port = free_port()
+    env = dict(os.environ)
+    if options.no_redis:
+        env.pop('REDIS_URL', None)
+    env.update({
+        'DATABASE_URL': options.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='hablaris_load_')}/load.sqlite3",
+        'PORT': str(port),
+        'WEB_CONCURRENCY': str(options.workers),
+        'SERVER_MODE': options.server_mode,
+        'TWILIO_TEST_MODE': 'true',
+        'QUERY_INSPECTOR': 'off',
+        'PROMETHEUS_MULTIPROC_DIR': tempfile.mkdtemp(prefix='hablaris_load_prom_'),
+        # No pisar el snapshot del catálogo de otro servidor en la misma máquina
+        'CATALOG_SNAPSHOT_PATH': os.path.join(tempfile.mkdtemp(prefix='hablaris_load_catalog_'), 'catalog.snapshot'),
+    })
+    # Una línea de log por request en la consola taparía el informe
+    env.setdefault('SERVER_TIMING_SAMPLE_RATE', '0')
+
+    manage = [sys.executable, str(BASE_DIR / 'manage.py')]
+    print("📦 Preparando base de datos (migrate + datos sintéticos)...")
+    subprocess.run(manage + ['migrate', '--noinput', '-v', '0'], env=env, cwd=BASE_DIR, check=True)
+    subprocess.run(manage + ['createcachetable'], env=env, cwd=BASE_DIR, check=True)
+    subprocess.run(manage + ['generate_synthetic_data', '--scale', options.scale],
+                   env=env, cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+
+    if shutil.which('gunicorn'):
+        command = ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}']
+    else:
+        print("⚠️  gunicorn no está instalado; se usa uvicorn con los mismos workers")
+        command = [sys.executable, '-m', 'uvicorn', 'esim_backend.asgi:application',
+                   '--host', '127.0.0.1', '--port', str(port), '--workers', str(options.workers),
+                   '--no-access-log']
+    server = subprocess.Popen(command, env=env, cwd=BASE_DIR)
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"El servidor terminó al arrancar (código {server.returncode})")
+        try:
+            if httpx.get(f'{base_url}/health/', timeout=1).status_code == 200:
+                print(f"🚀 {' '.join(command[:3])}... con {options.workers} workers en {base_url}")
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise SystemExit("El servidor no respondió en /health/ en 60 s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='Servidor ya levantado (por defecto se levanta uno local)')
+    parser.add_argument('--workers', type=int, default=2, help='Workers del servidor local (WEB_CONCURRENCY)')
+    parser.add_argument('--server-mode', choices=['wsgi', 'asgi'], default='wsgi', help='SERVER_MODE del servidor local')
+    parser.add_argument('--database-url', help='Base del servidor local (por defecto SQLite temporal)')
+    parser.add_argument('--scale', default='small', help='Escala de generate_synthetic_data del servidor local')
+    parser.add_argument('--no-redis', action='store_true', help='Servidor local sin REDIS_URL')
+    parser.add_argument('--rate', type=float, default=5.0, help='Usuarios nuevos por segundo')
+    parser.add_argument('--duration', type=float, default=60.0, help='Segundos de llegadas')
+    parser.add_argument('--profile', choices=['constant', 'ramp', 'step', 'spike'], default='constant')
+    parser.add_argument('--ramp', type=float, default=30.0, help='Segundos de subida del perfil ramp')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f'Pesos ({DEFAULT_MIX})')
+    parser.add_argument('--include-unmounted', action='store_true',
+                        help=f'No omitir los journeys con rutas sin montar ({", ".join(UNMOUNTED_JOURNEYS)})')
+    parser.add_argument('--think', type=float, default=1.0, help='Tiempo medio de espera entre pasos (s)')
+    parser.add_argument('--polls', type=int, default=3, help='Consultas de consumo por journey usage')
+    parser.add_argument('--max-users', type=int, default=1000, help='Usuarios activos como máximo')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Timeout por request (s)')
+    parser.add_argument('--drain', type=float, default=30.0, help='Espera a los journeys en curso al final (s)')
+    parser.add_argument('--interval', type=float, default=10.0, help='Segundos por punto de la evolución')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla de llegadas y journeys')
+    parser.add_argument('--json', help='Guardar el informe en este archivo')
+    options = parser.parse_args()
+
+    skipped = [] if options.include_unmounted else [name for name in options.mix if name in UNMOUNTED_JOURNEYS]
+    if skipped:
+        print(f"⚠️  Se omiten {', '.join(skipped)}: sus rutas no están montadas en urls.py "
+              f"y solo medirían 404 (usa --include-unmounted contra un servidor que las sirva)")
+        options.mix = {name: weight for name, weight in options.mix.items() if name not in skipped}
+    if not options.mix:
+        parser.error('ningún journey del mix se puede ejecutar')
+
+    server = None
+    if not options.base_url:
+        server, options.base_url = start_local_server(options)
+    try:
+        print(f"⏱️  {options.profile} a {options.rate} usuarios/s durante {options.duration:.0f}s, mix {options.mix}")
+        report = asyncio.run(run_load(options))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report['config'] = {
+        'base_url': options.base_url, 'workers': options.workers if server else None,
+        'profile': options.profile, 'rate': options.rate, 'duration': options.duration, 'mix': options.mix,
+    }
+    print_report(report)
+    if options.json:
+        Path(options.json).write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+        print(f"\n💾 Informe guardado en {options.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark de una ráfaga de logins (credential stuffing)
+
+Lanza logins concurrentes con contraseñas incorrectas contra login_view
+(async) y mide cuántos llegan a hashear, cuántos se cortan con 429 antes del
+hash, cuántos hashes corren a la vez (acotado por PASSWORD_HASHING_WORKERS) y
+cuánto se retrasa el event loop mientras tanto. Usa una base SQLite temporal:
+
+    python benchmarks/login_throttling.py --attempts 200 --accounts 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp(prefix='hablaris_login_')}/login.sqlite3"
+os.environ.pop('REDIS_URL', None)
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.management import call_command
+from django.test import AsyncRequestFactory
+
+from esim_backend import json_codec
+from esim_backend.auth_views import login_view
+
+active_hashes = 0
+peak_hashes = 0
+hash_lock = threading.Lock()
+
+
+def count_concurrent_hashes():
+    """Envuelve el hasher por defecto para medir hashes simultáneos"""
+    hasher = hashers.get_hasher()
+    encode = hasher.encode
+
+    def counted_encode(*args, **kwargs):
+        global active_hashes, peak_hashes
+        with hash_lock:
+            active_hashes += 1
+            peak_hashes = max(peak_hashes, active_hashes)
+        try:
+            return encode(*args, **kwargs)
+        finally:
+            with hash_lock:
+                active_hashes -= 1
+
+    hasher.encode = counted_encode
+
+
+async def loop_lag(stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def attempt(factory, ip, email):
+    # Como detrás del proxy de Railway (NUM_PROXIES=1)
+    request = factory.post(
+        '/api/auth/login/', data=json_codec.dumps({'email': email, 'password': 'wrong-password'}),
+        content_type='application/json', headers={'X-Forwarded-For': ip}
+    )
+    request.session = SessionStore()
+    response = await login_view(request)
+    return response.status_code
+
+
+async def burst(attempts, accounts, ips):
+    factory = AsyncRequestFactory()
+    stop, samples = asyncio.Event(), []
+    lag = asyncio.create_task(loop_lag(stop, samples))
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*[
+        attempt(factory, f'10.0.0.{i % ips + 1}', f'user{i % accounts}@hablaris.com') for i in range(attempts)
+    ])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag
+    return statuses, elapsed, max(samples, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--attempts', type=int, default=200, help='Logins en la ráfaga')
+    parser.add_argument('--accounts', type=int, default=20, help='Cuentas atacadas')
+    parser.add_argument('--ips', type=int, default=4, help='IPs de origen')
+    options = parser.parse_args()
+
+    call_command('migrate', verbosity=0)
+    call_command('createcachetable', verbosity=0)
+    for i in range(options.accounts):
+        User.objects.create_user(f'user{i}', f'user{i}@hablaris.com', 'secret-password')
+    count_concurrent_hashes()
+
+    statuses, elapsed, max_lag = asyncio.run(burst(options.attempts, options.accounts, options.ips))
+    print(f"📊 {options.attempts} logins fallidos, {options.accounts} cuentas, {options.ips} IPs")
+    print(f"   Hasheados (401):        {statuses.count(401)}")
+    print(f"   Cortados antes (429):   {statuses.count(429)}")
+    print(f"   Hashes simultáneos:     {peak_hashes} (PASSWORD_HASHING_WORKERS={settings.PASSWORD_HASHING_WORKERS})")
+    print(f"⏱️  Ráfaga en {elapsed:.2f}s, retraso máximo del event loop {max_lag * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark de estáticos: configuración anterior vs pipeline precomprimido
+
+Compara, sobre los estáticos reales del proyecto (admin, DRF, static/):
+
+- anterior: StaticFilesStorage sin hash servido con django.views.static.serve
+  (lo único disponible antes; con DEBUG=False ni siquiera se servían)
+- pipeline: CompressedManifestStaticFilesStorage + StaticAssetMiddleware
+
+Mide el tiempo de collectstatic, requests/s sirviendo cada archivo y bytes
+transferidos por un navegador que acepta br/gzip. Se ejecuta en proceso,
+sin red, para aislar el coste del servidor de aplicación:
+
+    python benchmarks/static_assets.py --requests 2000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from esim_backend.middleware import StaticAssetMiddleware
+
+ACCEPT_ENCODING = 'gzip, deflate, br'
+SAMPLE_ASSETS = [
+    'admin/css/base.css',
+    'admin/css/dark_mode.css',
+    'admin/js/core.js',
+    'admin/js/vendor/jquery/jquery.min.js',
+    'admin/img/icon-yes.svg',
+    'rest_framework/css/bootstrap.min.css',
+]
+
+
+def storages(backend):
+    return {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': backend},
+    }
+
+
+def collect(root, backend):
+    """collectstatic en un directorio temporal; devuelve los segundos"""
+    with override_settings(STATIC_ROOT=str(root), STORAGES=storages(backend)):
+        start = time.perf_counter()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        return time.perf_counter() - start
+
+
+def consume(response):
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    if hasattr(response, 'close'):
+        response.close()
+    return len(body)
+
+
+def run(name, handler, paths, requests):
+    factory = RequestFactory()
+    prepared = [factory.get(path, HTTP_ACCEPT_ENCODING=ACCEPT_ENCODING) for path in paths]
+
+    transferred = 0
+    headers = None
+    start = time.perf_counter()
+    for i in range(requests):
+        response = handler(prepared[i % len(prepared)])
+        transferred += consume(response)
+        headers = headers or response
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊 {name}")
+    print(f"   {requests / elapsed:,.0f} req/s ({elapsed / requests * 1000:.3f} ms/req)")
+    print(f"   {transferred / requests / 1024:.1f} KiB transferidos por request")
+    print(f"   Cache-Control: {headers.get('Cache-Control', '-')}  Content-Encoding: {headers.get('Content-Encoding', '-')}")
+    return requests / elapsed, transferred / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests por escenario')
+    options = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix='hablaris_static_'))
+    plain_root, hashed_root = tmp / 'plain', tmp / 'hashed'
+    try:
+        plain_time = collect(plain_root, 'django.contrib.staticfiles.storage.StaticFilesStorage')
+        hashed_time = collect(hashed_root, 'esim_backend.storage.CompressedManifestStaticFilesStorage')
+        print(f"⏱️  collectstatic anterior: {plain_time:.2f}s | pipeline: {hashed_time:.2f}s")
+
+        # Configuración anterior: vista serve() sobre los nombres sin hash
+        def previous(request):
+            return serve(request, request.path[len('/static/'):], document_root=str(plain_root))
+
+        previous_rps, previous_bytes = run(
+            'Anterior (django.views.static.serve)', previous,
+            [f'/static/{name}' for name in SAMPLE_ASSETS], options.requests
+        )
+
+        # Pipeline: middleware con índice en memoria y URLs con hash
+        with override_settings(STATIC_ROOT=str(hashed_root), STORAGES=storages(
+                'esim_backend.storage.CompressedManifestStaticFilesStorage')):
+            from django.contrib.staticfiles.storage import staticfiles_storage
+            middleware = StaticAssetMiddleware(lambda request: HttpResponse(status=404))
+            hashed_paths = [staticfiles_storage.url(name) for name in SAMPLE_ASSETS]
+
+        pipeline_rps, pipeline_bytes = run(
+            'Pipeline (StaticAssetMiddleware)', middleware, hashed_paths, options.requests
+        )
+
+        print(f"\n🚀 {pipeline_rps / previous_rps:.1f}x requests/s, "
+              f"{(1 - pipeline_bytes / previous_bytes) * 100:.0f}% menos bytes transferidos")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+"""
+Suite de benchmarks de rutas calientes con baselines en JSON
+
+Un solo comando ejecuta todos los casos sobre una base SQLite temporal con
+datos sintéticos (esim_backend/synthetic.py) y los compara con la baseline
+guardada del perfil; marca como regresión cualquier caso cuya mediana empeore
+más que --tolerance o que haga más consultas SQL que en la baseline:
+
+    python benchmarks/suite.py                      # perfil quick, compara
+    python benchmarks/suite.py --save               # guarda benchmarks/baselines/quick.json
+    python benchmarks/suite.py --profile full --only plans --tolerance 0.15
+
+Casos (los ViewSets de pedidos y admin_stats_api dependen de modelos que no
+existen en este árbol; se miden sus equivalentes sobre los modelos reales):
+
+- plans.list / plans.filter: listado paginado y filtro de planes a 1k/10k/100k
+- plans.snapshot: el mismo filtro (una página) sobre el snapshot mmap del
+  catálogo (esim_backend/catalog_snapshot.py)
+- esims.list_user: eSIMs de un usuario (el equivalente a OrderViewSet.list)
+- admin.stats: agregados del dashboard sobre la tabla de eSIMs (1M en full)
+- pricing.scalar / pricing.batch: HablarisPricingEngine.calculate_optimal_price
+- provider.airalo_packages: AiraloService contra un servidor stub local
+- landing.cached / landing.render: la landing desde el cache de páginas y
+  renderizada de cero
+
+Sale con código 1 si hay regresiones, para usarlo en CI.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BASELINES_DIR = Path(__file__).resolve().parent / 'baselines'
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+WORK_DIR = tempfile.mkdtemp(prefix='hablaris_suite_')
+os.environ['DATABASE_URL'] = f"sqlite:///{WORK_DIR}/suite.sqlite3"
+os.environ.pop('REDIS_URL', None)
+os.environ['QUERY_INSPECTOR'] = 'off'
+os.environ['SERVER_TIMING_SAMPLE_RATE'] = '0'
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory
+
+from esim_backend.catalog_snapshot import build_snapshot
+from esim_backend.models import DataPlan, ESim
+from esim_backend.page_cache import page_cache
+from esim_backend.provider_config import provider_config
+from esim_backend.synthetic import SyntheticDataGenerator
+from services.pricing.hablaris_pricing import HablarisPricingEngine
+
+PROFILES = {
+    'quick': {'plans': [1000, 10000], 'users': 2000, 'esims': 100000, 'iterations': 30},
+    'full': {'plans': [1000, 10000, 100000], 'users': 100000, 'esims': 1000000, 'iterations': 50},
+}
+# Los agregados sobre toda la tabla son caros: menos iteraciones
+HEAVY_ITERATIONS = 5
+
+
+# ----- Vistas equivalentes sobre los modelos reales -----
+
+class PlanSerializer(serializers.ModelSerializer):
+    region = serializers.CharField(source='region.name')
+
+    class Meta:
+        model = DataPlan
+        fields = ['id', 'region', 'data_gb', 'duration_days', 'price']
+
+
+class PlanFilterSerializer(serializers.Serializer):
+    region = serializers.CharField(required=False)
+    min_data = serializers.IntegerField(required=False)
+    max_days = serializers.IntegerField(required=False)
+    max_price = serializers.DecimalField(max_digits=8, decimal_places=2, required=False)
+
+
+class PlanViewSet(viewsets.ReadOnlyModelViewSet):
+    """Mismo flujo que DataPlanViewSet: listado paginado y filter por POST"""
+    queryset = DataPlan.objects.select_related('region').order_by('id')
+    serializer_class = PlanSerializer
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @action(detail=False, methods=['post'])
+    def filter(self, request):
+        filter_serializer = PlanFilterSerializer(data=request.data)
+        filter_serializer.is_valid(raise_exception=True)
+        filters = filter_serializer.validated_data
+        queryset = self.get_queryset()
+        if 'region' in filters:
+            queryset = queryset.filter(region__name=filters['region'])
+        if 'min_data' in filters:
+            queryset = queryset.filter(data_gb__gte=filters['min_data'])
+        if 'max_days' in filters:
+            queryset = queryset.filter(duration_days__lte=filters['max_days'])
+        if 'max_price' in filters:
+            queryset = queryset.filter(price__lte=filters['max_price'])
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class ESimSerializer(serializers.ModelSerializer):
+    plan = PlanSerializer(source='data_plan')
+
+    class Meta:
+        model = ESim
+        fields = ['id', 'plan', 'status', 'data_remaining_gb', 'activated_date', 'expires_date', 'created_at']
+
+
+class UserESimViewSet(viewsets.ReadOnlyModelViewSet):
+    """Listado del usuario, como OrderViewSet.list/ESimViewSet.list"""
+    serializer_class = ESimSerializer
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    user_id = None
+
+    def get_queryset(self):
+        return ESim.objects.filter(user_id=self.user_id).select_related(
+            'data_plan__region'
+        ).order_by('-created_at')
+
+
+def dashboard_stats():
+    """Agregados de admin_stats_api sobre la tabla de eSIMs"""
+    month_ago = datetime.now(dt_timezone.utc) - timedelta(days=30)
+    by_status = ESim.objects.aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status, _ in ESim.STATUS_CHOICES}
+    )
+    by_provider = list(ESim.objects.values('provider').annotate(total=Count('id')).order_by())
+    revenue = ESim.objects.filter(created_at__gte=month_ago).aggregate(total=Sum('data_plan__price'))
+    top_users = list(
+        ESim.objects.values('user_id').annotate(spent=Sum('data_plan__price'), esims=Count('id'))
+        .order_by('-spent')[:5]
+    )
+    return by_status, by_provider, revenue, top_users
+
+
+# ----- Servidor stub de proveedor -----
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo van en escrituras separadas; sin esto Nagle añade ~40 ms
+    disable_nagle_algorithm = True
+    PACKAGES = json.dumps({'data': [
+        {'id': f'pkg-{i}', 'title': f'{i} GB', 'price': 4.5 + i, 'day': 30} for i in range(20)
+    ]}).encode()
+    TOKEN = json.dumps({'access_token': 'stub-token', 'expires_in': 3600}).encode()
+
+    def respond(self, body):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.respond(self.PACKAGES)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.respond(self.TOKEN)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubProviderHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ----- Medición -----
+
+def measure(func, iterations, warmup=2):
+    for _ in range(warmup):
+        func()
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'queries': len(queries.captured_queries),
+        'iterations': iterations,
+    }
+
+
+def rendered(view, request):
+    response = view(request)
+    response.render()
+    assert response.status_code == 200, response.content[:200]
+    return response
+
+
+def label(count):
+    return f'{count // 1000}k' if count >= 1000 else str(count)
+
+
+def plan_cases(profile, factory):
+    generator = SyntheticDataGenerator(users=0, plans=0, esims=0, report=lambda message: None)
+    regions = generator.create_geography()
+    list_view = PlanViewSet.as_view({'get': 'list'})
+    filter_view = PlanViewSet.as_view({'post': 'filter'})
+    body = {'region': 'Europa', 'min_data': 5, 'max_days': 30, 'max_price': '60.00'}
+    snapshot_filters = dict(body, region=regions['europe'].pk, max_price=Decimal(body['max_price']),
+                            limit=settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+    for count in profile['plans']:
+        generator.plans = count
+        generator.create_plans(regions)
+        middle_page = max(1, count // settings.REST_FRAMEWORK['PAGE_SIZE'] // 2)
+        yield f'plans.list[{label(count)}]', lambda: rendered(
+            list_view, factory.get('/api/plans/', {'page': middle_page})
+        ), profile['iterations']
+        yield f'plans.filter[{label(count)}]', lambda: rendered(
+            filter_view, factory.post('/api/plans/filter/', body, format='json')
+        ), profile['iterations']
+        snapshot = build_snapshot(os.path.join(WORK_DIR, f'catalog-{count}.snapshot'))
+        yield f'plans.snapshot[{label(count)}]', lambda: snapshot.plans(
+            **snapshot_filters
+        ), profile['iterations']
+
+
+def esim_cases(profile, factory):
+    generator = SyntheticDataGenerator(
+        users=profile['users'], plans=max(profile['plans']), esims=profile['esims'],
+        report=lambda message: None
+    )
+    generator.generate()
+    # El usuario con más compras (la distribución es de Pareto)
+    heavy_user = ESim.objects.values('user_id').annotate(total=Count('id')).order_by('-total')[0]['user_id']
+    view = UserESimViewSet.as_view({'get': 'list'}, user_id=heavy_user)
+    yield 'esims.list_user', lambda: rendered(view, factory.get('/api/esims/')), profile['iterations']
+    yield f"admin.stats[{label(profile['esims'])}]", dashboard_stats, HEAVY_ITERATIONS
+
+
+def pricing_cases(profile):
+    engine = HablarisPricingEngine()
+    inputs = [
+        (round(1 + (i % 50) * 0.7, 2), ('budget', 'standard', 'premium', 'unlimited')[i % 4],
+         ('europe', 'north_america', 'asia_pacific', 'latin_america', 'global')[i % 5],
+         (1, 3, 5, 10, 20)[i % 5], (7, 15, 30)[i % 3])
+        for i in range(10000)
+    ]
+
+    def scalar():
+        for _ in range(1000):
+            engine.calculate_optimal_price(8.5, 'standard', 'europe', 5, 30)
+
+    def batch():
+        return [engine.calculate_optimal_price(*args) for args in inputs]
+
+    yield 'pricing.scalar[x1000]', scalar, profile['iterations']
+    yield 'pricing.batch[10k]', batch, profile['iterations']
+
+
+def provider_cases(profile):
+    from services.esim_providers.airalo_service import AiraloService
+
+    service = AiraloService()
+    assert service.authenticate() and service.get_packages('ES'), 'El stub de Airalo no responde'
+
+    def round_trip():
+        # get_packages cachea el catálogo: se mide la llamada al proveedor
+        cache.delete('airalo_packages_ES')
+        return service.get_packages('ES')
+
+    yield 'provider.airalo_packages', round_trip, profile['iterations']
+
+
+def landing_cases(profile):
+    client = Client()
+
+    def cold():
+        page_cache.clear()
+        client.get('/', HTTP_ACCEPT_ENCODING='br')
+
+    yield 'landing.cached', lambda: client.get('/', HTTP_ACCEPT_ENCODING='br'), profile['iterations']
+    yield 'landing.render', cold, profile['iterations']
+
+
+def run(profile_name, only):
+    profile = PROFILES[profile_name]
+    factory = APIRequestFactory()
+    groups = [
+        ('pricing', lambda: pricing_cases(profile)),
+        ('provider', lambda: provider_cases(profile)),
+        ('landing', lambda: landing_cases(profile)),
+        ('plans', lambda: plan_cases(profile, factory)),
+        # Al final: genera usuarios y eSIMs sobre los planes ya creados
+        ('esims admin', lambda: esim_cases(profile, factory)),
+    ]
+    results = {}
+    for prefixes, cases in groups:
+        if only and not any(only in prefix for prefix in prefixes.split()):
+            continue
+        for name, func, iterations in cases():
+            if only and only not in name:
+                continue
+            results[name] = measure(func, iterations)
+            result = results[name]
+            print(f"⏱️  {name:<28} {result['median_ms']:10.3f} ms mediana  "
+                  f"{result['p95_ms']:10.3f} ms p95  {result['queries']:3d} consultas")
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'processor_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Informe contra la baseline; devuelve los nombres con regresión"""
+    regressions = []
+    print(f"\n📊 Comparación con la baseline ({baseline.get('created', '?')}, tolerancia {tolerance:.0%})")
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f"   {name:<28} nuevo")
+            continue
+        ratio = result['median_ms'] / previous['median_ms'] if previous['median_ms'] else 1.0
+        slower = ratio > 1 + tolerance
+        more_queries = result['queries'] > previous['queries']
+        mark = '❌' if slower or more_queries else ('✅' if ratio < 1 - tolerance else '  ')
+        detail = f" consultas {previous['queries']} -> {result['queries']}" if more_queries else ''
+        print(f"   {mark} {name:<26} {previous['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms "
+              f"({ratio:5.2f}x){detail}")
+        if slower or more_queries:
+            regressions.append(name)
+    if baseline.get('environment') != environment():
+        print(f"   ⚠️  Entorno distinto al de la baseline: {baseline.get('environment')}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=PROFILES, default='quick', help='Tamaño de los datos')
+    parser.add_argument('--only', default='', help='Solo casos cuyo nombre contenga este texto')
+    parser.add_argument('--save', action='store_true', help='Guardar los resultados como baseline del perfil')
+    parser.add_argument('--baseline', help='Archivo de baseline (por defecto baselines/<perfil>.json)')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Empeoramiento tolerado (0.2 = 20%%)')
+    options = parser.parse_args()
+
+    baseline_path = Path(options.baseline) if options.baseline else BASELINES_DIR / f'{options.profile}.json'
+    stub = start_stub_server()
+    # Airalo contra el stub, sin leer los .env de proveedores del disco
+    settings.AIRALO_BASE_URL = f'http://127.0.0.1:{stub.server_port}'
+    settings.PROVIDER_CONFIG_DIRS = []
+    provider_config.reload()
+
+    call_command('migrate', verbosity=0)
+    call_command('createcachetable', verbosity=0)
+    cache.clear()
+
+    print(f"📦 Perfil {options.profile}: {PROFILES[options.profile]}")
+    results = run(options.profile, options.only)
+    stub.shutdown()
+
+    if options.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        previous = json.loads(baseline_path.read_text()) if baseline_path.exists() and options.only else {}
+        data = {
+            'profile': options.profile,
+            'created': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+            'environment': environment(),
+            'results': dict(previous.get('results', {}), **results),
+        }
+        baseline_path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+        print(f"\n💾 Baseline guardada en {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"\nSin baseline en {baseline_path}; ejecuta con --save para crearla")
+        return
+    regressions = compare(results, json.loads(baseline_path.read_text()), options.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresiones: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ Sin regresiones")
+
+
+if __name__ == '__main__':
+    main()
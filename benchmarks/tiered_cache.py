@@ -0,0 +1,87 @@
+"""
+Benchmark del cache en dos niveles
+
+Compara lecturas de claves calientes contra el cache compartido solo (L2,
+la tabla de cache en una base SQLite temporal) y contra TwoTierCache, y mide
+cuánto tarda otro "proceso" (una segunda instancia con su propio L1 sobre el
+mismo L2) en ver una escritura:
+
+    python benchmarks/tiered_cache.py --reads 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+os.environ['DATABASE_URL'] = f"sqlite:///{tempfile.mkdtemp(prefix='hablaris_cache_')}/cache.sqlite3"
+os.environ.pop('REDIS_URL', None)
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+
+from esim_backend.tiered_cache import TwoTierCache
+
+HOT_KEYS = ['airalo_access_token', 'twilio_plans', 'oneglobal_destinations', 'oneglobal_products_ES']
+
+
+def worker_cache(sync_interval):
+    """Instancia independiente, como la de otro worker de gunicorn"""
+    options = dict(settings.CACHES['default']['OPTIONS'], SYNC_INTERVAL=sync_interval)
+    return TwoTierCache('shared', {'OPTIONS': options})
+
+
+def read_rate(cache, keys, reads):
+    start = time.perf_counter()
+    for i in range(reads):
+        cache.get(keys[i % len(keys)])
+    elapsed = time.perf_counter() - start
+    return reads / elapsed, elapsed / reads * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reads', type=int, default=20000, help='Lecturas por escenario')
+    parser.add_argument('--sync-interval', type=float, default=1.0, help='SYNC_INTERVAL de los workers')
+    options = parser.parse_args()
+
+    call_command('createcachetable', verbosity=0)
+    shared = caches['shared']
+    catalog = [{'id': i, 'name': f'Plan {i}', 'price': '9.99'} for i in range(500)]
+    for key in HOT_KEYS:
+        shared.set(key, 'token-' * 20 if key == 'airalo_access_token' else catalog, 3600)
+
+    worker_a = worker_cache(options.sync_interval)
+    worker_b = worker_cache(options.sync_interval)
+    scenarios = [('token', HOT_KEYS[:1]), ('catálogos (500 planes)', HOT_KEYS[1:])]
+    for name, keys in scenarios:
+        l2_rate, l2_us = read_rate(shared, keys, options.reads)
+        tiered_rate, tiered_us = read_rate(worker_a, keys, options.reads)
+        print(f"📊 {name}")
+        print(f"   Solo L2 (DatabaseCache)  {l2_rate:10,.0f} lecturas/s  {l2_us:7.1f} µs/lectura")
+        print(f"   TwoTierCache (L1 + L2)   {tiered_rate:10,.0f} lecturas/s  {tiered_us:7.1f} µs/lectura "
+              f"({tiered_rate / l2_rate:.1f}x)")
+    print(f"   Estadísticas: {worker_a.get_stats()}")
+
+    # Otro worker escribe: ¿cuándo deja A de servir el valor viejo de su L1?
+    worker_b.get('twilio_plans')
+    start = time.perf_counter()
+    worker_b.set('twilio_plans', 'nuevo catálogo', 3600)
+    while worker_a.get('twilio_plans') != 'nuevo catálogo':
+        time.sleep(0.01)
+    print(f"\n🔄 Escritura en otro worker visible en {time.perf_counter() - start:.2f}s "
+          f"(SYNC_INTERVAL={options.sync_interval}s, sin pub/sub)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,63 @@
+import json
+import logging
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
+
 from .models import Country, Region, DataPlan, ESim
 
+logger = logging.getLogger(__name__)
+
+
+def estimated_count(queryset):
+    """Filas estimadas por el planner de PostgreSQL (None si no hay estimación)"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                # Sin filtros: estadísticas de la tabla (-1 si nunca se analizó)
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+                return row[0] if row and row[0] >= 0 else None
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.error(f"Error estimando filas de {queryset.model.__name__}: {e}")
+        return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginador que evita el COUNT(*) completo en tablas grandes"""
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000):
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist para tablas grandes: sin recuento total exacto"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 # Registro básico de modelos eSIM
 @admin.register(Country)
 class CountryAdmin(admin.ModelAdmin):
@@ -13,22 +70,47 @@ class CountryAdmin(admin.ModelAdmin):
 class RegionAdmin(admin.ModelAdmin):
     list_display = ['name', 'get_countries_count']
     search_fields = ['name']
-    
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(countries_count=Count('countries'))
+
     def get_countries_count(self, obj):
-        return obj.countries.count()
+        return obj.countries_count
     get_countries_count.short_description = 'Países'
+    get_countries_count.admin_order_field = 'countries_count'
 
 @admin.register(DataPlan)
-class DataPlanAdmin(admin.ModelAdmin):
+class DataPlanAdmin(LargeTableAdmin):
     list_display = ['region', 'data_gb', 'duration_days', 'price']
-    list_filter = ['region', 'data_gb', 'duration_days']
+    list_select_related = ['region']
+    # data_gb y duration_days no tienen índice: su filtro haría un SELECT DISTINCT completo
+    list_filter = ['region']
     search_fields = ['region__name']
     ordering = ['region', 'price']
 
 @admin.register(ESim)
-class ESimAdmin(admin.ModelAdmin):
-    list_display = ['user', 'data_plan', 'status', 'data_remaining_gb', 'activated_date', 'expires_date']
-    list_filter = ['status', 'activated_date', 'data_plan__region']
-    search_fields = ['user__username', 'user__email', 'data_plan__region__name']
-    readonly_fields = ['activated_date', 'expires_date']
-    ordering = ['-activated_date']
\ No newline at end of file
+class ESimAdmin(LargeTableAdmin):
+    list_display = ['user', 'data_plan', 'status', 'provider', 'data_remaining_gb', 'activated_date', 'expires_date']
+    # __str__ de ESim y DataPlan recorren user y data_plan.region
+    list_select_related = ['user', 'data_plan__region']
+    # Todos con índice que empieza por el campo filtrado y sigue por created_at
+    list_filter = ['status', 'provider', 'created_at']
+    search_fields = ['=user__username', '=provider_esim_id']
+    search_help_text = 'ID de eSIM, ID en el proveedor, usuario o email exactos'
+    readonly_fields = ['activated_date', 'expires_date', 'provider_suspended_at']
+    raw_id_fields = ['user', 'data_plan']
+    ordering = ['-created_at']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Búsqueda solo por igualdad sobre columnas indexadas (nada de LIKE '%...%')"""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if '@' in term:
+            # auth_user_email_idx (migración 0004) es sensible a mayúsculas, como el login
+            users = User.objects.filter(email=term).values('pk')
+            return queryset.filter(user__in=users), False
+        lookup = Q(user__username=term) | Q(provider_esim_id=term)
+        if term.isdigit() and len(term) < 19:
+            lookup |= Q(pk=int(term))
+        return queryset.filter(lookup), False
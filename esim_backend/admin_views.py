@@ -1,4 +1,4 @@
-from django.http import JsonResponse
+from .json_codec import JsonResponse
 from django.contrib.admin.views.decorators import staff_member_required
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
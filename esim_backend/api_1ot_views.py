@@ -2,33 +2,25 @@
 API Integration with 1oT for eSIM management
 """
 
-import os
 import json
 import requests
-from django.http import JsonResponse
+from . import json_codec
+from .json_codec import JsonResponse, response_json
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from .provider_config import get_provider_config
+from services.esim_providers.async_http import async_http
+from services.esim_providers.http_session import ProviderSession
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Instancia global de la sesión HTTP de 1ot
+provider_session = ProviderSession('1ot')
+
 def load_1ot_credentials():
-    """Cargar credenciales de 1oT desde .env.1ot"""
-    try:
-        env_file = os.path.join(os.path.dirname(__file__), '..', '..', '.env.1ot')
-        credentials = {}
-        
-        if os.path.exists(env_file):
-            with open(env_file, 'r') as f:
-                for line in f:
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        credentials[key] = value.strip('"\'')
-        
-        return credentials
-    except Exception as e:
-        logger.error(f"Error loading 1oT credentials: {e}")
-        return {}
+    """Credenciales de 1oT desde el registro de configuración (sin I/O por request)"""
+    return get_provider_config('1ot')
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -62,10 +54,10 @@ def test_1ot_credentials(request):
             'Content-Type': 'application/json'
         }
         
-        response = requests.get(f"{base_url}/account", headers=headers, timeout=10)
+        response = provider_session.get(f"{base_url}/account", headers=headers, timeout=10)
         
         if response.status_code == 200:
-            account_data = response.json()
+            account_data = response_json(response)
             return JsonResponse({
                 'success': True,
                 'message': 'Conexión exitosa con 1oT',
@@ -95,42 +87,120 @@ def test_1ot_credentials(request):
             'error': f'Error interno: {str(e)}'
         }, status=500)
 
+def iot_connection(credentials):
+    """URL base y cabeceras para la API de 1oT"""
+    base_url = credentials.get('IOT_BASE_URL', 'https://api.1ot.com/v1')
+    headers = {
+        'Authorization': f"Bearer {credentials['IOT_API_KEY']}",
+        'Content-Type': 'application/json'
+    }
+    return base_url, headers
+
+def simulated_1ot_esim(data):
+    """Respuesta de creación simulada (modo test)"""
+    import random
+    import string
+    
+    iccid = '8901' + ''.join(random.choices(string.digits, k=16))
+    eid = ''.join(random.choices(string.digits + string.ascii_uppercase, k=32))
+    
+    return {
+        'success': True,
+        'message': 'eSIM creada exitosamente (MODO TEST - 1oT)',
+        'provider': '1oT',
+        'esim_data': {
+            'iccid': iccid,
+            'eid': eid,
+            'status': 'active',
+            'activation_code': f"1${iccid}",
+            'qr_code': f"data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
+        },
+        'plan_details': {
+            'country': data.get('country', 'N/A'),
+            'data_limit': data.get('data_plan', 'N/A'),
+            'validity_days': 30
+        },
+        'test_mode': True,
+        'note': '🧪 Esta es una eSIM simulada - NO es real'
+    }
+
+def esim_1ot_payload(data):
+    """Payload para crear eSIM con 1oT"""
+    return {
+        'country': data.get('country', 'ES'),
+        'data_limit_mb': int(data.get('data_plan', '1GB').replace('GB', '000')),
+        'validity_days': 30,
+        'customer_info': {
+            'email': data.get('email', ''),
+            'name': data.get('customer_name', 'Customer')
+        }
+    }
+
+def created_1ot_response(response):
+    """JsonResponse a partir de la respuesta de creación de 1oT"""
+    if response.status_code == 201:
+        return JsonResponse({
+            'success': True,
+            'message': 'eSIM creada exitosamente con 1oT',
+            'provider': '1oT',
+            'esim_data': response_json(response),
+            'test_mode': False
+        })
+    return JsonResponse({
+        'success': False,
+        'error': f'Error al crear eSIM con 1oT: {response.status_code}',
+        'details': response.text
+    }, status=400)
+
+def simulated_1ot_usage(esim_id):
+    """Datos de uso simulados (modo test)"""
+    import random
+    from datetime import datetime, timedelta
+    
+    return {
+        'success': True,
+        'test_mode': True,
+        'provider': '1oT',
+        'esim_info': {
+            'iccid': esim_id,
+            'status': 'active',
+            'activation_date': str(datetime.now() - timedelta(days=random.randint(1, 30))),
+            'expiry_date': str(datetime.now() + timedelta(days=random.randint(1, 30)))
+        },
+        'usage_data': {
+            'data_used_mb': random.randint(50, 800),
+            'data_limit_mb': 1000,
+            'usage_percentage': random.randint(5, 80)
+        },
+        'note': '🧪 Datos simulados - NO reales'
+    }
+
+def usage_1ot_response(response):
+    """JsonResponse a partir de la respuesta de uso de 1oT"""
+    if response.status_code == 200:
+        return JsonResponse({
+            'success': True,
+            'provider': '1oT',
+            'usage_data': response_json(response),
+            'test_mode': False
+        })
+    return JsonResponse({
+        'success': False,
+        'error': f'Error al consultar uso: {response.status_code}',
+        'details': response.text
+    }, status=400)
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def create_1ot_esim(request):
     """Crear una eSIM con 1oT"""
     try:
-        data = json.loads(request.body)
+        data = json_codec.loads(request.body)
         credentials = load_1ot_credentials()
         
         # Verificar si estamos en modo test
         if credentials.get('IOT_TEST_MODE') == 'true':
-            # Simular creación exitosa de eSIM
-            import random
-            import string
-            
-            iccid = '8901' + ''.join(random.choices(string.digits, k=16))
-            eid = ''.join(random.choices(string.digits + string.ascii_uppercase, k=32))
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'eSIM creada exitosamente (MODO TEST - 1oT)',
-                'provider': '1oT',
-                'esim_data': {
-                    'iccid': iccid,
-                    'eid': eid,
-                    'status': 'active',
-                    'activation_code': f"1${iccid}",
-                    'qr_code': f"data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
-                },
-                'plan_details': {
-                    'country': data.get('country', 'N/A'),
-                    'data_limit': data.get('data_plan', 'N/A'),
-                    'validity_days': 30
-                },
-                'test_mode': True,
-                'note': '🧪 Esta es una eSIM simulada - NO es real'
-            })
+            return JsonResponse(simulated_1ot_esim(data))
         
         # Implementar creación real con 1oT API
         if not credentials.get('IOT_API_KEY'):
@@ -139,40 +209,41 @@ def create_1ot_esim(request):
                 'error': 'Credenciales de 1oT no configuradas'
             }, status=400)
         
-        base_url = credentials.get('IOT_BASE_URL', 'https://api.1ot.com/v1')
-        headers = {
-            'Authorization': f"Bearer {credentials['IOT_API_KEY']}",
-            'Content-Type': 'application/json'
-        }
-        
-        # Payload para crear eSIM con 1oT
-        payload = {
-            'country': data.get('country', 'ES'),
-            'data_limit_mb': int(data.get('data_plan', '1GB').replace('GB', '000')),
-            'validity_days': 30,
-            'customer_info': {
-                'email': data.get('email', ''),
-                'name': data.get('customer_name', 'Customer')
-            }
-        }
+        base_url, headers = iot_connection(credentials)
+        response = provider_session.post(f"{base_url}/esims", json=esim_1ot_payload(data), headers=headers, timeout=30)
+        return created_1ot_response(response)
+            
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'JSON inválido en el request'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Error interno: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_1ot_esim_async(request):
+    """Crear una eSIM con 1oT sin bloquear el worker ASGI mientras responde 1oT"""
+    try:
+        data = json_codec.loads(request.body)
+        credentials = load_1ot_credentials()
         
-        response = requests.post(f"{base_url}/esims", json=payload, headers=headers, timeout=30)
+        if credentials.get('IOT_TEST_MODE') == 'true':
+            return JsonResponse(simulated_1ot_esim(data))
         
-        if response.status_code == 201:
-            esim_data = response.json()
-            return JsonResponse({
-                'success': True,
-                'message': 'eSIM creada exitosamente con 1oT',
-                'provider': '1oT',
-                'esim_data': esim_data,
-                'test_mode': False
-            })
-        else:
+        if not credentials.get('IOT_API_KEY'):
             return JsonResponse({
                 'success': False,
-                'error': f'Error al crear eSIM con 1oT: {response.status_code}',
-                'details': response.text
+                'error': 'Credenciales de 1oT no configuradas'
             }, status=400)
+        
+        base_url, headers = iot_connection(credentials)
+        response = await async_http.post(f"{base_url}/esims", json=esim_1ot_payload(data), headers=headers, timeout=30, provider='1ot')
+        return created_1ot_response(response)
             
     except json.JSONDecodeError:
         return JsonResponse({
@@ -194,51 +265,32 @@ def check_1ot_usage(request, esim_id):
         
         # Verificar si estamos en modo test
         if credentials.get('IOT_TEST_MODE') == 'true':
-            # Simular datos de uso
-            import random
-            from datetime import datetime, timedelta
-            
-            return JsonResponse({
-                'success': True,
-                'test_mode': True,
-                'provider': '1oT',
-                'esim_info': {
-                    'iccid': esim_id,
-                    'status': 'active',
-                    'activation_date': str(datetime.now() - timedelta(days=random.randint(1, 30))),
-                    'expiry_date': str(datetime.now() + timedelta(days=random.randint(1, 30)))
-                },
-                'usage_data': {
-                    'data_used_mb': random.randint(50, 800),
-                    'data_limit_mb': 1000,
-                    'usage_percentage': random.randint(5, 80)
-                },
-                'note': '🧪 Datos simulados - NO reales'
-            })
+            return JsonResponse(simulated_1ot_usage(esim_id))
         
         # Implementar consulta real
-        base_url = credentials.get('IOT_BASE_URL', 'https://api.1ot.com/v1')
-        headers = {
-            'Authorization': f"Bearer {credentials['IOT_API_KEY']}",
-            'Content-Type': 'application/json'
-        }
+        base_url, headers = iot_connection(credentials)
+        response = provider_session.get(f"{base_url}/esims/{esim_id}/usage", headers=headers, timeout=10)
+        return usage_1ot_response(response)
+            
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Error interno: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def check_1ot_usage_async(request, esim_id):
+    """Consultar uso de una eSIM en 1oT sin bloquear el worker ASGI"""
+    try:
+        credentials = load_1ot_credentials()
         
-        response = requests.get(f"{base_url}/esims/{esim_id}/usage", headers=headers, timeout=10)
+        if credentials.get('IOT_TEST_MODE') == 'true':
+            return JsonResponse(simulated_1ot_usage(esim_id))
         
-        if response.status_code == 200:
-            usage_data = response.json()
-            return JsonResponse({
-                'success': True,
-                'provider': '1oT',
-                'usage_data': usage_data,
-                'test_mode': False
-            })
-        else:
-            return JsonResponse({
-                'success': False,
-                'error': f'Error al consultar uso: {response.status_code}',
-                'details': response.text
-            }, status=400)
+        base_url, headers = iot_connection(credentials)
+        response = await async_http.get(f"{base_url}/esims/{esim_id}/usage", headers=headers, timeout=10, provider='1ot')
+        return usage_1ot_response(response)
             
     except Exception as e:
         return JsonResponse({
@@ -1,8 +1,10 @@
 """
 URLs de la API REST para la tienda eSIM
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import api_views
 from .api_views import (
     CountryViewSet, DataPlanViewSet, OrderViewSet, 
     ESimViewSet, UserViewSet
@@ -23,3 +25,23 @@ urlpatterns = [
     # Endpoints de autenticación (simplificado)
     path('auth/', include('rest_framework.urls')),
 ]
+
+# Vistas de Twilio: en modo ASGI se sirven sus versiones async. Las de 1oT
+# están en urls.py, porque este URLconf no está montado (api_views depende de
+# modelos que no existen en este árbol)
+if settings.ASYNC_PROVIDER_VIEWS:
+    provider_views = {
+        'create_esim': api_views.create_esim_async,
+        'check_usage': api_views.check_usage_async,
+    }
+else:
+    provider_views = {
+        'create_esim': api_views.create_esim,
+        'check_usage': api_views.check_usage,
+    }
+
+urlpatterns += [
+    path('test-credentials/', api_views.test_credentials, name='test_credentials'),
+    path('esim/create/', provider_views['create_esim'], name='create_esim'),
+    path('esim/usage/<str:sim_sid>/', provider_views['check_usage'], name='check_usage'),
+]
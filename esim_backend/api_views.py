@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 # from django_filters.rest_framework import DjangoFilterBackend  # Temporalmente deshabilitado
 from django.db.models import Q
+from .instrumentation import serializer_data
 from .models import Country, DataPlan, Order, ESim, User
 from .serializers import (
     CountrySerializer, DataPlanListSerializer, DataPlanDetailSerializer,
@@ -16,13 +17,16 @@ from .serializers import (
 )
 
 # Legacy imports for backwards compatibility
-import os
 import json
-from django.http import JsonResponse
+import asyncio
+from . import json_codec
+from .json_codec import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
+from .provider_config import get_provider_config
+from services.esim_providers.twilio_client_pool import twilio_client_pool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -133,12 +137,12 @@ class DataPlanViewSet(viewsets.ReadOnlyModelViewSet):
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(serializer_data(serializer))
         
         serializer = self.get_serializer(queryset, many=True)
         return Response({
             'count': queryset.count(),
-            'results': serializer.data
+            'results': serializer_data(serializer)
         })
     
     @action(detail=False, methods=['get'])
@@ -269,22 +273,8 @@ class UserViewSet(viewsets.ModelViewSet):
 # ===== LEGACY FUNCTIONS FOR BACKWARDS COMPATIBILITY =====
 
 def load_twilio_credentials():
-    """Cargar credenciales de Twilio desde .env.twilio"""
-    try:
-        env_file = os.path.join(os.path.dirname(__file__), '..', '..', '.env.twilio')
-        credentials = {}
-        
-        if os.path.exists(env_file):
-            with open(env_file, 'r') as f:
-                for line in f:
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        credentials[key] = value.strip('"\'')
-        
-        return credentials
-    except Exception as e:
-        logger.error(f"Error loading Twilio credentials: {e}")
-        return {}
+    """Credenciales de Twilio desde el registro de configuración (sin I/O por request)"""
+    return get_provider_config('twilio')
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -317,11 +307,9 @@ def test_credentials(request):
                 'details': 'Verifica el archivo .env.twilio'
             }, status=400)
         
-        # Intentar importar y usar Twilio
+        # Usar el cliente Twilio compartido del proceso
         try:
-            from twilio.rest import Client
-            
-            client = Client(
+            client = twilio_client_pool.get_client(
                 credentials['TWILIO_ACCOUNT_SID'], 
                 credentials['TWILIO_AUTH_TOKEN']
             )
@@ -363,39 +351,145 @@ def test_credentials(request):
             'error': f'Error interno: {str(e)}'
         }, status=500)
 
+def simulated_esim(data):
+    """Respuesta de creación simulada (modo test)"""
+    import random
+    import string
+    
+    sim_id = 'DE' + ''.join(random.choices(string.digits + string.ascii_uppercase, k=32))
+    unique_name = f"hablaris_test_{data.get('email', 'test')}_{random.randint(1000, 9999)}"
+    
+    return {
+        'success': True,
+        'message': 'eSIM creada exitosamente (MODO TEST)',
+        'sim_sid': sim_id,
+        'unique_name': unique_name,
+        'status': 'active',
+        'test_mode': True,
+        'qr_code': f"data:text/plain;base64,SIMULADO_QR_{sim_id}",
+        'details': {
+            'country': data.get('country', 'N/A'),
+            'data_plan': data.get('data_plan', 'N/A'),
+            'customer_email': data.get('email', 'N/A'),
+            'customer_name': data.get('customer_name', 'Test User')
+        },
+        'note': '🧪 Esta es una eSIM simulada - NO es real'
+    }
+
+def create_fleet_sim(client, account_sid, configured_fleet_sid=''):
+    """Crear una Super SIM en la Fleet configurada o ya resuelta en este proceso"""
+    try:
+        fleet_sid = twilio_client_pool.resolve_fleet(client, account_sid, configured_fleet_sid)
+        return client.supersim.v1.sims.create(fleet=fleet_sid)
+    except Exception:
+        # La fleet cacheada puede haber dejado de existir
+        twilio_client_pool.invalidate_fleet(account_sid)
+        raise
+
+def fleet_error_response(fleet_error):
+    logger.error(f"Error con fleet: {fleet_error}")
+    return JsonResponse({
+        'success': False,
+        'error': 'Error: Tu cuenta Twilio trial no tiene permisos para Super SIM o necesita configuración adicional',
+        'twilio_error': str(fleet_error),
+        'solution': 'Contacta soporte de Twilio para habilitar Super SIM en tu cuenta'
+    }, status=400)
+
+def created_esim(sim, data):
+    """Respuesta de creación a partir de la SIM devuelta por Twilio"""
+    return {
+        'success': True,
+        'message': 'eSIM creada exitosamente',
+        'sim_sid': sim.sid,
+        'sim_unique_name': getattr(sim, 'unique_name', f'hablaris_{sim.sid[-8:]}'),
+        'status': sim.status,
+        'test_mode': False,
+        'details': {
+            'country': data.get('country', 'N/A'),
+            'data_plan': data.get('data_plan', 'N/A'),
+            'customer_email': data.get('email', 'N/A')
+        },
+        'qr_code_url': f"https://api.qrserver.com/v1/create-qr-code/?size=300x300&data=LPA:1${sim.sid}",
+        'activation_code': f"LPA:1${sim.sid}",
+        'next_steps': [
+            "Escanea el código QR con tu dispositivo",
+            "O ingresa el código de activación manualmente",
+            "La eSIM se activará automáticamente"
+        ]
+    }
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def create_esim(request):
     """Crear una eSIM de prueba con Twilio"""
     try:
-        data = json.loads(request.body)
+        data = json_codec.loads(request.body)
         credentials = load_twilio_credentials()
         
         # Verificar si estamos en modo test
         if credentials.get('TWILIO_TEST_MODE') == 'true':
-            # Simular creación exitosa de eSIM
-            import random
-            import string
+            return JsonResponse(simulated_esim(data))
+        
+        if not credentials.get('TWILIO_ACCOUNT_SID') or not credentials.get('TWILIO_AUTH_TOKEN'):
+            return JsonResponse({
+                'success': False,
+                'error': 'Credenciales de Twilio no configuradas'
+            }, status=400)
+        
+        try:
+            account_sid = credentials['TWILIO_ACCOUNT_SID']
+            client = twilio_client_pool.get_client(
+                account_sid, 
+                credentials['TWILIO_AUTH_TOKEN']
+            )
             
-            sim_id = 'DE' + ''.join(random.choices(string.digits + string.ascii_uppercase, k=32))
-            unique_name = f"hablaris_test_{data.get('email', 'test')}_{random.randint(1000, 9999)}"
+            # Crear SIM real con Twilio Super SIM usando Fleet
+            try:
+                sim = create_fleet_sim(client, account_sid, credentials.get('TWILIO_SUPERSIM_FLEET_SID', ''))
+            except Exception as fleet_error:
+                return fleet_error_response(fleet_error)
             
+            return JsonResponse(created_esim(sim, data))
+            
+        except ImportError:
             return JsonResponse({
-                'success': True,
-                'message': 'eSIM creada exitosamente (MODO TEST)',
-                'sim_sid': sim_id,
-                'unique_name': unique_name,
-                'status': 'active',
+                'success': False,
+                'error': 'Librería Twilio no instalada'
+            }, status=500)
+            
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': f'Error al crear eSIM: {str(e)}',
                 'test_mode': True,
-                'qr_code': f"data:text/plain;base64,SIMULADO_QR_{sim_id}",
-                'details': {
-                    'country': data.get('country', 'N/A'),
-                    'data_plan': data.get('data_plan', 'N/A'),
-                    'customer_email': data.get('email', 'N/A'),
-                    'customer_name': data.get('customer_name', 'Test User')
-                },
-                'note': '🧪 Esta es una eSIM simulada - NO es real'
-            })
+                'suggestion': 'Verifica que tienes permisos para Super SIM en tu cuenta Twilio'
+            }, status=400)
+            
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'JSON inválido en el request'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Error interno: {str(e)}'
+        }, status=500)
+
+async def run_in_twilio_pool(func, *args):
+    """Ejecutar una llamada bloqueante del SDK en el pool acotado sin bloquear el event loop"""
+    return await asyncio.wrap_future(twilio_client_pool.submit(func, *args))
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def create_esim_async(request):
+    """Crear una eSIM con Twilio sin bloquear el worker ASGI mientras responde Twilio"""
+    try:
+        data = json_codec.loads(request.body)
+        credentials = load_twilio_credentials()
+        
+        if credentials.get('TWILIO_TEST_MODE') == 'true':
+            return JsonResponse(simulated_esim(data))
         
         if not credentials.get('TWILIO_ACCOUNT_SID') or not credentials.get('TWILIO_AUTH_TOKEN'):
             return JsonResponse({
@@ -404,66 +498,20 @@ def create_esim(request):
             }, status=400)
         
         try:
-            from twilio.rest import Client
-            
-            client = Client(
-                credentials['TWILIO_ACCOUNT_SID'], 
+            account_sid = credentials['TWILIO_ACCOUNT_SID']
+            client = twilio_client_pool.get_client(
+                account_sid, 
                 credentials['TWILIO_AUTH_TOKEN']
             )
             
-            # Crear SIM real con Twilio Super SIM usando Fleet
             try:
-                # Primero, intentar crear o usar una fleet existente
-                fleets = client.supersim.v1.fleets.list(limit=1)
-                
-                if fleets:
-                    fleet_sid = fleets[0].sid
-                    print(f"Usando fleet existente: {fleet_sid}")
-                else:
-                    # Crear nueva fleet
-                    fleet = client.supersim.v1.fleets.create(
-                        unique_name="hablaris_fleet",
-                        data_enabled=True,
-                        data_limit=1073741824  # 1GB en bytes
-                    )
-                    fleet_sid = fleet.sid
-                    print(f"Fleet creada: {fleet_sid}")
-                
-                # Ahora crear la SIM asociada a la fleet
-                sim = client.supersim.v1.sims.create(
-                    fleet=fleet_sid
+                sim = await run_in_twilio_pool(
+                    create_fleet_sim, client, account_sid, credentials.get('TWILIO_SUPERSIM_FLEET_SID', '')
                 )
-                
             except Exception as fleet_error:
-                # Si falla con fleet, probar sin parámetros (para cuentas trial)
-                print(f"Error con fleet: {fleet_error}")
-                return JsonResponse({
-                    'success': False,
-                    'error': f'Error: Tu cuenta Twilio trial no tiene permisos para Super SIM o necesita configuración adicional',
-                    'twilio_error': str(fleet_error),
-                    'solution': 'Contacta soporte de Twilio para habilitar Super SIM en tu cuenta'
-                }, status=400)
+                return fleet_error_response(fleet_error)
             
-            return JsonResponse({
-                'success': True,
-                'message': 'eSIM creada exitosamente',
-                'sim_sid': sim.sid,
-                'sim_unique_name': getattr(sim, 'unique_name', f'hablaris_{sim.sid[-8:]}'),
-                'status': sim.status,
-                'test_mode': False,
-                'details': {
-                    'country': data.get('country', 'N/A'),
-                    'data_plan': data.get('data_plan', 'N/A'),
-                    'customer_email': data.get('email', 'N/A')
-                },
-                'qr_code_url': f"https://api.qrserver.com/v1/create-qr-code/?size=300x300&data=LPA:1${sim.sid}",
-                'activation_code': f"LPA:1${sim.sid}",
-                'next_steps': [
-                    "Escanea el código QR con tu dispositivo",
-                    "O ingresa el código de activación manualmente",
-                    "La eSIM se activará automáticamente"
-                ]
-            })
+            return JsonResponse(created_esim(sim, data))
             
         except ImportError:
             return JsonResponse({
@@ -490,6 +538,50 @@ def create_esim(request):
             'error': f'Error interno: {str(e)}'
         }, status=500)
 
+def simulated_usage(sim_sid):
+    """Datos de uso simulados (modo test)"""
+    import random
+    from datetime import datetime, timedelta
+    
+    return {
+        'success': True,
+        'test_mode': True,
+        'sim_info': {
+            'sid': sim_sid,
+            'unique_name': f'hablaris_test_sim_{sim_sid[-8:]}',
+            'status': 'active',
+            'date_created': str(datetime.now() - timedelta(days=random.randint(1, 30))),
+            'date_updated': str(datetime.now())
+        },
+        'usage_records': [
+            {
+                'period': f'2025-0{i+1}-01',
+                'download': random.randint(50000000, 500000000),  # bytes
+                'upload': random.randint(5000000, 50000000),     # bytes
+                'download_mb': round(random.uniform(50, 500), 2),
+                'upload_mb': round(random.uniform(5, 50), 2)
+            } for i in range(3)
+        ],
+        'total_records': 3,
+        'note': '🧪 Datos simulados - NO reales'
+    }
+
+def sim_usage(sim, usage_records):
+    """Respuesta de uso a partir de la SIM y sus registros"""
+    return {
+        'success': True,
+        'test_mode': False,
+        'sim_info': {
+            'sid': sim.sid,
+            'unique_name': sim.unique_name,
+            'status': sim.status,
+            'date_created': str(sim.date_created),
+            'date_updated': str(sim.date_updated)
+        },
+        'usage_records': usage_records,
+        'total_records': len(usage_records)
+    }
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def check_usage(request, sim_sid):
@@ -499,32 +591,55 @@ def check_usage(request, sim_sid):
         
         # Verificar si estamos en modo test
         if credentials.get('TWILIO_TEST_MODE') == 'true':
-            # Simular datos de uso
-            import random
-            from datetime import datetime, timedelta
+            return JsonResponse(simulated_usage(sim_sid))
+        
+        if not credentials.get('TWILIO_ACCOUNT_SID') or not credentials.get('TWILIO_AUTH_TOKEN'):
+            return JsonResponse({
+                'success': False,
+                'error': 'Credenciales de Twilio no configuradas'
+            }, status=400)
+        
+        try:
+            client = twilio_client_pool.get_client(
+                credentials['TWILIO_ACCOUNT_SID'], 
+                credentials['TWILIO_AUTH_TOKEN']
+            )
+            
+            # Obtener la SIM y sus registros de uso en paralelo
+            sim_future = twilio_client_pool.submit(client.supersim.v1.sims(sim_sid).fetch)
+            usage_future = twilio_client_pool.submit(stream_usage_records, client, sim_sid, 10)
             
+            timeout = twilio_client_pool.request_timeout
+            return JsonResponse(sim_usage(sim_future.result(timeout), usage_future.result(timeout)))
+            
+        except ImportError:
             return JsonResponse({
-                'success': True,
-                'test_mode': True,
-                'sim_info': {
-                    'sid': sim_sid,
-                    'unique_name': f'hablaris_test_sim_{sim_sid[-8:]}',
-                    'status': 'active',
-                    'date_created': str(datetime.now() - timedelta(days=random.randint(1, 30))),
-                    'date_updated': str(datetime.now())
-                },
-                'usage_records': [
-                    {
-                        'period': f'2025-0{i+1}-01',
-                        'download': random.randint(50000000, 500000000),  # bytes
-                        'upload': random.randint(5000000, 50000000),     # bytes
-                        'download_mb': round(random.uniform(50, 500), 2),
-                        'upload_mb': round(random.uniform(5, 50), 2)
-                    } for i in range(3)
-                ],
-                'total_records': 3,
-                'note': '🧪 Datos simulados - NO reales'
-            })
+                'success': False,
+                'error': 'Librería Twilio no instalada'
+            }, status=500)
+            
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': f'Error al consultar uso: {str(e)}',
+                'sim_sid': sim_sid
+            }, status=400)
+            
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Error interno: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def check_usage_async(request, sim_sid):
+    """Consultar uso de una eSIM sin bloquear el worker ASGI"""
+    try:
+        credentials = load_twilio_credentials()
+        
+        if credentials.get('TWILIO_TEST_MODE') == 'true':
+            return JsonResponse(simulated_usage(sim_sid))
         
         if not credentials.get('TWILIO_ACCOUNT_SID') or not credentials.get('TWILIO_AUTH_TOKEN'):
             return JsonResponse({
@@ -533,43 +648,18 @@ def check_usage(request, sim_sid):
             }, status=400)
         
         try:
-            from twilio.rest import Client
-            
-            client = Client(
+            client = twilio_client_pool.get_client(
                 credentials['TWILIO_ACCOUNT_SID'], 
                 credentials['TWILIO_AUTH_TOKEN']
             )
             
-            # Obtener información de la SIM
-            sim = client.supersim.v1.sims(sim_sid).fetch()
-            
-            # Obtener registros de uso
-            usage_records = client.supersim.v1.usage_records.list(
-                sim_sid=sim_sid,
-                limit=10
+            # SIM y registros de uso en paralelo; el loop atiende otros requests mientras tanto
+            sim, usage_records = await asyncio.gather(
+                run_in_twilio_pool(client.supersim.v1.sims(sim_sid).fetch),
+                run_in_twilio_pool(stream_usage_records, client, sim_sid, 10)
             )
             
-            return JsonResponse({
-                'success': True,
-                'test_mode': False,
-                'sim_info': {
-                    'sid': sim.sid,
-                    'unique_name': sim.unique_name,
-                    'status': sim.status,
-                    'date_created': str(sim.date_created),
-                    'date_updated': str(sim.date_updated)
-                },
-                'usage_records': [
-                    {
-                        'period': str(record.period),
-                        'download': record.download,
-                        'upload': record.upload,
-                        'download_mb': round(record.download / 1024 / 1024, 2),
-                        'upload_mb': round(record.upload / 1024 / 1024, 2)
-                    } for record in usage_records
-                ],
-                'total_records': len(usage_records)
-            })
+            return JsonResponse(sim_usage(sim, usage_records))
             
         except ImportError:
             return JsonResponse({
@@ -590,6 +680,23 @@ def check_usage(request, sim_sid):
             'error': f'Error interno: {str(e)}'
         }, status=500)
 
+def stream_usage_records(client, sim_sid, limit, page_size=50):
+    """Paginar los registros de uso de una SIM con streaming del SDK"""
+    records = []
+    for record in client.supersim.v1.usage_records.stream(
+        sim=sim_sid,
+        limit=limit,
+        page_size=min(limit, page_size)
+    ):
+        records.append({
+            'period': str(record.period),
+            'download': record.download,
+            'upload': record.upload,
+            'download_mb': round(record.download / 1024 / 1024, 2),
+            'upload_mb': round(record.upload / 1024 / 1024, 2)
+        })
+    return records
+
 # API Root para verificación
 @csrf_exempt
 @require_http_methods(["GET"])
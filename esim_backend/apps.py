@@ -1,3 +1,5 @@
+from importlib import import_module
+
 from django.apps import AppConfig
 
 
@@ -5,3 +7,12 @@ class EsimBackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'esim_backend'
     verbose_name = 'eSIM Backend Principal'
+
+    def ready(self):
+        # Cargar la configuración de proveedores una sola vez al arrancar
+        from .provider_config import provider_config
+        provider_config.reload()
+
+        # Registrar los receivers de invalidación del cache de autenticación
+        # (logout, cambios de usuario/token)
+        import_module(f'{self.name}.authentication')
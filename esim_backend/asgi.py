@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
 
 application = get_asgi_application()
+
+# Imports, URLs y páginas listos antes del primer request (ver esim_backend/warmup.py)
+from esim_backend.warmup import warm_up_on_boot  # noqa: E402
+
+warm_up_on_boot()
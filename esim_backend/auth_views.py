@@ -5,23 +5,56 @@ Incluye autenticación social con Google y Apple
 
 import os
 import json
+import math
 import requests
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from . import json_codec
+from .authentication import aauthenticate_offloaded, amake_password
+from .id_tokens import IDTokenError, external_timeout, http_session, user_for_claims, verify_id_token
+from .json_codec import JsonResponse
+from .throttling import client_ip, login_account_bucket, login_ip_bucket
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import alogin, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 import logging
 
 logger = logging.getLogger(__name__)
 
+async def throttle_response(request, email=None):
+    """429 si la IP o la cuenta agotaron su bucket; se comprueba antes de hashear"""
+    buckets = [(login_ip_bucket, client_ip(request))]
+    if email:
+        buckets.append((login_account_bucket, email.lower()))
+    for bucket, identity in buckets:
+        allowed, retry_after = await sync_to_async(bucket.consume)(identity)
+        if not allowed:
+            retry_after = max(1, math.ceil(retry_after))
+            logger.warning(f"Throttling {bucket.name}: reintentar en {retry_after}s")
+            response = JsonResponse({
+                'success': False,
+                'error': 'Demasiados intentos, inténtalo más tarde'
+            }, status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+    return None
+
+def user_payload(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }
+
 @csrf_exempt
 @require_http_methods(["POST"])
-def login_view(request):
+async def login_view(request):
     """Login tradicional con email/password"""
     try:
-        data = json.loads(request.body)
+        data = json_codec.loads(request.body)
         email = data.get('email')
         password = data.get('password')
         
@@ -31,34 +64,23 @@ def login_view(request):
                 'error': 'Email y contraseña requeridos'
             }, status=400)
         
-        # Buscar usuario por email
-        try:
-            user = User.objects.get(email=email)
-            username = user.username
-        except User.DoesNotExist:
-            return JsonResponse({
-                'success': False,
-                'error': 'Usuario no encontrado'
-            }, status=401)
+        throttled = await throttle_response(request, email)
+        if throttled is not None:
+            return throttled
         
-        # Autenticar
-        user = authenticate(request, username=username, password=password)
+        # Una sola consulta por email (EmailBackend); el hash va al pool acotado
+        user = await aauthenticate_offloaded(request, email=email, password=password)
         
         if user is not None:
-            login(request, user)
+            await alogin(request, user)
             
             return JsonResponse({
                 'success': True,
-                'user': {
-                    'id': user.id,
-                    'email': user.email,
-                    'username': user.username,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                },
+                'user': user_payload(user),
                 'message': 'Login exitoso'
             })
         else:
+            # Mismo error si el email no existe, para no revelar cuentas
             return JsonResponse({
                 'success': False,
                 'error': 'Credenciales inválidas'
@@ -78,10 +100,10 @@ def login_view(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def register_view(request):
+async def register_view(request):
     """Registro de nuevos usuarios"""
     try:
-        data = json.loads(request.body)
+        data = json_codec.loads(request.body)
         email = data.get('email')
         password = data.get('password')
         first_name = data.get('first_name', '')
@@ -93,35 +115,33 @@ def register_view(request):
                 'error': 'Email y contraseña requeridos'
             }, status=400)
         
+        throttled = await throttle_response(request)
+        if throttled is not None:
+            return throttled
+        
         # Verificar si el usuario ya existe
-        if User.objects.filter(email=email).exists():
+        email = User.objects.normalize_email(email)
+        if await User.objects.filter(email=email).aexists():
             return JsonResponse({
                 'success': False,
                 'error': 'Ya existe un usuario con este email'
             }, status=400)
         
-        # Crear usuario
-        username = email  # Usar email como username
-        user = User.objects.create_user(
-            username=username,
+        # Crear usuario (email como username), hasheando una sola vez en el pool
+        user = await User.objects.acreate(
+            username=email,
             email=email,
-            password=password,
+            password=await amake_password(password),
             first_name=first_name,
             last_name=last_name
         )
         
         # Auto-login después del registro
-        login(request, user)
+        await alogin(request, user)
         
         return JsonResponse({
             'success': True,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'username': user.username,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-            },
+            'user': user_payload(user),
             'message': 'Registro exitoso'
         })
         
@@ -212,38 +232,26 @@ def google_callback(request):
             'redirect_uri': os.getenv('GOOGLE_REDIRECT_URI', 'http://localhost:8000/api/auth/google/callback')
         }
         
-        token_response = requests.post(token_url, data=token_data)
-        token_json = token_response.json()
+        token_response = http_session.post(token_url, data=token_data, timeout=external_timeout())
+        token_json = json_codec.loads(token_response.content)
         
-        if 'access_token' not in token_json:
+        if 'id_token' not in token_json:
             return JsonResponse({
                 'success': False,
                 'error': 'Error obteniendo token de Google'
             }, status=400)
         
-        # Obtener info del usuario de Google
-        user_info_url = f"https://www.googleapis.com/oauth2/v2/userinfo?access_token={token_json['access_token']}"
-        user_response = requests.get(user_info_url)
-        user_data = user_response.json()
-        
-        # Crear o buscar usuario
-        email = user_data.get('email')
-        
-        if not email:
+        # El id_token ya trae email y nombre: se verifica aquí, sin llamar a userinfo
+        try:
+            claims = verify_id_token('google', token_json['id_token'])
+            user = user_for_claims(claims)
+        except IDTokenError as e:
+            logger.warning(f"ID token de Google rechazado: {e}")
             return JsonResponse({
                 'success': False,
-                'error': 'No se pudo obtener email de Google'
+                'error': 'No se pudo verificar la identidad con Google'
             }, status=400)
         
-        user, created = User.objects.get_or_create(
-            email=email,
-            defaults={
-                'username': email,
-                'first_name': user_data.get('given_name', ''),
-                'last_name': user_data.get('family_name', ''),
-            }
-        )
-        
         # Login automático
         login(request, user)
         
@@ -252,17 +260,17 @@ def google_callback(request):
         
         return JsonResponse({
             'success': True,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'username': user.username,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-            },
+            'user': user_payload(user),
             'redirect_url': f'{frontend_url}/dashboard-simple',
             'message': 'Login con Google exitoso'
         })
         
+    except requests.RequestException as e:
+        logger.error(f"Google no disponible: {e}")
+        return JsonResponse({
+            'success': False,
+            'error': 'Google no responde, inténtalo de nuevo'
+        }, status=502)
     except Exception as e:
         logger.error(f"Error en Google callback: {e}")
         return JsonResponse({
@@ -271,18 +279,42 @@ def google_callback(request):
         }, status=500)
 
 @csrf_exempt
-@require_http_methods(["GET"])  
+@require_http_methods(["POST"])
 def apple_auth(request):
-    """Autenticación con Apple (placeholder)"""
+    """Sign in with Apple: la app envía el id_token (y el nombre, solo la primera vez)"""
     try:
-        # Por ahora retornamos una respuesta placeholder
-        # En producción necesitarás configurar Apple Sign In
+        data = json_codec.loads(request.body)
+        id_token = data.get('id_token')
+        
+        if not id_token:
+            return JsonResponse({
+                'success': False,
+                'error': 'id_token requerido'
+            }, status=400)
+        
+        try:
+            claims = verify_id_token('apple', id_token, nonce=data.get('nonce'))
+            user = user_for_claims(claims, data.get('first_name', ''), data.get('last_name', ''))
+        except IDTokenError as e:
+            logger.warning(f"ID token de Apple rechazado: {e}")
+            return JsonResponse({
+                'success': False,
+                'error': 'No se pudo verificar la identidad con Apple'
+            }, status=401)
+        
+        login(request, user)
+        
         return JsonResponse({
-            'success': False,
-            'error': 'Apple Sign In en desarrollo',
-            'message': 'Esta funcionalidad estará disponible próximamente'
-        }, status=501)
+            'success': True,
+            'user': user_payload(user),
+            'message': 'Login con Apple exitoso'
+        })
         
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'JSON inválido'
+        }, status=400)
     except Exception as e:
         logger.error(f"Error en Apple auth: {e}")
         return JsonResponse({
@@ -0,0 +1,270 @@
+"""
+Autenticación con cache
+
+Los requests autenticados (la app móvil consulta eSIMs muy a menudo) hacían
+siempre una consulta de token o sesión más otra del usuario. Aquí token ->
+usuario y sesión -> usuario se sirven del cache con un TTL corto
+(AUTH_CACHE_TIMEOUT) y se invalidan explícitamente al hacer logout, cambiar
+la contraseña, desactivar el usuario o borrar el token. Del usuario se
+guardan sus campos sin el hash de contraseña.
+
+El hash de contraseñas (PBKDF2, decenas de ms de CPU) se ejecuta en un pool
+de hilos acotado (PASSWORD_HASHING_WORKERS) desde las vistas async, para
+que una ráfaga de logins no ocupe todos los hilos del worker.
+"""
+
+import asyncio
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Case, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_KEY = 'auth:user:{user_id}'
+TOKEN_CACHE_KEY = 'auth:token:{digest}'
+
+
+def auth_cache_timeout() -> int:
+    return int(getattr(settings, 'AUTH_CACHE_TIMEOUT', 60))
+
+
+def token_cache_key(key: str) -> str:
+    # El token nunca se guarda en claro como clave de cache
+    return TOKEN_CACHE_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+
+def cache_user(user) -> None:
+    """Guardar en el cache los campos del usuario sin el hash de contraseña.
+
+    En su lugar va el hash de sesión (HMAC de la contraseña), con el que
+    get_session_user valida la sesión sin cargar la contraseña.
+    """
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields if field.attname != 'password'
+    }
+    data = {'db': user._state.db, 'fields': fields,
+            'session_auth_hash': user.get_session_auth_hash()}
+    cache.set(USER_CACHE_KEY.format(user_id=user.pk), data, auth_cache_timeout())
+
+
+def restore_user(data):
+    """Usuario reconstruido desde el cache con la contraseña como campo diferido:
+    leerla (check_password, get_session_auth_hash) la consulta y save() no la
+    sobreescribe"""
+    UserModel = get_user_model()
+    fields = data['fields']
+    return UserModel.from_db(data['db'], list(fields), list(fields.values()))
+
+
+def get_cached_user(user_id):
+    """Usuario por id desde el cache o, si no está, desde la base de datos"""
+    data = cache.get(USER_CACHE_KEY.format(user_id=user_id))
+    if isinstance(data, dict):
+        return restore_user(data)
+    UserModel = get_user_model()
+    try:
+        user = UserModel._default_manager.get(pk=user_id)
+    except UserModel.DoesNotExist:
+        return None
+    cache_user(user)
+    return user
+
+
+def invalidate_user(user_id) -> None:
+    cache.delete(USER_CACHE_KEY.format(user_id=user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend que deja en el cache los usuarios que carga para una sesión"""
+
+    def get_user(self, user_id):
+        # Ruta sin cache de get_session_user: usuario completo, contraseña incluida
+        user = super().get_user(user_id)
+        if user is not None:
+            cache_user(user)
+        return user
+
+
+def get_session_user(request):
+    """django.contrib.auth.get_user con el usuario del cache.
+
+    Si el hash de sesión coincide con el cacheado no hace falta la contraseña;
+    si no hay entrada o no coincide (contraseña cambiada, SECRET_KEY_FALLBACKS)
+    se sigue la ruta normal, que carga el usuario y comprueba la sesión.
+    """
+    session = request.session
+    backend_path = session.get(auth.BACKEND_SESSION_KEY)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    if session_hash and auth.SESSION_KEY in session and backend_path in settings.AUTHENTICATION_BACKENDS:
+        backend = auth.load_backend(backend_path)
+        if isinstance(backend, CachedModelBackend):
+            user_id = get_user_model()._meta.pk.to_python(session[auth.SESSION_KEY])
+            data = cache.get(USER_CACHE_KEY.format(user_id=user_id))
+            if isinstance(data, dict) and constant_time_compare(session_hash, data['session_auth_hash']):
+                user = restore_user(data)
+                if backend.user_can_authenticate(user):
+                    return user
+    return auth.get_user(request)
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware que resuelve request.user con get_session_user"""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: cached_request_user(request))
+        request.auser = partial(acached_request_user, request)
+
+
+def cached_request_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_session_user(request)
+    return request._cached_user
+
+
+async def acached_request_user(request):
+    if not hasattr(request, '_acached_user'):
+        # El cache en base de datos no puede usarse desde el event loop
+        request._acached_user = await sync_to_async(get_session_user)(request)
+    return request._acached_user
+
+
+class EmailBackend(CachedModelBackend):
+    """Login por email (o username) con una sola consulta indexada"""
+
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        if email is None and username and '@' in username:
+            email = username
+        if email is None:
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        if password is None:
+            return None
+
+        UserModel = get_user_model()
+        # Una sola consulta (índices de username y auth_user_email_idx). Un
+        # username también puede contener '@': si existe, gana sobre el email;
+        # el email no es único en auth_user, entre ellos gana el más antiguo
+        lookup, priority = Q(email=email), Value(1)
+        if username:
+            username_match = Q(**{UserModel.USERNAME_FIELD: username})
+            lookup |= username_match
+            priority = Case(When(username_match, then=Value(0)), default=Value(1))
+        user = UserModel._default_manager.filter(lookup).order_by(priority, 'pk').first()
+        if user is None:
+            # Mismo coste que un login válido para no revelar qué emails existen
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+
+_hashing_lock = threading.Lock()
+_hashing_executor = None
+
+
+def hashing_executor() -> ThreadPoolExecutor:
+    """Pool acotado para el hash de contraseñas"""
+    global _hashing_executor
+    if _hashing_executor is None:
+        with _hashing_lock:
+            if _hashing_executor is None:
+                _hashing_executor = ThreadPoolExecutor(
+                    max_workers=int(getattr(settings, 'PASSWORD_HASHING_WORKERS', 4)),
+                    thread_name_prefix='password-hashing'
+                )
+    return _hashing_executor
+
+
+def _call_with_connections(func, *args, **kwargs):
+    # Hilos fuera del ciclo de request: respetar CONN_MAX_AGE/health checks a mano
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_hashing(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hashing_executor(), lambda: _call_with_connections(func, *args, **kwargs)
+    )
+
+
+async def aauthenticate_offloaded(request=None, **credentials):
+    """authenticate() (consulta + hash) en el pool de hashing"""
+    return await run_hashing(authenticate, request, **credentials)
+
+
+async def amake_password(password: str) -> str:
+    return await run_hashing(make_password, password)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication de DRF con token -> usuario en cache"""
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user_id = cache.get(cache_key)
+
+        if user_id is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, user.pk, auth_cache_timeout())
+            cache_user(user)
+            return user, token
+
+        user = get_cached_user(user_id)
+        if user is None:
+            cache.delete(cache_key)
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        # request.auth sigue siendo un Token (sin la fecha de creación)
+        return user, self.get_model()(key=key, user=user)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_saved_user(sender, instance, **kwargs):
+    """Cambio de contraseña, desactivación o cualquier otra edición del usuario"""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    cache.delete(token_cache_key(instance.key))
@@ -0,0 +1,455 @@
+"""
+Snapshot binario del catálogo compartido entre workers
+
+Países, regiones y planes se escriben en un archivo compacto y versionado
+que cada worker mapea en memoria de solo lectura (mmap): las páginas son del
+page cache del sistema, así que N workers comparten una sola copia y un
+worker nuevo tiene el catálogo al instante, sin consultas ni caches por
+proceso.
+
+Formato (orden de bytes nativo, marcado en la cabecera):
+
+    cabecera    MAGIC, formato, flags, versión (ns), sha256 del cuerpo, nº de columnas
+    directorio  por columna: nombre, typecode de array, offset y nº de elementos
+    cuerpo      columnas (arrays de un solo tipo) alineadas a 8 bytes
+
+Los textos van en una tabla de strings (offsets + UTF-8 concatenado) y las
+columnas guardan su índice. Los planes están ordenados por región y precio;
+region.plans y region.members son offsets estilo CSR hacia sus filas.
+
+build_snapshot() escribe un archivo temporal y lo renombra (os.replace), así
+que un lector nunca ve un archivo a medias. catalog_store comprueba con
+os.stat como mucho cada CATALOG_SNAPSHOT_CHECK_INTERVAL segundos si cambió y
+cambia de snapshot de forma atómica; si el actual tiene más de
+CATALOG_SNAPSHOT_MAX_AGE segundos, un solo worker (lock file) lo regenera
+en segundo plano y los demás lo recogen en su siguiente comprobación.
+
+Lo leen las vistas /api/catalog/ (views.catalog_*); sin archivo usan
+query_countries/query_regions/query_plans, que devuelven lo mismo desde la
+base de datos.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import logging
+from array import array
+from decimal import Decimal
+from mmap import ACCESS_READ, mmap
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'HBCS'
+FORMAT_VERSION = 1
+FLAG_LITTLE_ENDIAN = 1
+
+HEADER = struct.Struct('<4sHHQ32sI')
+DIRECTORY_ENTRY = struct.Struct('<24sc7xQQ')
+ALIGNMENT = 8
+
+# Un lock más antiguo que esto es de un proceso que murió a medias
+STALE_LOCK_SECONDS = 300
+
+
+class SnapshotError(Exception):
+    """Archivo de snapshot inválido o de otro formato"""
+
+
+def native_flags() -> int:
+    return FLAG_LITTLE_ENDIAN if sys.byteorder == 'little' else 0
+
+
+class StringTable:
+    """Textos deduplicados -> índice"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.offsets = array('I', [0])
+        self.data = bytearray()
+
+    def add(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.offsets) - 1
+            self.data += value.encode('utf-8')
+            self.offsets.append(len(self.data))
+        return position
+
+
+def collect_columns() -> Dict[str, array]:
+    """Columnas del catálogo a partir de la base de datos"""
+    from .models import Country, DataPlan, Region
+
+    strings = StringTable()
+    columns = {name: array(code) for name, code in (
+        ('country.id', 'q'), ('country.code', 'I'), ('country.name', 'I'),
+        ('country.flag', 'I'), ('country.popular', 'B'),
+        ('region.id', 'q'), ('region.name', 'I'), ('region.members', 'I'), ('region.member_start', 'I'),
+        ('region.plans', 'I'),
+        ('plan.id', 'q'), ('plan.region', 'I'), ('plan.data_gb', 'i'), ('plan.days', 'i'), ('plan.price', 'q'),
+    )}
+
+    country_rows = {}
+    for row, (pk, code, name, flag, popular) in enumerate(
+        Country.objects.order_by('code').values_list('id', 'code', 'name', 'flag', 'is_popular')
+    ):
+        country_rows[pk] = row
+        columns['country.id'].append(pk)
+        columns['country.code'].append(strings.add(code))
+        columns['country.name'].append(strings.add(name))
+        columns['country.flag'].append(strings.add(flag))
+        columns['country.popular'].append(1 if popular else 0)
+
+    members: Dict[int, List[int]] = {}
+    for region_id, country_id in Region.countries.through.objects.values_list('region_id', 'country_id'):
+        members.setdefault(region_id, []).append(country_rows[country_id])
+
+    region_rows = {}
+    columns['region.member_start'].append(0)
+    for row, (pk, name) in enumerate(Region.objects.order_by('id').values_list('id', 'name')):
+        region_rows[pk] = row
+        columns['region.id'].append(pk)
+        columns['region.name'].append(strings.add(name))
+        columns['region.members'].extend(sorted(members.get(pk, [])))
+        columns['region.member_start'].append(len(columns['region.members']))
+
+    plans = sorted(
+        DataPlan.objects.values_list('id', 'region_id', 'data_gb', 'duration_days', 'price'),
+        key=lambda plan: (region_rows[plan[1]], plan[4], plan[0])
+    )
+    counts = [0] * len(region_rows)
+    for pk, region_id, data_gb, days, price in plans:
+        counts[region_rows[region_id]] += 1
+        columns['plan.id'].append(pk)
+        columns['plan.region'].append(region_rows[region_id])
+        columns['plan.data_gb'].append(data_gb)
+        columns['plan.days'].append(days)
+        columns['plan.price'].append(int(price * 100))
+    columns['region.plans'].append(0)
+    for count in counts:
+        columns['region.plans'].append(columns['region.plans'][-1] + count)
+
+    columns['strings.offsets'] = strings.offsets
+    columns['strings.data'] = array('B', bytes(strings.data))
+    return columns
+
+
+def encode(columns: Dict[str, array], version: int) -> bytes:
+    """Archivo completo: cabecera, directorio y cuerpo"""
+    body_start = HEADER.size + DIRECTORY_ENTRY.size * len(columns)
+    body_start += -body_start % ALIGNMENT
+    directory = []
+    body = bytearray()
+    for name, values in columns.items():
+        body += b'\0' * (-len(body) % ALIGNMENT)
+        directory.append(DIRECTORY_ENTRY.pack(
+            name.encode('ascii'), values.typecode.encode('ascii'), body_start + len(body), len(values)
+        ))
+        body += values.tobytes()
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, native_flags(), version, hashlib.sha256(body).digest(), len(columns)
+    )
+    prefix = header + b''.join(directory)
+    return prefix + b'\0' * (body_start - len(prefix)) + bytes(body)
+
+
+def build_snapshot(path: Optional[str] = None) -> 'CatalogSnapshot':
+    """Escribe un snapshot nuevo de forma atómica y lo devuelve abierto"""
+    path = path or snapshot_path()
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    content = encode(collect_columns(), time.time_ns())
+
+    fd, temporary = tempfile.mkstemp(prefix='.catalog-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            output.write(content)
+            output.flush()
+            os.fsync(output.fileno())
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+    return CatalogSnapshot(path)
+
+
+class CatalogSnapshot:
+    """Vista de solo lectura sobre un archivo de snapshot mapeado en memoria"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as source:
+            self._mmap = mmap(source.fileno(), 0, access=ACCESS_READ)
+        view = memoryview(self._mmap)
+        if len(view) < HEADER.size:
+            raise SnapshotError(f'{path}: archivo truncado')
+        magic, fmt, flags, self.version, checksum, count = HEADER.unpack_from(view)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise SnapshotError(f'{path}: formato desconocido ({magic!r} v{fmt})')
+        if flags != native_flags():
+            raise SnapshotError(f'{path}: escrito con otro orden de bytes')
+
+        self.columns = {}
+        body_start = None
+        for index in range(count):
+            raw_name, typecode, offset, length = DIRECTORY_ENTRY.unpack_from(
+                view, HEADER.size + index * DIRECTORY_ENTRY.size
+            )
+            typecode = typecode.decode('ascii')
+            size = array(typecode).itemsize * length
+            body_start = offset if body_start is None else min(body_start, offset)
+            self.columns[raw_name.rstrip(b'\0').decode('ascii')] = view[offset:offset + size].cast(typecode)
+        if body_start is not None and hashlib.sha256(view[body_start:]).digest() != checksum:
+            raise SnapshotError(f'{path}: checksum incorrecto')
+
+        self.path = path
+        self.size = len(view)
+        self._strings_offsets = self.columns['strings.offsets']
+        self._strings_data = self.columns['strings.data']
+        self._region_rows = {region_id: row for row, region_id in enumerate(self.columns['region.id'])}
+
+    def string(self, index: int) -> str:
+        start, end = self._strings_offsets[index], self._strings_offsets[index + 1]
+        return bytes(self._strings_data[start:end]).decode('utf-8')
+
+    def age(self) -> float:
+        return time.time() - self.version / 1e9
+
+    # ----- Países y regiones -----
+
+    def country(self, row: int) -> dict:
+        columns = self.columns
+        return {
+            'id': columns['country.id'][row],
+            'code': self.string(columns['country.code'][row]),
+            'name': self.string(columns['country.name'][row]),
+            'flag': self.string(columns['country.flag'][row]),
+            'is_popular': bool(columns['country.popular'][row]),
+        }
+
+    def countries(self, popular: Optional[bool] = None) -> List[dict]:
+        flags = self.columns['country.popular']
+        return [
+            self.country(row) for row in range(len(flags))
+            if popular is None or bool(flags[row]) == popular
+        ]
+
+    def find_country(self, code: str) -> Optional[dict]:
+        """Búsqueda binaria (las filas están ordenadas por código)"""
+        codes = self.columns['country.code']
+        low, high = 0, len(codes)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(codes[middle]) < code:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(codes) and self.string(codes[low]) == code:
+            return self.country(low)
+        return None
+
+    def regions(self) -> List[dict]:
+        columns = self.columns
+        start, members = columns['region.member_start'], columns['region.members']
+        return [
+            {
+                'id': columns['region.id'][row],
+                'name': self.string(columns['region.name'][row]),
+                'countries': [self.string(columns['country.code'][member])
+                              for member in members[start[row]:start[row + 1]]],
+            }
+            for row in range(len(columns['region.id']))
+        ]
+
+    # ----- Planes -----
+
+    def plans(self, region: Optional[int] = None, min_data: Optional[int] = None,
+              max_days: Optional[int] = None, max_price: Optional[Decimal] = None,
+              limit: Optional[int] = None) -> List[dict]:
+        """Planes (por región y precio) que cumplen los filtros; region es su id"""
+        columns = self.columns
+        if region is not None:
+            region_row = self._region_rows.get(region)
+            if region_row is None:
+                return []
+            first, last = columns['region.plans'][region_row], columns['region.plans'][region_row + 1]
+        else:
+            first, last = 0, len(columns['plan.id'])
+        max_cents = int(max_price * 100) if max_price is not None else None
+
+        ids, regions, data_gb, days, prices = (
+            columns['plan.id'], columns['plan.region'], columns['plan.data_gb'],
+            columns['plan.days'], columns['plan.price'],
+        )
+        region_names = columns['region.name']
+        results = []
+        for row in range(first, last):
+            if min_data is not None and data_gb[row] < min_data:
+                continue
+            if max_days is not None and days[row] > max_days:
+                continue
+            if max_cents is not None and prices[row] > max_cents:
+                continue
+            results.append({
+                'id': ids[row],
+                'region': self.string(region_names[regions[row]]),
+                'data_gb': data_gb[row],
+                'duration_days': days[row],
+                'price': Decimal(prices[row]).scaleb(-2),
+            })
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+
+# ----- Mismas consultas contra la base de datos (sin snapshot) -----
+
+def query_countries(popular: Optional[bool] = None) -> List[dict]:
+    from .models import Country
+
+    countries = Country.objects.order_by('code')
+    if popular is not None:
+        countries = countries.filter(is_popular=popular)
+    return list(countries.values('id', 'code', 'name', 'flag', 'is_popular'))
+
+
+def query_regions() -> List[dict]:
+    from .models import Region
+
+    members: Dict[int, List[str]] = {}
+    for region_id, code in Region.countries.through.objects.order_by('country__code').values_list(
+        'region_id', 'country__code'
+    ):
+        members.setdefault(region_id, []).append(code)
+    return [
+        {'id': pk, 'name': name, 'countries': members.get(pk, [])}
+        for pk, name in Region.objects.order_by('id').values_list('id', 'name')
+    ]
+
+
+def query_plans(region: Optional[int] = None, min_data: Optional[int] = None,
+                max_days: Optional[int] = None, max_price: Optional[Decimal] = None,
+                limit: Optional[int] = None) -> List[dict]:
+    from .models import DataPlan
+
+    plans = DataPlan.objects.order_by('region_id', 'price', 'id')
+    if region is not None:
+        plans = plans.filter(region_id=region)
+    if min_data is not None:
+        plans = plans.filter(data_gb__gte=min_data)
+    if max_days is not None:
+        plans = plans.filter(duration_days__lte=max_days)
+    if max_price is not None:
+        plans = plans.filter(price__lte=max_price)
+    plans = plans.values_list('id', 'region__name', 'data_gb', 'duration_days', 'price')
+    if limit is not None:
+        plans = plans[:limit]
+    return [
+        {'id': pk, 'region': region_name, 'data_gb': data_gb, 'duration_days': days, 'price': price}
+        for pk, region_name, data_gb, days, price in plans
+    ]
+
+
+def snapshot_path() -> str:
+    return getattr(settings, 'CATALOG_SNAPSHOT_PATH', '/tmp/hablaris_catalog.snapshot')
+
+
+class CatalogStore:
+    """Snapshot actual del proceso con cambio atómico cuando el archivo cambia"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._file_key = None
+        self._checked_at = 0.0
+        self._rebuilding = False
+        self._next_rebuild = 0.0
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Snapshot vigente (None si aún no hay archivo)"""
+        now = time.monotonic()
+        if now - self._checked_at >= getattr(settings, 'CATALOG_SNAPSHOT_CHECK_INTERVAL', 5):
+            self._checked_at = now
+            self._reload_if_changed()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age() > getattr(settings, 'CATALOG_SNAPSHOT_MAX_AGE', 300):
+            self._rebuild_in_background()
+        return snapshot
+
+    def refresh(self, max_age: Optional[float] = None) -> Optional[CatalogSnapshot]:
+        """Regenera el archivo si falta o es más antiguo que max_age y lo carga"""
+        self._reload_if_changed()
+        snapshot = self._snapshot
+        if snapshot is None or max_age is None or snapshot.age() > max_age:
+            build_snapshot(snapshot_path())
+            self._reload_if_changed()
+        return self._snapshot
+
+    def _reload_if_changed(self) -> None:
+        path = snapshot_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_key == self._file_key:
+            return
+        with self._lock:
+            if file_key == self._file_key:
+                return
+            try:
+                snapshot = CatalogSnapshot(path)
+            except (OSError, ValueError, SnapshotError) as e:
+                logger.error(f"Error abriendo el snapshot del catálogo: {e}")
+                return
+            # Los lectores que aún usan el anterior lo conservan hasta soltarlo
+            self._snapshot = snapshot
+            self._file_key = file_key
+            logger.info(f"Snapshot del catálogo {snapshot.version} cargado ({snapshot.size} bytes)")
+
+    def _rebuild_in_background(self) -> None:
+        with self._lock:
+            # Si otro worker tiene el lock no se reintenta en cada lectura
+            if self._rebuilding or time.monotonic() < self._next_rebuild:
+                return
+            self._rebuilding = True
+            self._next_rebuild = time.monotonic() + getattr(settings, 'CATALOG_SNAPSHOT_CHECK_INTERVAL', 5)
+        threading.Thread(target=self._rebuild, name='catalog-snapshot', daemon=True).start()
+
+    def _rebuild(self) -> None:
+        from django.db import connections
+
+        lock_path = f'{snapshot_path()}.lock'
+        try:
+            try:
+                if time.time() - os.stat(lock_path).st_mtime > STALE_LOCK_SECONDS:
+                    os.unlink(lock_path)
+            except FileNotFoundError:
+                pass
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                return  # Otro worker lo está regenerando
+            try:
+                build_snapshot(snapshot_path())
+            finally:
+                os.unlink(lock_path)
+            self._checked_at = 0.0
+        except Exception as e:
+            logger.error(f"Error regenerando el snapshot del catálogo: {e}")
+        finally:
+            connections.close_all()
+            self._rebuilding = False
+
+
+# Instancia global del snapshot del catálogo
+catalog_store = CatalogStore()
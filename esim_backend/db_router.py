@@ -0,0 +1,159 @@
+"""
+Router de base de datos con réplicas de lectura
+
+Las lecturas seguras se envían a una réplica sana (lag por debajo de
+DATABASE_REPLICA_MAX_LAG) y, si no hay ninguna, al primario. En cuanto un
+request escribe, el resto de sus lecturas se quedan en el primario para
+que vea sus propios cambios (ver ReplicaPinningMiddleware).
+"""
+
+import random
+import threading
+import time
+import logging
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+# True cuando el contexto actual (request, tarea, comando) ya escribió
+_pinned_to_primary: ContextVar[bool] = ContextVar('db_pinned_to_primary', default=False)
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_aliases() -> List[str]:
+    """Alias de DATABASES configurados como réplicas"""
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def pin_to_primary() -> None:
+    """Forzar que las lecturas del contexto actual vayan al primario"""
+    _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+class ReplicaLagMonitor:
+    """Lag de replicación por réplica, medido como mucho cada N segundos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lags: Dict[str, float] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._overrides: Dict[str, float] = {}
+        self._probe_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def check_interval(self) -> float:
+        return float(getattr(settings, 'DATABASE_REPLICA_LAG_CHECK_INTERVAL', 5))
+
+    @property
+    def max_lag(self) -> float:
+        return float(getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 5))
+
+    def override(self, alias: str, lag: Optional[float]) -> None:
+        """Fijar manualmente el lag de una réplica (None para volver a medir)"""
+        with self._lock:
+            if lag is None:
+                self._overrides.pop(alias, None)
+            else:
+                self._overrides[alias] = lag
+
+    def measure(self, alias: str) -> float:
+        """Consultar el lag real de la réplica en segundos"""
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+
+    def lag(self, alias: str) -> float:
+        if alias in self._overrides:
+            return self._overrides[alias]
+
+        now = time.monotonic()
+        if now - self._checked_at.get(alias, float('-inf')) < self.check_interval:
+            return self._lags[alias]
+
+        # Un solo request mide cada réplica; los demás usan el último valor
+        # (sin medición previa la réplica cuenta como no disponible)
+        probe_lock = self._probe_lock(alias)
+        if not probe_lock.acquire(blocking=False):
+            return self._lags.get(alias, float('inf'))
+        try:
+            try:
+                lag = self.measure(alias)
+            except Exception as e:
+                logger.error(f"Réplica {alias} no disponible: {e}")
+                lag = float('inf')
+
+            with self._lock:
+                self._lags[alias] = lag
+                self._checked_at[alias] = time.monotonic()
+        finally:
+            probe_lock.release()
+        return lag
+
+    def _probe_lock(self, alias: str) -> threading.Lock:
+        with self._lock:
+            return self._probe_locks.setdefault(alias, threading.Lock())
+
+    def healthy(self, aliases: List[str]) -> List[str]:
+        """Réplicas con lag aceptable"""
+        return [alias for alias in aliases if self.lag(alias) <= self.max_lag]
+
+
+# Instancia global del monitor
+lag_monitor = ReplicaLagMonitor()
+
+
+# Tablas que no deben leerse con lag ni fijar el request al primario al escribir
+PRIMARY_ONLY_APP_LABELS = {'django_cache'}
+
+
+class ReplicaRouter:
+    """Lecturas a réplicas sanas, escrituras (y lecturas posteriores) al primario"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APP_LABELS:
+            return DEFAULT_DB_ALIAS
+        if is_pinned_to_primary() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        replicas = lag_monitor.healthy(replica_aliases())
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APP_LABELS:
+            return DEFAULT_DB_ALIAS
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación, nunca por migrate
+        return db == DEFAULT_DB_ALIAS
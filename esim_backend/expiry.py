@@ -0,0 +1,117 @@
+"""
+Barrido de eSIMs vencidas
+
+Pasa a 'expired' las eSIMs pendientes/activas cuya fecha de vencimiento ya
+pasó, con UPDATEs por lotes de IDs (índice status + expires_date), y después
+suspende en el proveedor las que aún no lo están. Las suspensiones fallidas
+quedan en cola (provider_suspended_at vacío) y se reintentan en el siguiente
+barrido.
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from django.utils import timezone
+
+from services.esim_providers.oneglobal_service import oneglobal_service
+from services.esim_providers.twilio_service import twilio_service
+
+from .models import ESim
+
+logger = logging.getLogger(__name__)
+
+ELIGIBLE_STATUSES = ('pending', 'active')
+
+
+def suspend_twilio(sim_sid: str) -> bool:
+    return twilio_service.update_sim_status(sim_sid, 'inactive')
+
+
+# Proveedores con suspensión disponible en su API
+PROVIDER_SUSPENDERS: Dict[str, Callable[[str], bool]] = {
+    'twilio': suspend_twilio,
+    'oneglobal': oneglobal_service.suspend_esim,
+}
+
+
+class ExpirySweeper:
+    """Vence eSIMs en lotes y encola su suspensión en el proveedor"""
+
+    def __init__(self, chunk_size: int = 1000, batch_size: int = 50, workers: int = 8,
+                 now: Optional[datetime] = None, dry_run: bool = False):
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.workers = workers
+        self.now = now or timezone.now()
+        self.dry_run = dry_run
+
+    def eligible(self):
+        """eSIMs que ya deberían estar vencidas"""
+        return ESim.objects.filter(status__in=ELIGIBLE_STATUSES, expires_date__lte=self.now)
+
+    def pending_suspensions(self):
+        """eSIMs vencidas todavía activas en su proveedor"""
+        return ESim.objects.filter(
+            status='expired',
+            provider__in=list(PROVIDER_SUSPENDERS),
+            provider_suspended_at__isnull=True,
+        ).exclude(provider_esim_id='')
+
+    def expire(self) -> int:
+        """Marcar como vencidas en lotes; cada lote es un UPDATE corto"""
+        if self.dry_run:
+            return self.eligible().count()
+
+        expired = 0
+        while True:
+            ids = list(self.eligible().order_by().values_list('id', flat=True)[:self.chunk_size])
+            if not ids:
+                return expired
+            # Repetir el filtro: una fila cambiada entre SELECT y UPDATE no se pisa
+            expired += self.eligible().filter(id__in=ids).update(status='expired')
+
+    def suspend(self) -> Tuple[int, int]:
+        """Suspender en el proveedor por lotes; devuelve (suspendidas, fallidas)"""
+        if self.dry_run:
+            return 0, self.pending_suspensions().count()
+
+        suspended = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='esim-expiry') as executor:
+            while True:
+                batch = list(
+                    self.pending_suspensions()
+                    .filter(id__gt=last_id)
+                    .order_by('id')
+                    .values_list('id', 'provider', 'provider_esim_id')[:self.batch_size]
+                )
+                if not batch:
+                    return suspended, failed
+                last_id = batch[-1][0]
+
+                results = executor.map(self.suspend_one, batch)
+                done = [esim_id for (esim_id, _, _), ok in zip(batch, results) if ok]
+                if done:
+                    ESim.objects.filter(id__in=done).update(provider_suspended_at=timezone.now())
+                suspended += len(done)
+                failed += len(batch) - len(done)
+
+    def suspend_one(self, row: Tuple[int, str, str]) -> bool:
+        esim_id, provider, provider_esim_id = row
+        try:
+            return PROVIDER_SUSPENDERS[provider](provider_esim_id)
+        except Exception as e:
+            logger.error(f"Error suspendiendo eSIM {esim_id} en {provider}: {e}")
+            return False
+
+    def run(self, suspend: bool = True) -> Dict[str, float]:
+        """Barrido completo: vencer y (opcionalmente) suspender"""
+        start = time.perf_counter()
+        result = {'expired': self.expire(), 'suspended': 0, 'failed': 0}
+        if suspend:
+            result['suspended'], result['failed'] = self.suspend()
+        result['seconds'] = time.perf_counter() - start
+        return result
@@ -0,0 +1,214 @@
+"""
+Verificación local de ID tokens de Google y Apple
+
+Las claves públicas (JWKS) de cada proveedor se descargan una vez y se
+guardan en memoria y en el cache compartido durante el max-age que indica
+el proveedor. Si llega un token firmado con un `kid` desconocido (rotación
+de claves) se vuelve a descargar el JWKS, como mucho una vez cada
+JWKS_MIN_REFRESH segundos. Todas las llamadas externas llevan timeout y
+reutilizan una sesión HTTP keep-alive.
+"""
+
+import re
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+
+try:
+    import jwt
+    from jwt.algorithms import has_crypto
+except ImportError:  # PyJWT es opcional; sin él no hay login social
+    jwt = None
+    has_crypto = False
+
+logger = logging.getLogger(__name__)
+
+JWKS_CACHE_KEY = 'jwks:{provider}'
+DEFAULT_JWKS_MAX_AGE = 3600
+JWKS_MIN_REFRESH = 60
+CLOCK_LEEWAY = 60
+
+PROVIDERS = {
+    'google': {
+        'jwks_url': 'https://www.googleapis.com/oauth2/v3/certs',
+        'issuers': ['https://accounts.google.com', 'accounts.google.com'],
+        'audience_setting': 'GOOGLE_CLIENT_IDS',
+    },
+    'apple': {
+        'jwks_url': 'https://appleid.apple.com/auth/keys',
+        'issuers': ['https://appleid.apple.com'],
+        'audience_setting': 'APPLE_CLIENT_IDS',
+    },
+}
+
+
+class IDTokenError(Exception):
+    """ID token inválido, caducado o de otra aplicación"""
+
+
+def external_timeout() -> Tuple[float, float]:
+    """(conexión, lectura) para las llamadas a Google/Apple"""
+    return getattr(settings, 'SOCIAL_AUTH_TIMEOUT', (3.05, 10))
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount('https://', adapter)
+    return session
+
+
+# Instancia global de la sesión HTTP hacia los proveedores de identidad
+http_session = _build_session()
+
+
+def _max_age(response) -> int:
+    match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+    return int(match.group(1)) if match else DEFAULT_JWKS_MAX_AGE
+
+
+class JWKSCache:
+    """Claves públicas por proveedor: memoria del proceso -> cache compartido -> HTTP"""
+
+    def __init__(self, cache_alias: str = 'shared'):
+        self.cache_alias = cache_alias
+        # Un lock por proveedor: la descarga de uno no bloquea al otro
+        self._locks = {provider: threading.Lock() for provider in PROVIDERS}
+        self._keys: Dict[str, Tuple[float, Dict[str, object]]] = {}
+        self._last_fetch: Dict[str, float] = {}
+
+    def get_key(self, provider: str, kid: str):
+        """Clave para `kid`; refresca el JWKS si no la conoce (rotación)"""
+        keys = self._load(provider)
+        if kid not in keys:
+            keys = self._load(provider, refresh=True)
+        key = keys.get(kid)
+        if key is None:
+            raise IDTokenError(f'Clave {kid} desconocida para {provider}')
+        return key
+
+    def _load(self, provider: str, refresh: bool = False) -> Dict[str, object]:
+        entry = self._keys.get(provider)
+        now = time.time()
+        if entry and entry[0] > now and not refresh:
+            return entry[1]
+
+        with self._locks[provider]:
+            entry = self._keys.get(provider)
+            if entry and entry[0] > now and not refresh:
+                return entry[1]
+
+            if refresh and now - self._last_fetch.get(provider, 0) < JWKS_MIN_REFRESH:
+                # Un kid inventado no debe provocar una descarga por request
+                return entry[1] if entry else {}
+
+            shared = caches[self.cache_alias]
+            cache_key = JWKS_CACHE_KEY.format(provider=provider)
+            jwks, expires = None, now
+            if not refresh:
+                try:
+                    cached = shared.get(cache_key)
+                except Exception as e:
+                    # Sin cache compartido se descarga: no es motivo para rechazar el login
+                    logger.error(f"Cache compartido no disponible: {e}")
+                    cached = None
+                if cached:
+                    jwks, expires = cached
+            if jwks is None or expires <= now:
+                jwks, max_age = self._fetch(provider)
+                expires = now + max_age
+                self._last_fetch[provider] = now
+                try:
+                    shared.set(cache_key, (jwks, expires), max_age)
+                except Exception as e:
+                    logger.error(f"Cache compartido no disponible: {e}")
+
+            keys = {}
+            for data in jwks.get('keys', []):
+                try:
+                    keys[data['kid']] = jwt.PyJWK(data)
+                except Exception as e:
+                    logger.error(f"Clave JWKS de {provider} ignorada: {e}")
+            self._keys[provider] = (expires, keys)
+            return keys
+
+    def _fetch(self, provider: str):
+        response = http_session.get(PROVIDERS[provider]['jwks_url'], timeout=external_timeout())
+        response.raise_for_status()
+        return response.json(), _max_age(response)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._last_fetch.clear()
+
+
+# Instancia global del cache de JWKS
+jwks_cache = JWKSCache()
+
+
+def audiences(provider: str):
+    value = getattr(settings, PROVIDERS[provider]['audience_setting'], [])
+    return [value] if isinstance(value, str) else list(value)
+
+
+def verify_id_token(provider: str, token: str, nonce: Optional[str] = None) -> Dict:
+    """Claims del ID token tras verificar firma, emisor, audiencia y caducidad"""
+    if jwt is None or not has_crypto:
+        raise IDTokenError('PyJWT[crypto] no está instalado')
+    if provider not in PROVIDERS:
+        raise IDTokenError(f'Proveedor desconocido: {provider}')
+    audience = audiences(provider)
+    if not audience:
+        raise IDTokenError(f'Client ID de {provider} no configurado')
+
+    try:
+        header = jwt.get_unverified_header(token)
+        key = jwks_cache.get_key(provider, header.get('kid', ''))
+        claims = jwt.decode(
+            token,
+            key.key,
+            algorithms=['RS256'],
+            audience=audience,
+            issuer=PROVIDERS[provider]['issuers'],
+            leeway=CLOCK_LEEWAY,
+            options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+        )
+    except IDTokenError:
+        raise
+    except requests.RequestException as e:
+        raise IDTokenError(f'JWKS de {provider} no disponible: {e}') from e
+    except jwt.PyJWTError as e:
+        raise IDTokenError(str(e)) from e
+
+    if nonce is not None and claims.get('nonce') != nonce:
+        raise IDTokenError('Nonce inválido')
+    # Apple envía email_verified como texto
+    if claims.get('email') and str(claims.get('email_verified')).lower() != 'true':
+        raise IDTokenError('Email no verificado')
+    return claims
+
+
+def user_for_claims(claims: Dict, first_name: str = '', last_name: str = ''):
+    """Usuario del email verificado: una consulta si existe, y el insert si no"""
+    email = claims.get('email')
+    if not email:
+        raise IDTokenError('El token no incluye email')
+
+    UserModel = get_user_model()
+    email = UserModel.objects.normalize_email(email)
+    user = UserModel._default_manager.filter(email=email).order_by('pk').first()
+    if user is None:
+        user = UserModel._default_manager.create_user(
+            username=email,
+            email=email,
+            first_name=claims.get('given_name', first_name)[:150],
+            last_name=claims.get('family_name', last_name)[:150],
+        )
+    return user
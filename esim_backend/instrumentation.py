@@ -0,0 +1,146 @@
+"""
+Instrumentación de rendimiento por request
+
+ServerTimingMiddleware crea un RequestMetrics por request (solo en los
+requests muestreados) y lo deja en un ContextVar; SQL, cache, proveedores y
+serialización suman en él si existe y no hacen nada si no. El ContextVar
+viaja con sync_to_async/async_to_sync, así que también cubre las vistas async.
+
+- SQL: execute_wrapper en cada conexión durante el request
+- Cache: aciertos y fallos de TwoTierCache.get
+- Proveedores: sesión HTTP de los servicios, async_http y el SDK de Twilio
+- Serialización: serializer.data (serializer_data) y los renderers JSON,
+  descontando el SQL y las llamadas a proveedores que ocurran dentro
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Contadores de un request"""
+
+    __slots__ = (
+        'started', 'db_count', 'db_time', 'cache_hits', 'cache_misses',
+        'provider_count', 'provider_time', 'serialize_time', '_serializing'
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.provider_count = 0
+        self.provider_time = 0.0
+        self.serialize_time = 0.0
+        self._serializing = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera Server-Timing (duraciones en ms)"""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"',
+            f'provider;dur={self.provider_time * 1000:.1f};desc="{self.provider_count} calls"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'total;dur={self.elapsed() * 1000:.1f}',
+        ])
+
+    def as_dict(self) -> dict:
+        return {
+            'total_ms': round(self.elapsed() * 1000, 1),
+            'db_queries': self.db_count,
+            'db_ms': round(self.db_time * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'provider_calls': self.provider_count,
+            'provider_ms': round(self.provider_time * 1000, 1),
+            'serialize_ms': round(self.serialize_time * 1000, 1),
+        }
+
+
+def current_metrics():
+    return _current_metrics.get()
+
+
+def start_request() -> contextvars.Token:
+    return _current_metrics.set(RequestMetrics())
+
+
+def end_request(token: contextvars.Token) -> None:
+    _current_metrics.reset(token)
+
+
+@contextmanager
+def sql_instrumentation():
+    """sql_wrapper en todas las conexiones del hilo actual"""
+    from contextlib import ExitStack
+    from django.db import connections
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(sql_wrapper))
+        yield
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """Para connection.execute_wrapper: cuenta y cronometra cada consulta"""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_count += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def record_cache(hit: bool) -> None:
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+@contextmanager
+def timed(category: str):
+    """
+    Cronometra un bloque como 'provider' o 'serialize'. Las llamadas a
+    proveedores concurrentes (asyncio.gather) suman todas; una serialización
+    dentro de otra (renderer dentro de JsonResponse) no cuenta dos veces
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or (category == 'serialize' and metrics._serializing):
+        yield
+        return
+
+    if category == 'serialize':
+        metrics._serializing = True
+    db_before, provider_before = metrics.db_time, metrics.provider_time
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if category == 'provider':
+            metrics.provider_count += 1
+            metrics.provider_time += elapsed
+        else:
+            metrics._serializing = False
+            nested = (metrics.db_time - db_before) + (metrics.provider_time - provider_before)
+            metrics.serialize_time += max(0.0, elapsed - nested)
+
+
+def serializer_data(serializer):
+    """serializer.data contando como serialización"""
+    with timed('serialize'):
+        return serializer.data
@@ -0,0 +1,124 @@
+"""
+Codec JSON rápido para la API
+
+Usa orjson si está instalado y json de la stdlib si no. Los valores son los
+de DjangoJSONEncoder (JsonResponse) y el encoder de DRF: Decimal, datetime,
+date, time, UUID, Promise, etc. se delegan a su default() para que el formato
+no cambie al activar orjson.
+
+Sin orjson la salida es byte a byte la de django.http.JsonResponse. Con orjson
+es JSON compacto en UTF-8 (sin espacios tras ',' y ':' ni escapes \\uXXXX):
+mismo documento, distintos bytes.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder as DRFJSONEncoder
+
+from .instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa json de la stdlib
+    orjson = None
+
+if orjson is not None:
+    # Fechas y subclases por default() para mantener el formato de Django/DRF
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    JSONDecodeError = orjson.JSONDecodeError
+else:
+    ORJSON_OPTIONS = 0
+    JSONDecodeError = json.JSONDecodeError
+
+_django_default = DjangoJSONEncoder().default
+_drf_default = DRFJSONEncoder().default
+
+# default() conocidos -> su encoder de la stdlib
+_ENCODERS = {_django_default: DjangoJSONEncoder, _drf_default: DRFJSONEncoder}
+
+
+def dumps(obj, default=_django_default) -> bytes:
+    """Serializar a bytes con los valores de DjangoJSONEncoder (ver docstring del módulo)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+    # Mismos parámetros que django.http.JsonResponse
+    encoder = _ENCODERS.get(default)
+    if encoder is not None:
+        return json.dumps(obj, cls=encoder).encode('utf-8')
+    return json.dumps(obj, default=default).encode('utf-8')
+
+
+def loads(data):
+    """Parsear bytes o str; los errores son subclase de json.JSONDecodeError"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def response_json(response):
+    """Equivalente a response.json() de requests/httpx parseando con el codec"""
+    return loads(response.content)
+
+
+class JsonResponse(HttpResponse):
+    """JsonResponse de Django serializando con el codec rápido"""
+
+    def __init__(self, data, encoder=DjangoJSONEncoder, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        with timed('serialize'):
+            if encoder is DjangoJSONEncoder and not json_dumps_params:
+                content = dumps(data)
+            else:
+                # Encoder o parámetros propios: mismo camino que django.http.JsonResponse
+                content = json.dumps(data, cls=encoder, **(json_dumps_params or {}))
+        super().__init__(content=content, **kwargs)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer de DRF con orjson para la salida compacta"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('serialize'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        # El navegable y ?indent=N siguen en la stdlib; orjson solo indenta a 2
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_drf_default, option=ORJSON_OPTIONS)
+        # Igual que DRF: U+2028/U+2029 escapados para poder incrustar en <script>
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser de DRF con orjson"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from esim_backend.catalog_snapshot import build_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = 'Generar el snapshot mmap del catálogo (países, regiones y planes) que comparten los workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Archivo de salida (por defecto CATALOG_SNAPSHOT_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['path'] or snapshot_path()
+        start = time.perf_counter()
+        snapshot = build_snapshot(path)
+        elapsed = time.perf_counter() - start
+
+        columns = snapshot.columns
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Snapshot {snapshot.version} escrito en {path} ({snapshot.size} bytes, {elapsed * 1000:.0f} ms)"
+        ))
+        self.stdout.write(
+            f"🌍 {len(columns['country.id'])} países, {len(columns['region.id'])} regiones, "
+            f"{len(columns['plan.id'])} planes, {len(columns['strings.offsets']) - 1} textos"
+        )
@@ -0,0 +1,68 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from esim_backend.synthetic import SCALES, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Generar un dataset sintético reproducible a escala de producción para pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small', help='Tamaño predefinido del dataset')
+        parser.add_argument('--users', type=int, help='Usuarios a generar (sobrescribe --scale)')
+        parser.add_argument('--plans', type=int, help='Planes totales deseados (sobrescribe --scale)')
+        parser.add_argument('--esims', type=int, help='eSIMs a generar (sobrescribe --scale)')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para datos reproducibles')
+        parser.add_argument('--anchor', help='Fecha de referencia YYYY-MM-DD (por defecto hoy)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Filas por lote de inserción')
+        parser.add_argument('--copy', action='store_true', help='Usar COPY en PostgreSQL')
+        parser.add_argument('--flush', action='store_true', help='Borrar antes los usuarios sintéticos y sus eSIMs')
+
+    def handle(self, *args, **options):
+        sizes = dict(SCALES[options['scale']])
+        for key in sizes:
+            if options[key] is not None:
+                sizes[key] = options[key]
+
+        anchor = None
+        if options['anchor']:
+            try:
+                anchor = datetime.strptime(options['anchor'], '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError('--anchor debe tener formato YYYY-MM-DD')
+
+        if options['copy'] and connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING('--copy solo está disponible en PostgreSQL; se usará executemany'))
+
+        generator = SyntheticDataGenerator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            use_copy=options['copy'],
+            anchor=anchor,
+            report=self.report if options['verbosity'] > 1 else self.report_steps,
+            **sizes
+        )
+
+        if options['flush']:
+            deleted = generator.flush()
+            self.stdout.write(f'🧹 {deleted} usuarios sintéticos eliminados')
+        elif generator.has_previous_data():
+            raise CommandError('Ya hay usuarios sintéticos en la base de datos; usa --flush para regenerarlos')
+
+        self.stdout.write(
+            f"📦 Generando {sizes['users']} usuarios, {sizes['plans']} planes y "
+            f"{sizes['esims']} eSIMs (semilla {options['seed']})"
+        )
+        start = time.perf_counter()
+        generator.generate()
+        self.stdout.write(self.style.SUCCESS(f'✅ Dataset generado en {time.perf_counter() - start:.1f}s'))
+
+    def report(self, message):
+        self.stdout.write(message)
+
+    def report_steps(self, message):
+        if message.startswith('⏱️'):
+            self.stdout.write(message)
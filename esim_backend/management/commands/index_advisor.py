@@ -0,0 +1,101 @@
+import random
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from esim_backend.models import Country, Region, DataPlan, ESim
+from esim_backend.synthetic import SyntheticDataGenerator
+
+SEQ_SCAN_POSTGRES = re.compile(r'Seq Scan on (\w+)')
+SEQ_SCAN_SQLITE = re.compile(r'\bSCAN (\w+).*$', re.MULTILINE)
+
+
+class RollbackDataset(Exception):
+    """Señal interna para descartar el dataset sintético"""
+
+
+class Command(BaseCommand):
+    help = 'Reproducir las consultas ORM principales con EXPLAIN y detectar sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000, help='Usuarios sintéticos a generar')
+        parser.add_argument('--esims', type=int, default=50000, help='eSIMs sintéticas a generar')
+        parser.add_argument('--plans', type=int, default=2000, help='Planes sintéticos a generar')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para datos reproducibles')
+        parser.add_argument('--keep', action='store_true', help='Conservar el dataset en lugar de hacer rollback')
+        parser.add_argument('--fail-on-seq-scan', action='store_true', help='Salir con error si alguna consulta hace seq scan')
+
+    def handle(self, *args, **options):
+        flagged = []
+        try:
+            with transaction.atomic():
+                sample = self.build_dataset(options)
+                self.analyze()
+                for name, queryset in self.hot_queries(sample):
+                    plan = queryset.explain()
+                    seq_scans = self.sequential_scans(plan)
+                    if seq_scans:
+                        flagged.append(name)
+                        self.stdout.write(self.style.WARNING(f'⚠️  {name}: seq scan en {", ".join(seq_scans)}'))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f'✅ {name}: usa índice'))
+                    if options['verbosity'] > 1:
+                        self.stdout.write(plan)
+                if not options['keep']:
+                    raise RollbackDataset()
+        except RollbackDataset:
+            pass
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f'{len(flagged)} consultas con sequential scan: {", ".join(flagged)}')
+        self.stdout.write(f'{len(flagged)} consultas con sequential scan')
+
+    def build_dataset(self, options):
+        """Dataset sintético reproducible (ver esim_backend.synthetic)"""
+        SyntheticDataGenerator(
+            users=options['users'],
+            plans=options['plans'],
+            esims=options['esims'],
+            seed=options['seed'],
+            prefix='advisor_',
+        ).generate()
+
+        rng = random.Random(options['seed'])
+        users = User.objects.filter(username__startswith='advisor_')
+        return {
+            'user': users.order_by('id')[rng.randrange(options['users'])],
+            'email': f'advisor_{rng.randrange(options["users"]):07d}@example.com',
+            'region': rng.choice(list(Region.objects.all())),
+            'country_code': Country.objects.order_by('code').first().code,
+        }
+
+    def analyze(self):
+        """Actualizar estadísticas del planner tras cargar datos"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def hot_queries(self, sample):
+        """Consultas calientes de vistas, admin y autenticación"""
+        user = sample['user']
+        return [
+            ('login por email (auth_views.login_view)', User.objects.filter(email=sample['email'])),
+            ('registro: email existente (register_view)', User.objects.filter(email=sample['email']).values('id')[:1]),
+            ('eSIMs del usuario (ESimViewSet.list)', ESim.objects.filter(user=user)[:20]),
+            ('eSIMs activas del usuario', ESim.objects.filter(user=user, status='active')),
+            ('planes de una región por precio', DataPlan.objects.filter(region=sample['region']).order_by('price')[:20]),
+            ('planes más baratos', DataPlan.objects.order_by('price')[:20]),
+            ('países populares', Country.objects.filter(is_popular=True).order_by('name')),
+            ('país por código', Country.objects.filter(code=sample['country_code'])),
+        ]
+
+    def sequential_scans(self, plan):
+        """Tablas recorridas completas según el plan de EXPLAIN"""
+        if connection.vendor == 'postgresql':
+            return SEQ_SCAN_POSTGRES.findall(plan)
+        return [
+            match.group(1)
+            for match in SEQ_SCAN_SQLITE.finditer(plan)
+            if 'USING' not in match.group(0)
+        ]
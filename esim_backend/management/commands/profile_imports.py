@@ -0,0 +1,97 @@
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# Se ejecuta con python -X importtime en un proceso limpio
+BOOT_SCRIPT = '''
+import json, os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+os.environ['WARMUP_ON_BOOT'] = 'false'
+start = time.perf_counter()
+import esim_backend.{target}
+boot = time.perf_counter()
+stages = {{'boot_ms': (boot - start) * 1000}}
+if {first_request}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    stages['urlconf_ms'] = (time.perf_counter() - boot) * 1000
+if {warmup}:
+    from esim_backend.warmup import warm_up
+    stages.update({{f'warmup_{{name}}_ms': ms for name, ms in warm_up(freeze=False).items()}})
+print(json.dumps(stages))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Perfil de tiempos de import del arranque de un worker (python -X importtime)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=['wsgi', 'asgi'], default='wsgi', help='Aplicación a cargar')
+        parser.add_argument('--no-urlconf', action='store_true',
+                            help='No cargar el URLconf (y las vistas), que Django importa en el primer request')
+        parser.add_argument('--warmup', action='store_true', help='Incluir el warmup (esim_backend/warmup.py)')
+        parser.add_argument('--top', type=int, default=25, help='Módulos a mostrar')
+        parser.add_argument('--min-ms', type=float, default=1.0, help='Ocultar módulos por debajo de este tiempo acumulado')
+        parser.add_argument('--json', dest='json_path', help='Guardar el informe completo en este archivo')
+
+    def handle(self, *args, **options):
+        script = BOOT_SCRIPT.format(
+            target=options['target'],
+            first_request=not options['no_urlconf'],
+            warmup=options['warmup'],
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'El arranque falló:\n{result.stderr[-2000:]}')
+
+        modules = self.parse(result.stderr)
+        stages = json.loads(result.stdout.strip().splitlines()[-1])
+        by_package = defaultdict(float)
+        for module in modules:
+            by_package[module['name'].split('.')[0]] += module['self_ms']
+
+        self.stdout.write(f"📦 {len(modules)} módulos importados, "
+                          f"{sum(m['self_ms'] for m in modules):.0f} ms en imports")
+        for stage, ms in stages.items():
+            self.stdout.write(f"⏱️  {stage}: {ms:.1f}")
+
+        self.stdout.write("\nMás lentos por tiempo acumulado (ms, con lo que importan):")
+        slowest = sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)
+        for module in [m for m in slowest if m['cumulative_ms'] >= options['min_ms']][:options['top']]:
+            self.stdout.write(f"  {module['cumulative_ms']:8.1f} {module['self_ms']:8.1f}  "
+                              f"{'  ' * min(module['depth'], 8)}{module['name']}")
+
+        self.stdout.write("\nPor paquete (suma de tiempo propio, ms):")
+        for package, ms in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:options['top']]:
+            if ms >= options['min_ms']:
+                self.stdout.write(f"  {ms:8.1f}  {package}")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as report:
+                json.dump({'stages': stages, 'modules': modules, 'packages': by_package}, report, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Informe guardado en {options['json_path']}"))
+
+    def parse(self, stderr):
+        """Líneas de -X importtime -> módulos con tiempo propio, acumulado y profundidad"""
+        modules = []
+        for line in stderr.splitlines():
+            match = IMPORT_TIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append({
+                    'name': name,
+                    'self_ms': int(self_us) / 1000,
+                    'cumulative_ms': int(cumulative_us) / 1000,
+                    'depth': (len(indent) - 1) // 2,
+                })
+        return modules
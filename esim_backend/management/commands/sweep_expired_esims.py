@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from esim_backend.expiry import ExpirySweeper
+
+
+class Command(BaseCommand):
+    help = 'Marcar como vencidas las eSIMs expiradas y suspenderlas en su proveedor (ejecutar periódicamente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Filas por UPDATE')
+        parser.add_argument('--batch-size', type=int, default=50, help='Suspensiones por lote')
+        parser.add_argument('--workers', type=int, default=8, help='Llamadas concurrentes al proveedor')
+        parser.add_argument('--no-suspend', action='store_true', help='Solo actualizar estados, sin llamar a proveedores')
+        parser.add_argument('--dry-run', action='store_true', help='Contar sin modificar nada')
+
+    def handle(self, *args, **options):
+        sweeper = ExpirySweeper(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+        result = sweeper.run(suspend=not options['no_suspend'])
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"🔍 {result['expired']} eSIMs por vencer, "
+                f"{result['failed']} suspensiones pendientes"
+            )
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result['expired']} eSIMs vencidas, {result['suspended']} suspendidas en proveedor "
+            f"({result['seconds']:.1f}s)"
+        ))
+        if result['failed']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  {result['failed']} suspensiones fallidas; se reintentarán en el próximo barrido"
+            ))
@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from esim_backend.models import Country
+from esim_backend.readiness import provider_endpoints
+
+# (clave de cache, función que la rellena y devuelve lo cacheado)
+Task = Tuple[str, Callable[[], list]]
+
+
+class Command(BaseCommand):
+    help = 'Poblar el cache compartido con los catálogos de proveedores (fase release del deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Peticiones a proveedores en paralelo')
+        parser.add_argument('--refresh', action='store_true', help='Borrar antes las claves para traer datos nuevos')
+        parser.add_argument('--provider', action='append', help='Solo estos proveedores (se puede repetir)')
+        parser.add_argument('--strict', action='store_true', help='Salir con error si alguna clave queda vacía')
+
+    def handle(self, *args, **options):
+        providers = [p for p in provider_endpoints() if not options['provider'] or p in options['provider']]
+        if not providers:
+            self.stdout.write('Ningún proveedor configurado: nada que calentar')
+            return
+
+        self.refresh = options['refresh']
+        self.failed = []
+        self.executor = ThreadPoolExecutor(max_workers=options['concurrency'], thread_name_prefix='warm-caches')
+        start = time.perf_counter()
+        try:
+            # Primero tokens y listados; después lo que depende de ellos
+            results = self.run(self.first_phase(providers))
+            self.run(self.second_phase(providers, results))
+        finally:
+            self.executor.shutdown()
+
+        elapsed = time.perf_counter() - start
+        if self.failed and options['strict']:
+            raise CommandError(f'{len(self.failed)} claves sin datos: {", ".join(self.failed)}')
+        self.stdout.write(f'Cache calentado en {elapsed:.1f}s ({providers}); {len(self.failed)} claves sin datos')
+
+    def first_phase(self, providers) -> List[Task]:
+        tasks = []
+        if 'airalo' in providers:
+            tasks.append(('airalo_access_token', self.airalo_token))
+        if 'oneglobal' in providers:
+            from services.esim_providers.oneglobal_service import oneglobal_service
+            tasks.append(('oneglobal_destinations', oneglobal_service.get_destinations))
+        if 'twilio' in providers:
+            from services.esim_providers.twilio_service import twilio_service
+            tasks.append(('twilio_rate_plans', twilio_service.get_rate_plans))
+        return tasks
+
+    def second_phase(self, providers, results) -> List[Task]:
+        tasks = []
+        if results.get('airalo_access_token'):
+            from services.esim_providers.airalo_service import airalo_service
+            tasks.append(('airalo_countries', airalo_service.get_countries))
+            tasks.append(('airalo_packages_all', airalo_service.get_packages))
+            # Los países populares son los que más se consultan en la tienda
+            for code in Country.objects.filter(is_popular=True).order_by('code').values_list('code', flat=True):
+                tasks.append((f'airalo_packages_{code}', lambda code=code: airalo_service.get_packages(code)))
+        if 'oneglobal' in providers:
+            from services.esim_providers.oneglobal_service import oneglobal_service
+            tasks.append(('oneglobal_products_all', oneglobal_service.get_products))
+            for destination in results.get('oneglobal_destinations') or []:
+                destination_id = destination.get('id')
+                if destination_id:
+                    tasks.append((
+                        f'oneglobal_products_{destination_id}',
+                        lambda destination_id=destination_id: oneglobal_service.get_products(destination_id)
+                    ))
+        return tasks
+
+    def airalo_token(self) -> list:
+        from services.esim_providers.airalo_service import airalo_service
+        return [airalo_service.access_token] if airalo_service.authenticate() else []
+
+    def run(self, tasks: List[Task]) -> dict:
+        """Ejecuta las tareas en paralelo e informa del tiempo de cada clave"""
+        futures = {key: self.executor.submit(self.warm, key, fill) for key, fill in tasks}
+        results = {}
+        for key, future in futures.items():
+            value, elapsed = future.result()
+            results[key] = value
+            if value:
+                self.stdout.write(self.style.SUCCESS(f'✅ {key}: {len(value)} elementos en {elapsed * 1000:.0f} ms'))
+            else:
+                self.failed.append(key)
+                self.stdout.write(self.style.WARNING(f'⚠️  {key}: sin datos ({elapsed * 1000:.0f} ms)'))
+        return results
+
+    def warm(self, key: str, fill: Callable[[], list]):
+        start = time.perf_counter()
+        try:
+            if self.refresh and key != 'airalo_access_token':
+                cache.delete(key)
+            return fill(), time.perf_counter() - start
+        finally:
+            # Conexiones del cache en base de datos abiertas por este hilo
+            connections.close_all()
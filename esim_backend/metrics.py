@@ -0,0 +1,137 @@
+"""
+Métricas Prometheus
+
+- hablaris_provider_request_seconds: llamadas a proveedores por
+  proveedor/endpoint/status (sesión HTTP de los servicios, async_http y el
+  SDK de Twilio)
+- hablaris_http_request_seconds: latencia de requests por vista
+- hablaris_cache_requests_total: lecturas de TwoTierCache por prefijo y
+  resultado (l1_hit, l2_hit, miss), para el hit ratio
+- hablaris_db_connections: conexiones a PostgreSQL por estado, leídas de
+  pg_stat_activity al hacer scrape
+- hablaris_fulfillment_queue_depth: eSIMs pendientes de activar y vencidas
+  pendientes de suspender en el proveedor, al hacer scrape
+
+Con varios workers de gunicorn, PROMETHEUS_MULTIPROC_DIR (lo fija
+gunicorn.conf.py) hace que cada proceso escriba sus contadores en ficheros
+mmap y /metrics los agregue todos. Sin prometheus_client las funciones de
+registro no hacen nada y /metrics responde 503. Sin METRICS_TOKEN /metrics
+responde 404.
+"""
+
+import os
+import re
+from urllib.parse import urlsplit
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # prometheus_client es opcional
+    prometheus_client = None
+
+# Segmentos de URL que son IDs (numéricos, UUID, ICCID, SIDs de Twilio...)
+ID_SEGMENT = re.compile(r'^(?=.*\d)[\w.-]{6,}$|^\d+$')
+
+PROVIDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if prometheus_client is not None:
+    PROVIDER_LATENCY = prometheus_client.Histogram(
+        'hablaris_provider_request_seconds', 'Latencia de llamadas a proveedores',
+        ['provider', 'endpoint', 'status'], buckets=PROVIDER_BUCKETS
+    )
+    REQUEST_LATENCY = prometheus_client.Histogram(
+        'hablaris_http_request_seconds', 'Latencia de requests por vista',
+        ['view', 'method', 'status'], buckets=REQUEST_BUCKETS
+    )
+    CACHE_REQUESTS = prometheus_client.Counter(
+        'hablaris_cache_requests', 'Lecturas de TwoTierCache', ['prefix', 'result']
+    )
+
+
+def endpoint_label(method: str, url: str) -> str:
+    """'GET /esims/{id}/usage': sin host, query ni IDs para acotar la cardinalidad"""
+    path = urlsplit(url).path
+    segments = ['{id}' if ID_SEGMENT.match(segment) else segment for segment in path.split('/')]
+    return f"{method.upper()} {'/'.join(segments) or '/'}"
+
+
+def observe_provider_call(provider: str, method: str, url: str, status, seconds: float) -> None:
+    if prometheus_client is not None:
+        PROVIDER_LATENCY.labels(provider, endpoint_label(method, url), str(status)).observe(seconds)
+
+
+def observe_request(view: str, method: str, status: int, seconds: float) -> None:
+    if prometheus_client is not None:
+        REQUEST_LATENCY.labels(view, method, str(status)).observe(seconds)
+
+
+def count_cache_read(prefix: str, result: str) -> None:
+    if prometheus_client is not None:
+        CACHE_REQUESTS.labels(prefix, result).inc()
+
+
+class DatabaseCollector:
+    """Conexiones abiertas en PostgreSQL por alias y estado"""
+
+    def collect(self):
+        from django.db import connections
+
+        gauge = GaugeMetricFamily(
+            'hablaris_db_connections', 'Conexiones a la base de datos por estado', labels=['alias', 'state']
+        )
+        limit = GaugeMetricFamily(
+            'hablaris_db_connections_max', 'max_connections del servidor', labels=['alias']
+        )
+        for alias in connections:
+            connection = connections[alias]
+            if connection.vendor != 'postgresql':
+                continue
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() GROUP BY 1"
+                    )
+                    for state, count in cursor.fetchall():
+                        gauge.add_metric([alias, state], count)
+                    cursor.execute('SHOW max_connections')
+                    limit.add_metric([alias], int(cursor.fetchone()[0]))
+            except Exception:
+                # Una réplica caída no debe tumbar el scrape
+                continue
+        yield gauge
+        yield limit
+
+
+class FulfillmentCollector:
+    """eSIMs esperando al proveedor (índices esim_status_expires_idx y esim_pending_suspension_idx)"""
+
+    def collect(self):
+        from django.db.models import Count
+        from .models import ESim
+
+        gauge = GaugeMetricFamily(
+            'hablaris_fulfillment_queue_depth', 'eSIMs pendientes en el proveedor', labels=['queue', 'provider']
+        )
+        queues = {
+            'activation': ESim.objects.filter(status='pending'),
+            'suspension': ESim.objects.filter(status='expired', provider_suspended_at__isnull=True),
+        }
+        for queue, queryset in queues.items():
+            for row in queryset.order_by().values('provider').annotate(total=Count('id')):
+                gauge.add_metric([queue, row['provider'] or 'unknown'], row['total'])
+        yield gauge
+
+
+def render_latest():
+    """(contenido, content type) en formato de exposición de texto"""
+    registry = prometheus_client.CollectorRegistry()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(prometheus_client.REGISTRY)
+    registry.register(DatabaseCollector())
+    registry.register(FulfillmentCollector())
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
@@ -1,26 +1,289 @@
 """
 Middleware para manejo de dominios - eSIM Pro
+
+Todos los middlewares del proyecto funcionan en modo síncrono (WSGI) y
+asíncrono (ASGI): en ASGI Django no tiene que pasar cada request por un hilo
+del pool para atravesarlos.
 """
 
-class DomainRedirectMiddleware:
+import sys
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+
+class AsyncCapableMiddleware:
     """
-    Middleware para redirigir el tráfico entre www y no-www
+    Base de los middlewares: __call__ en WSGI y __acall__ cuando la cadena
+    es asíncrona (ASGI)
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        host = request.get_host()
-        
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+async def call_within(context_manager, get_response, request):
+    """
+    await get_response(request) dentro de un context manager síncrono que
+    se entra y se sale en el hilo thread-sensitive del request, que es donde
+    ejecutan sus consultas las vistas síncronas y sync_to_async
+    """
+    await sync_to_async(context_manager.__enter__)()
+    try:
+        response = await get_response(request)
+    except BaseException:
+        await sync_to_async(context_manager.__exit__)(*sys.exc_info())
+        raise
+    await sync_to_async(context_manager.__exit__)(None, None, None)
+    return response
+
+
+class DomainRedirectMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware para redirigir el tráfico entre www y no-www
+    """
+    def handle(self, request):
         # Si viene de hablaris.com sin www, redirigir a www.hablaris.com
-        if host == 'hablaris.com':
+        if request.get_host() == 'hablaris.com':
             return self.redirect_to_www(request)
-        
-        response = self.get_response(request)
-        return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.get_host() == 'hablaris.com':
+            return self.redirect_to_www(request)
+        return await self.get_response(request)
     
     def redirect_to_www(self, request):
         from django.http import HttpResponsePermanentRedirect
         protocol = 'https' if request.is_secure() else 'http'
         new_url = f"{protocol}://www.hablaris.com{request.get_full_path()}"
         return HttpResponsePermanentRedirect(new_url)
+
+
+class ReplicaPinningMiddleware(AsyncCapableMiddleware):
+    """
+    Delimita el estado del router de réplicas por request: los métodos no
+    seguros leen siempre del primario y, tras cualquier escritura, el resto
+    del request también (el ContextVar viaja con sync_to_async en ASGI)
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def handle(self, request):
+        from .db_router import _pinned_to_primary
+
+        token = _pinned_to_primary.set(request.method not in self.SAFE_METHODS)
+        try:
+            return self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+    async def __acall__(self, request):
+        from .db_router import _pinned_to_primary
+
+        token = _pinned_to_primary.set(request.method not in self.SAFE_METHODS)
+        try:
+            return await self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+
+class StaticAssetMiddleware(AsyncCapableMiddleware):
+    """
+    Sirve STATIC_ROOT desde el propio proceso: variantes .br/.gz generadas
+    en collectstatic, cache inmutable para los nombres con hash y
+    FileResponse (sendfile vía wsgi.file_wrapper en gunicorn)
+    """
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    REVALIDATE = 'public, max-age=60'
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        from django.conf import settings
+
+        super().__init__(get_response)
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else f'/{settings.STATIC_URL}'
+        self.files = self.scan(settings.STATIC_ROOT) if settings.STATIC_ROOT else {}
+
+    def handle(self, request):
+        asset = self.find(request)
+        if asset is not None:
+            return self.serve(request, asset)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # serve() solo hace un open(): los archivos se envían en streaming
+        asset = self.find(request)
+        if asset is not None:
+            return self.serve(request, asset)
+        return await self.get_response(request)
+
+    def find(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            return self.files.get(request.path[len(self.prefix):])
+        return None
+
+    def scan(self, root):
+        """Índice de archivos recolectados, construido una vez al arrancar"""
+        import json
+        import mimetypes
+        import os
+
+        if not os.path.isdir(root):
+            return {}
+
+        hashed = set()
+        manifest_path = os.path.join(root, 'staticfiles.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as manifest:
+                hashed = set(json.load(manifest).get('paths', {}).values())
+
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(('.gz', '.br')) or filename == 'staticfiles.json':
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                variants = {'identity': path}
+                for encoding, suffix in self.ENCODINGS:
+                    if os.path.exists(path + suffix):
+                        variants[encoding] = path + suffix
+                # Un ETag por variante: son representaciones distintas (RFC 9110 §8.8.3)
+                etags = {}
+                for encoding, variant in variants.items():
+                    stat = os.stat(variant)
+                    suffix = '' if encoding == 'identity' else f'-{encoding}'
+                    etags[encoding] = f'"{stat.st_size:x}-{int(stat.st_mtime):x}{suffix}"'
+                files[name] = {
+                    'variants': variants,
+                    'content_type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                    'etags': etags,
+                    'cache_control': self.IMMUTABLE if name in hashed else self.REVALIDATE,
+                }
+        return files
+
+    def serve(self, request, asset):
+        from django.http import FileResponse, HttpResponseNotModified
+        from django.utils.cache import patch_vary_headers
+        from .page_cache import etag_matches, parse_accept_encoding
+
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = next(
+            (encoding for encoding, _ in self.ENCODINGS
+             if encoding in asset['variants'] and accepted.get(encoding, 0) > 0),
+            'identity'
+        )
+        etag = asset['etags'][encoding]
+
+        if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(asset['variants'][encoding], 'rb'), content_type=asset['content_type'])
+            response.headers.pop('Content-Disposition', None)
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        response['Cache-Control'] = asset['cache_control']
+        if len(asset['variants']) > 1:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+class ServerTimingMiddleware(AsyncCapableMiddleware):
+    """
+    Mide SQL, cache, proveedores y serialización de una muestra de requests
+    (SERVER_TIMING_SAMPLE_RATE) y lo emite como cabecera Server-Timing y como
+    una línea de log JSON en el logger esim_backend.performance
+    """
+
+    def __init__(self, get_response):
+        import logging
+        from django.conf import settings
+
+        super().__init__(get_response)
+        self.sample_rate = float(getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0))
+        self.logger = logging.getLogger('esim_backend.performance')
+
+    def sampled(self):
+        import random
+
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def handle(self, request):
+        from . import instrumentation
+
+        if not self.sampled():
+            return self.get_response(request)
+        token = instrumentation.start_request()
+        try:
+            with instrumentation.sql_instrumentation():
+                response = self.get_response(request)
+            metrics = instrumentation.current_metrics()
+        finally:
+            instrumentation.end_request(token)
+        return self.emit(request, response, metrics)
+
+    async def __acall__(self, request):
+        from . import instrumentation
+
+        if not self.sampled():
+            return await self.get_response(request)
+        token = instrumentation.start_request()
+        try:
+            response = await call_within(instrumentation.sql_instrumentation(), self.get_response, request)
+            metrics = instrumentation.current_metrics()
+        finally:
+            instrumentation.end_request(token)
+        return self.emit(request, response, metrics)
+
+    def emit(self, request, response, metrics):
+        from . import json_codec
+
+        response['Server-Timing'] = metrics.server_timing()
+        line = dict(metrics.as_dict(), method=request.method, path=request.path, status=response.status_code)
+        self.logger.info(json_codec.dumps(line).decode())
+        return response
+
+
+class RequestMetricsMiddleware(AsyncCapableMiddleware):
+    """Latencia de cada request en hablaris_http_request_seconds, por vista"""
+
+    def handle(self, request):
+        import time
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        import time
+
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, elapsed):
+        from .metrics import observe_request
+
+        match = getattr(request, 'resolver_match', None)
+        # Sin vista resuelta (404, redirecciones de middleware): una sola etiqueta
+        view = (match.view_name or match._func_path) if match else 'unmatched'
+        observe_request(view, request.method, response.status_code, elapsed)
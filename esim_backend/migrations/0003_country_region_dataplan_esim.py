@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('esim_backend', '0002_remove_dataplan_country_remove_region_countries_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Country',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='País')),
+                ('code', models.CharField(max_length=3, unique=True, verbose_name='Código ISO')),
+                ('flag', models.CharField(max_length=10, verbose_name='Emoji Flag')),
+                ('is_popular', models.BooleanField(default=False, verbose_name='¿Es popular?')),
+            ],
+            options={
+                'verbose_name': 'País',
+                'verbose_name_plural': 'Países',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DataPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_gb', models.IntegerField(verbose_name='Datos (GB)')),
+                ('duration_days', models.IntegerField(verbose_name='Duración (días)')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Precio USD')),
+            ],
+            options={
+                'verbose_name': 'Plan de Datos',
+                'verbose_name_plural': 'Planes de Datos',
+                'ordering': ['region', 'price'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ESim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('active', 'Activo'), ('expired', 'Vencido'), ('cancelled', 'Cancelado')], default='pending', max_length=20, verbose_name='Estado')),
+                ('data_remaining_gb', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='GB Restantes')),
+                ('activated_date', models.DateTimeField(blank=True, null=True, verbose_name='Fecha Activación')),
+                ('expires_date', models.DateTimeField(blank=True, null=True, verbose_name='Fecha Vencimiento')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('data_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='esim_backend.dataplan', verbose_name='Plan de Datos')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'eSIM',
+                'verbose_name_plural': 'eSIMs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Region',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Región')),
+                ('countries', models.ManyToManyField(to='esim_backend.country', verbose_name='Países')),
+            ],
+            options={
+                'verbose_name': 'Región',
+                'verbose_name_plural': 'Regiones',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='dataplan',
+            name='region',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='esim_backend.region', verbose_name='Región'),
+        ),
+    ]
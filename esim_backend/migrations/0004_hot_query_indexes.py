@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+USER_EMAIL_INDEX = models.Index(fields=['email'], name='auth_user_email_idx')
+
+
+def add_user_email_index(apps, schema_editor):
+    """Índice sobre auth_user.email para login/registro por email"""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.add_index(User, USER_EMAIL_INDEX)
+
+
+def remove_user_email_index(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.remove_index(User, USER_EMAIL_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('esim_backend', '0003_country_region_dataplan_esim'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='country',
+            index=models.Index(condition=models.Q(('is_popular', True)), fields=['name'], name='country_popular_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataplan',
+            index=models.Index(fields=['region', 'price'], name='dataplan_region_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataplan',
+            index=models.Index(fields=['price'], name='dataplan_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['user', 'status'], name='esim_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['user', '-created_at'], name='esim_user_created_idx'),
+        ),
+        migrations.RunPython(add_user_email_index, remove_user_email_index),
+    ]
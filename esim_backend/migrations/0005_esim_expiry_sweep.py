@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('esim_backend', '0004_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='esim',
+            name='provider',
+            field=models.CharField(blank=True, choices=[('twilio', 'Twilio Super SIM'), ('oneglobal', '1GLOBAL'), ('airalo', 'Airalo')], max_length=20, verbose_name='Proveedor'),
+        ),
+        migrations.AddField(
+            model_name='esim',
+            name='provider_esim_id',
+            field=models.CharField(blank=True, max_length=100, verbose_name='ID en Proveedor'),
+        ),
+        migrations.AddField(
+            model_name='esim',
+            name='provider_suspended_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Suspendido en Proveedor'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['status', 'expires_date'], name='esim_status_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(condition=models.Q(('provider_suspended_at__isnull', True), ('status', 'expired')), fields=['provider', 'id'], name='esim_pending_suspension_idx'),
+        ),
+    ]
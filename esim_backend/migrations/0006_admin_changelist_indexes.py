@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('esim_backend', '0005_esim_expiry_sweep'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['-created_at'], name='esim_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['status', '-created_at'], name='esim_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['provider', '-created_at'], name='esim_provider_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='esim',
+            index=models.Index(fields=['provider_esim_id'], name='esim_provider_esim_id_idx'),
+        ),
+    ]
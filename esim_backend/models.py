@@ -13,6 +13,10 @@ class Country(models.Model):
         verbose_name = "País"
         verbose_name_plural = "Países"
         ordering = ['name']
+        indexes = [
+            # Países populares (índice parcial, solo filas is_popular)
+            models.Index(fields=['name'], condition=models.Q(is_popular=True), name='country_popular_name_idx'),
+        ]
     
     def __str__(self):
         return f"{self.flag} {self.name}"
@@ -41,6 +45,11 @@ class DataPlan(models.Model):
         verbose_name = "Plan de Datos"
         verbose_name_plural = "Planes de Datos"
         ordering = ['region', 'price']
+        indexes = [
+            # Planes de una región ordenados por precio
+            models.Index(fields=['region', 'price'], name='dataplan_region_price_idx'),
+            models.Index(fields=['price'], name='dataplan_price_idx'),
+        ]
     
     def __str__(self):
         return f"{self.region.name} - {self.data_gb}GB / {self.duration_days}d - ${self.price}"
@@ -53,6 +62,11 @@ class ESim(models.Model):
         ('expired', 'Vencido'),
         ('cancelled', 'Cancelado'),
     ]
+    PROVIDER_CHOICES = [
+        ('twilio', 'Twilio Super SIM'),
+        ('oneglobal', '1GLOBAL'),
+        ('airalo', 'Airalo'),
+    ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Usuario")
     data_plan = models.ForeignKey(DataPlan, on_delete=models.CASCADE, verbose_name="Plan de Datos")
@@ -61,13 +75,38 @@ class ESim(models.Model):
     activated_date = models.DateTimeField(null=True, blank=True, verbose_name="Fecha Activación")
     expires_date = models.DateTimeField(null=True, blank=True, verbose_name="Fecha Vencimiento")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado")
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES, blank=True, verbose_name="Proveedor")
+    provider_esim_id = models.CharField(max_length=100, blank=True, verbose_name="ID en Proveedor")
+    provider_suspended_at = models.DateTimeField(null=True, blank=True, verbose_name="Suspendido en Proveedor")
     
     class Meta:
         verbose_name = "eSIM"
         verbose_name_plural = "eSIMs"
         ordering = ['-created_at']
+        indexes = [
+            # eSIMs de un usuario por estado y listado del usuario (más recientes primero)
+            models.Index(fields=['user', 'status'], name='esim_user_status_idx'),
+            models.Index(fields=['user', '-created_at'], name='esim_user_created_idx'),
+            # Barrido de vencidas y cola de suspensiones pendientes en el proveedor
+            models.Index(fields=['status', 'expires_date'], name='esim_status_expires_idx'),
+            models.Index(
+                fields=['provider', 'id'],
+                name='esim_pending_suspension_idx',
+                condition=models.Q(status='expired', provider_suspended_at__isnull=True),
+            ),
+            # Changelist del admin: orden por fecha, filtros y búsqueda por ID del proveedor
+            models.Index(fields=['-created_at'], name='esim_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='esim_status_created_idx'),
+            models.Index(fields=['provider', '-created_at'], name='esim_provider_created_idx'),
+            models.Index(fields=['provider_esim_id'], name='esim_provider_esim_id_idx'),
+        ]
     
     def __str__(self):
+        # Sin user y data_plan.region cargados (p. ej. el listado de borrado en cascada
+        # del admin) no se hace una consulta por fila
+        loaded = ESim.user.field.is_cached(self) and ESim.data_plan.field.is_cached(self)
+        if not (loaded and DataPlan.region.field.is_cached(self.data_plan)):
+            return f"eSIM {self.pk} ({self.status})"
         return f"{self.user.username} - {self.data_plan.region.name} ({self.status})"
     
     def save(self, *args, **kwargs):
@@ -0,0 +1,205 @@
+"""
+Cache de páginas precomprimidas
+
+Cada página se construye una sola vez por proceso (es decir, por deploy) y
+se guarda en memoria sin comprimir, en gzip y, si está instalado, en brotli.
+Las peticiones condicionales con If-None-Match reciben 304; cada
+codificación tiene su propio ETag.
+
+Las páginas con formularios llevan el token CSRF, que cambia por request.
+Para no recomprimir la página entera, el gzip se guarda en segmentos deflate
+independientes (Z_FULL_FLUSH) alrededor del marcador y en cada request solo
+se comprime el token y se recalcula el CRC.
+"""
+
+import gzip
+import hashlib
+import struct
+import threading
+import zlib
+import logging
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él se sirve gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Marcador que sustituye al token CSRF al construir la página
+CSRF_PLACEHOLDER = 'HABLARIS-CSRF-TOKEN-PLACEHOLDER'
+
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+DEFLATE_FINAL_BLOCK = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS).flush(zlib.Z_FINISH)
+
+
+def deflate_segment(data: bytes, level: int = 9) -> bytes:
+    """Segmento deflate autocontenido que se puede concatenar con otros"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Codificaciones aceptadas con su peso q"""
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return etag in candidates or f'W/{etag}' in candidates
+
+
+class CompressedPage:
+    """Página construida con sus variantes comprimidas"""
+
+    def __init__(self, content: str, content_type: str = 'text/html; charset=utf-8'):
+        body = content.encode('utf-8')
+        self.content_type = content_type
+        self.etag = hashlib.sha256(body).hexdigest()[:20]
+        self.parts: List[bytes] = body.split(CSRF_PLACEHOLDER.encode())
+        self.needs_csrf = len(self.parts) > 1
+
+        if self.needs_csrf:
+            self.gzip_parts = [deflate_segment(part) for part in self.parts]
+            self.variants = {}
+        else:
+            self.variants = {'identity': body, 'gzip': gzip.compress(body, 9, mtime=0)}
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=11)
+
+    def encodings(self) -> List[str]:
+        """Codificaciones disponibles por orden de preferencia"""
+        if self.needs_csrf:
+            return ['gzip', 'identity']
+        return [encoding for encoding in ('br', 'gzip', 'identity') if encoding in self.variants]
+
+    def body(self, encoding: str, token: Optional[str] = None) -> bytes:
+        if not self.needs_csrf:
+            return self.variants[encoding]
+
+        token_bytes = (token or '').encode()
+        if encoding == 'identity':
+            return token_bytes.join(self.parts)
+
+        # Segmentos precomprimidos + el token comprimido en este request
+        token_segment = deflate_segment(token_bytes, level=1)
+        chunks = [GZIP_HEADER]
+        crc = 0
+        size = 0
+        for index, part in enumerate(self.parts):
+            if index:
+                chunks.append(token_segment)
+                crc = zlib.crc32(token_bytes, crc)
+                size += len(token_bytes)
+            chunks.append(self.gzip_parts[index])
+            crc = zlib.crc32(part, crc)
+            size += len(part)
+        chunks.append(DEFLATE_FINAL_BLOCK)
+        chunks.append(struct.pack('<II', crc, size & 0xffffffff))
+        return b''.join(chunks)
+
+
+class PageCache:
+    """Páginas precomprimidas por clave, construidas en el primer uso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages: Dict[str, CompressedPage] = {}
+
+    def get(self, key: str, build: Callable[[], str]) -> CompressedPage:
+        page = self._pages.get(key)
+        if page is not None:
+            return page
+
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                page = CompressedPage(build())
+                self._pages[key] = page
+                logger.info(f"Página {key} cacheada")
+            return page
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def respond(self, request, key: str, build: Callable[[], str]) -> HttpResponse:
+        """Respuesta con la mejor codificación aceptada, o 304 si no cambió"""
+        page = self.get(key, build)
+
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = next(
+            (name for name in page.encodings() if name == 'identity' or accepted.get(name, 0) > 0),
+            'identity'
+        )
+
+        token = None
+        etag = page.etag
+        if page.needs_csrf:
+            token = get_token(request)
+            # La página sigue siendo válida mientras no cambie el secreto CSRF
+            secret = request.META.get('CSRF_COOKIE', '')
+            etag = f"{etag}-{hashlib.sha256(secret.encode()).hexdigest()[:8]}"
+        if encoding != 'identity':
+            # ETag fuerte distinto por codificación (RFC 9110 §8.8.3)
+            etag = f'{etag}-{encoding}'
+        etag = f'"{etag}"'
+
+        cache_control = 'private, no-cache' if page.needs_csrf else 'public, max-age=0, must-revalidate'
+
+        if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+            response = HttpResponseNotModified()
+        else:
+            body = page.body(encoding, token)
+            # HEAD: mismas cabeceras (Content-Length incluido) sin cuerpo
+            response = HttpResponse(b'' if request.method == 'HEAD' else body, content_type=page.content_type)
+            response['Content-Length'] = str(len(body))
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+# Instancia global del cache de páginas
+page_cache = PageCache()
+
+
+def cached_page(view):
+    """Servir una vista sin parámetros ni contenido dinámico desde el cache de páginas"""
+    key = f'{view.__module__}.{view.__qualname__}'
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        return page_cache.respond(
+            request, key, lambda: view(request, *args, **kwargs).content.decode('utf-8')
+        )
+
+    return wrapper
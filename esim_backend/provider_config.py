@@ -0,0 +1,187 @@
+"""
+Registro centralizado de configuración de proveedores eSIM
+
+Carga una sola vez las credenciales de cada proveedor (settings, variables de
+entorno y archivos .env.twilio / .env.1ot) y las mantiene en memoria. Los
+archivos se vuelven a leer solo cuando cambia su mtime o al recibir la señal
+de recarga, así que las vistas y servicios nunca hacen I/O por request.
+
+Precedencia: variables de entorno > archivo .env del proveedor > settings.
+Los archivos se buscan donde los leían las vistas legacy (el directorio
+padre del proyecto), no en el repositorio, que trae plantillas de ejemplo.
+"""
+
+import os
+import signal
+import threading
+import time
+import logging
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Archivo .env propio de cada proveedor (sobrescribe settings, no el entorno)
+PROVIDER_ENV_FILES = {
+    'twilio': '.env.twilio',
+    '1ot': '.env.1ot',
+}
+
+# Claves que cada proveedor toma de settings o del entorno
+PROVIDER_KEYS = {
+    'twilio': [
+        'TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'TWILIO_SUPERSIM_FLEET_SID',
+        'TWILIO_PHONE_NUMBER', 'TWILIO_TEST_MODE',
+    ],
+    '1ot': [
+        'IOT_API_KEY', 'IOT_API_SECRET', 'IOT_BASE_URL', 'IOT_TEST_MODE',
+    ],
+    'airalo': [
+        'AIRALO_CLIENT_ID', 'AIRALO_CLIENT_SECRET', 'AIRALO_BASE_URL',
+    ],
+    'oneglobal': [
+        'ONEGLOBAL_BASE_URL', 'ONEGLOBAL_API_KEY', 'ONEGLOBAL_API_SECRET',
+        'ONEGLOBAL_PARTNER_ID', 'DEFAULT_NOTIFICATION_EMAIL',
+    ],
+}
+
+
+def parse_env_file(path: Path) -> Dict[str, str]:
+    """Parsear un archivo KEY=VALUE con el mismo formato que usaban las vistas legacy"""
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            if '=' in line and not line.startswith('#'):
+                key, value = line.strip().split('=', 1)
+                values[key] = value.strip('"\'')
+    return values
+
+
+class ProviderConfigRegistry:
+    """Configuración de proveedores cacheada en memoria con recarga en caliente"""
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._configs: Dict[str, Mapping[str, str]] = {}
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._loaded = False
+        self._last_check = 0.0
+        self._reload_requested = False
+        self._check_interval = check_interval
+
+    @property
+    def check_interval(self) -> float:
+        """Segundos mínimos entre comprobaciones de mtime"""
+        if self._check_interval is None:
+            self._check_interval = float(getattr(settings, 'PROVIDER_CONFIG_CHECK_INTERVAL', 2.0))
+        return self._check_interval
+
+    def search_dirs(self) -> List[Path]:
+        """Directorios donde buscar los archivos .env de proveedores"""
+        dirs = getattr(settings, 'PROVIDER_CONFIG_DIRS', None)
+        if dirs is None:
+            dirs = [Path(settings.BASE_DIR).parent]
+        return [Path(d) for d in dirs]
+
+    def env_file_path(self, provider: str) -> Optional[Path]:
+        """Ruta del primer archivo .env existente para el proveedor"""
+        filename = PROVIDER_ENV_FILES.get(provider)
+        if not filename:
+            return None
+        for directory in self.search_dirs():
+            candidate = directory / filename
+            if candidate.exists():
+                return candidate
+        return None
+
+    def _current_mtimes(self) -> Dict[str, Optional[float]]:
+        mtimes = {}
+        for provider in PROVIDER_ENV_FILES:
+            path = self.env_file_path(provider)
+            try:
+                mtimes[provider] = path.stat().st_mtime if path else None
+            except OSError:
+                mtimes[provider] = None
+        return mtimes
+
+    def _build(self, provider: str) -> Mapping[str, str]:
+        keys = PROVIDER_KEYS.get(provider, [])
+        values = {key: getattr(settings, key) for key in keys if getattr(settings, key, None) is not None}
+
+        path = self.env_file_path(provider)
+        if path:
+            try:
+                values.update(parse_env_file(path))
+            except Exception as e:
+                logger.error(f"Error leyendo configuración de {provider} ({path}): {e}")
+
+        # Las variables de entorno del despliegue (Railway) mandan sobre los archivos
+        values.update({key: os.environ[key] for key in keys if key in os.environ})
+
+        return MappingProxyType(values)
+
+    def reload(self) -> None:
+        """Recargar la configuración de todos los proveedores"""
+        with self._lock:
+            mtimes = self._current_mtimes()
+            providers = set(PROVIDER_KEYS) | set(PROVIDER_ENV_FILES)
+            self._configs = {provider: self._build(provider) for provider in providers}
+            self._mtimes = mtimes
+            self._loaded = True
+            self._last_check = time.monotonic()
+        logger.info("Configuración de proveedores cargada")
+
+    def _maybe_reload(self) -> None:
+        if not self._loaded or self._reload_requested:
+            self._reload_requested = False
+            self.reload()
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+
+        self._last_check = now
+        if self._current_mtimes() != self._mtimes:
+            self.reload()
+
+    def get(self, provider: str) -> Mapping[str, str]:
+        """Configuración (solo lectura) de un proveedor"""
+        self._maybe_reload()
+        return self._configs.get(provider, MappingProxyType({}))
+
+    def request_reload(self) -> None:
+        """Marcar la configuración para recargarla en el próximo get()"""
+        self._reload_requested = True
+
+    def install_signal_handler(self) -> bool:
+        """Recargar al recibir PROVIDER_CONFIG_RELOAD_SIGNAL (SIGHUP por defecto)
+
+        El handler solo marca la recarga: reload() toma el lock y la señal
+        puede llegar con el hilo principal dentro de él. Solo lo instala
+        post_worker_init (gunicorn.conf.py); el resto de procesos (manage.py)
+        conserva el comportamiento por defecto de la señal.
+        """
+        signal_name = getattr(settings, 'PROVIDER_CONFIG_RELOAD_SIGNAL', 'SIGHUP')
+        signum = getattr(signal, signal_name or '', None)
+        if signum is None:
+            return False
+
+        try:
+            signal.signal(signum, lambda *args: self.request_reload())
+        except ValueError:
+            # signal.signal solo puede usarse desde el hilo principal
+            return False
+        return True
+
+
+# Instancia global del registro
+provider_config = ProviderConfigRegistry()
+
+
+def get_provider_config(provider: str) -> Mapping[str, str]:
+    """Atajo para obtener la configuración de un proveedor"""
+    return provider_config.get(provider)
@@ -0,0 +1,158 @@
+"""
+Detector de N+1 y consultas lentas para desarrollo y tests
+
+Con connection.execute_wrapper se registra cada consulta del request con su
+SQL normalizado (literales y parámetros -> ?) y la línea del proyecto que la
+lanzó. Al terminar se marcan:
+
+- N+1: el mismo SQL desde la misma línea QUERY_INSPECTOR_N_PLUS_ONE o más
+  veces (un bucle que consulta una relación por fila)
+- Lentas: consultas de más de QUERY_INSPECTOR_SLOW_MS milisegundos
+
+QUERY_INSPECTOR elige qué hacer: 'off' (por defecto en producción), 'log'
+(por defecto con DEBUG; informe en el logger esim_backend.query_inspector) o
+'raise' (QueryInspectorError, para que falle el test que hizo el request):
+
+    QUERY_INSPECTOR=raise pytest
+
+En tests también puede usarse alrededor de cualquier bloque:
+
+    with inspect_queries(mode='raise'):
+        client.get('/api/countries/regions/')
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .middleware import AsyncCapableMiddleware, call_within
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+THIS_FILE = os.path.abspath(__file__)
+PROJECT_ROOT = str(settings.BASE_DIR)
+
+
+class QueryInspectorError(AssertionError):
+    """N+1 o consultas lentas con QUERY_INSPECTOR='raise'"""
+
+
+def normalize_sql(sql: str) -> str:
+    """Misma forma para consultas que solo cambian en valores o en el tamaño de IN (...)"""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def call_site() -> str:
+    """Primera línea del proyecto en la pila (fuera de Django y de este módulo)"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(PROJECT_ROOT) and filename != THIS_FILE
+                and 'site-packages' not in filename):
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_lineno} en {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'desconocido'
+
+
+class QueryInspector:
+    """execute_wrapper que agrupa consultas por SQL normalizado y línea de origen"""
+
+    def __init__(self, n_plus_one_threshold: int = None, slow_query_ms: float = None, ignore_tables=None):
+        self.n_plus_one_threshold = n_plus_one_threshold or getattr(settings, 'QUERY_INSPECTOR_N_PLUS_ONE', 5)
+        self.slow_query_ms = slow_query_ms or getattr(settings, 'QUERY_INSPECTOR_SLOW_MS', 100)
+        self.ignore_tables = ignore_tables if ignore_tables is not None else getattr(
+            settings, 'QUERY_INSPECTOR_IGNORE_TABLES', ['hablaris_cache']
+        )
+        self.groups: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        self.slow: List[Tuple[float, str, str]] = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if not any(table in sql for table in self.ignore_tables):
+                self.total += 1
+                site = call_site()
+                self.groups[(normalize_sql(sql), site)].append(elapsed_ms)
+                if elapsed_ms >= self.slow_query_ms:
+                    self.slow.append((elapsed_ms, site, sql))
+
+    def n_plus_one(self) -> List[Tuple[int, float, str, str]]:
+        """(veces, ms totales, línea, SQL) de los grupos repetidos, los peores primero"""
+        repeated = [
+            (len(times), sum(times), site, sql)
+            for (sql, site), times in self.groups.items()
+            if len(times) >= self.n_plus_one_threshold
+        ]
+        return sorted(repeated, reverse=True)
+
+    def has_problems(self) -> bool:
+        return bool(self.slow or self.n_plus_one())
+
+    def format_report(self, label: str = '') -> str:
+        lines = [f"Consultas de {label or 'bloque'}: {self.total} en total"]
+        for count, total_ms, site, sql in self.n_plus_one():
+            lines.append(f"  N+1 x{count} ({total_ms:.1f} ms) en {site}: {sql[:300]}")
+        for elapsed_ms, site, sql in sorted(self.slow, reverse=True):
+            lines.append(f"  Lenta {elapsed_ms:.1f} ms en {site}: {sql[:300]}")
+        return '\n'.join(lines)
+
+
+def inspector_mode() -> str:
+    return getattr(settings, 'QUERY_INSPECTOR', 'off')
+
+
+@contextmanager
+def inspect_queries(mode: str = None, label: str = '', **options):
+    """Inspecciona las consultas del bloque en todas las conexiones"""
+    mode = mode or inspector_mode()
+    inspector = QueryInspector(**options)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(inspector))
+        yield inspector
+
+    if mode != 'off' and inspector.has_problems():
+        report = inspector.format_report(label)
+        if mode == 'raise':
+            raise QueryInspectorError(report)
+        logger.warning(report)
+
+
+class QueryInspectorMiddleware(AsyncCapableMiddleware):
+    """Inspecciona cada request; se desactiva solo con QUERY_INSPECTOR='off'"""
+
+    def __init__(self, get_response):
+        if inspector_mode() == 'off':
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+
+    def handle(self, request):
+        with inspect_queries(label=f'{request.method} {request.path}'):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Los execute_wrapper se instalan en el hilo donde corren las consultas
+        block = inspect_queries(label=f'{request.method} {request.path}')
+        return await call_within(block, self.get_response, request)
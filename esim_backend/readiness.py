@@ -0,0 +1,186 @@
+"""
+Readiness con comprobaciones de dependencias en segundo plano
+
+Un hilo por proceso comprueba cada READINESS_CHECK_INTERVAL segundos:
+
+- database: SELECT 1 en el primario; las réplicas (database:<alias>) solo
+  informan, porque el router (db_router.py) ya manda las lecturas al
+  primario si una réplica cae o se retrasa
+- cache: escritura y lectura en el cache compartido (L2 de TwoTierCache)
+- migrations: que no queden migraciones pendientes (una vez aplicadas no se
+  vuelve a mirar)
+- providers: que la API de cada proveedor configurado responda (cualquier
+  status HTTP vale); no cuenta para la readiness, porque un proveedor caído
+  dejaría sin tráfico a todas las instancias a la vez
+
+/health/ready solo lee el último resultado: los probes no generan carga ni
+esperan a una dependencia lenta. Si el hilo se queda colgado el resultado
+envejece y a las READINESS_STALE_AFTER comprobaciones perdidas se da por no
+listo. /health/live solo indica que el proceso responde.
+
+El hilo arranca con el primer /health/ready (y otra vez tras un fork de
+gunicorn), así que manage.py y los tests no lo lanzan.
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+# Las comprobaciones de réplicas y proveedores solo informan
+CRITICAL_CHECKS = ('database', 'cache', 'migrations')
+
+TWILIO_API_URL = 'https://supersim.twilio.com/v1'
+
+
+def provider_endpoints() -> Dict[str, str]:
+    """URL base de los proveedores con credenciales (fuera de modo test)"""
+    from .provider_config import get_provider_config
+
+    endpoints = {}
+    airalo = get_provider_config('airalo')
+    if airalo.get('AIRALO_CLIENT_ID'):
+        endpoints['airalo'] = airalo.get('AIRALO_BASE_URL') or 'https://partners.airalo.com/api/v2'
+    oneglobal = get_provider_config('oneglobal')
+    if oneglobal.get('ONEGLOBAL_API_KEY') and oneglobal.get('ONEGLOBAL_BASE_URL'):
+        endpoints['oneglobal'] = oneglobal['ONEGLOBAL_BASE_URL']
+    iot = get_provider_config('1ot')
+    if iot.get('IOT_API_KEY') and iot.get('IOT_BASE_URL') and iot.get('IOT_TEST_MODE') != 'true':
+        endpoints['1ot'] = iot['IOT_BASE_URL']
+    twilio = get_provider_config('twilio')
+    if twilio.get('TWILIO_ACCOUNT_SID') and twilio.get('TWILIO_TEST_MODE') != 'true':
+        endpoints['twilio'] = TWILIO_API_URL
+    return endpoints
+
+
+class ReadinessMonitor:
+    """Hilo de comprobaciones y último resultado (lectura O(1))"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._snapshot: Optional[dict] = None
+        self._migrations_applied = False
+        self._http = requests.Session()
+
+    @property
+    def interval(self) -> float:
+        if self._interval is None:
+            self._interval = float(getattr(settings, 'READINESS_CHECK_INTERVAL', 10))
+        return self._interval
+
+    def ensure_started(self) -> None:
+        """Arranca el hilo si no corre en este proceso"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='readiness-monitor', daemon=True)
+            self._thread.start()
+
+    def status(self) -> Tuple[bool, dict]:
+        """(listo, detalle) a partir del último resultado"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False, {'status': 'starting'}
+        age = time.time() - snapshot['checked_at']
+        stale = age > self.interval * getattr(settings, 'READINESS_STALE_AFTER', 3)
+        ready = snapshot['ready'] and not stale
+        status = 'ready' if ready else ('stale' if stale else 'unavailable')
+        return ready, dict(snapshot, status=status, age_s=round(age, 1))
+
+    # ----- Hilo -----
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.error(f"Error en las comprobaciones de readiness: {e}")
+            finally:
+                # Las conexiones de este hilo no deben quedar abiertas entre rondas
+                connections.close_all()
+            time.sleep(self.interval)
+
+    def run_checks(self) -> dict:
+        """Ejecuta todas las comprobaciones y publica el resultado"""
+        checks = {}
+        for alias in connections:
+            name = 'database' if alias == DEFAULT_DB_ALIAS else f'database:{alias}'
+            checks[name] = self._timed(lambda alias=alias: self.check_database(alias))
+        checks['cache'] = self._timed(self.check_cache)
+        checks['migrations'] = self._timed(self.check_migrations)
+        for provider, url in provider_endpoints().items():
+            checks[f'provider:{provider}'] = self._timed(lambda url=url: self.check_provider(url))
+
+        ready = all(result['ok'] for name, result in checks.items() if name in CRITICAL_CHECKS)
+        previous = self._snapshot
+        if previous is None or previous['ready'] != ready:
+            failing = [name for name, result in checks.items() if not result['ok']]
+            if ready:
+                logger.info("Readiness: instancia lista")
+            else:
+                logger.warning(f"Readiness: instancia no lista ({', '.join(failing)})")
+        self._snapshot = {'ready': ready, 'checked_at': time.time(), 'checks': checks}
+        return self._snapshot
+
+    def _timed(self, check: Callable[[], Optional[str]]) -> dict:
+        start = time.perf_counter()
+        try:
+            detail = check()
+            result = {'ok': True}
+            if detail:
+                result['detail'] = detail
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)[:200]}
+        result['ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    # ----- Comprobaciones -----
+
+    def check_database(self, alias: str) -> None:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+
+    def check_cache(self) -> None:
+        alias = 'shared' if 'shared' in settings.CACHES else 'default'
+        cache = caches[alias]
+        key = f'readiness:{os.getpid()}'
+        token = str(time.time())
+        cache.set(key, token, timeout=int(self.interval * 3))
+        if cache.get(key) != token:
+            raise RuntimeError('el cache no devuelve lo escrito')
+
+    def check_migrations(self) -> Optional[str]:
+        if self._migrations_applied:
+            return None
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if plan:
+            raise RuntimeError(f'{len(plan)} migraciones pendientes')
+        self._migrations_applied = True
+        return None
+
+    def check_provider(self, url: str) -> str:
+        timeout = float(getattr(settings, 'READINESS_PROVIDER_TIMEOUT', 3))
+        response = self._http.head(url, timeout=timeout, allow_redirects=False)
+        return f'HTTP {response.status_code}'
+
+
+# Instancia global del monitor de readiness
+readiness_monitor = ReadinessMonitor()
@@ -69,6 +69,7 @@ DJANGO_APPS = [
 
 THIRD_PARTY_APPS = [
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
 ]
 
@@ -90,14 +91,63 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'esim_backend.middleware.DomainRedirectMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'esim_backend.middleware.StaticAssetMiddleware',
+    'esim_backend.middleware.RequestMetricsMiddleware',
+    'esim_backend.middleware.ServerTimingMiddleware',
+    'esim_backend.query_inspector.QueryInspectorMiddleware',
+    'esim_backend.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'esim_backend.authentication.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Fracción de requests instrumentados (Server-Timing + log en esim_backend.performance)
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '1.0' if DEBUG else '0.05'))
+
+# Detector de N+1 y consultas lentas (ver esim_backend/query_inspector.py): off | log | raise
+QUERY_INSPECTOR = os.getenv('QUERY_INSPECTOR', 'log' if DEBUG else 'off')
+QUERY_INSPECTOR_N_PLUS_ONE = int(os.getenv('QUERY_INSPECTOR_N_PLUS_ONE', '5'))
+QUERY_INSPECTOR_SLOW_MS = float(os.getenv('QUERY_INSPECTOR_SLOW_MS', '100'))
+
+# /metrics (Prometheus): exige Authorization: Bearer <METRICS_TOKEN>; sin token responde 404
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# /health/ready (ver esim_backend/readiness.py): cada cuánto se comprueban las
+# dependencias en segundo plano y cuántas rondas perdidas lo dejan en 503
+READINESS_CHECK_INTERVAL = float(os.getenv('READINESS_CHECK_INTERVAL', '10'))
+READINESS_STALE_AFTER = int(os.getenv('READINESS_STALE_AFTER', '3'))
+READINESS_PROVIDER_TIMEOUT = float(os.getenv('READINESS_PROVIDER_TIMEOUT', '3'))
+
+# Límite (s) de cada llamada al SDK de Twilio (services/esim_providers/twilio_client_pool.py)
+TWILIO_REQUEST_TIMEOUT = float(os.getenv('TWILIO_REQUEST_TIMEOUT', '10'))
+
+# Warmup al cargar la aplicación (ver esim_backend/warmup.py); con runserver
+# (DEBUG) no compensa en cada recarga
+WARMUP_ON_BOOT = os.getenv('WARMUP_ON_BOOT', 'false' if DEBUG else 'true').lower() == 'true'
+WARMUP_GC_FREEZE = os.getenv('WARMUP_GC_FREEZE', 'true').lower() == 'true'
+
+# Snapshot mmap del catálogo compartido por los workers (ver esim_backend/catalog_snapshot.py)
+CATALOG_SNAPSHOT_PATH = os.getenv('CATALOG_SNAPSHOT_PATH', '/tmp/hablaris_catalog.snapshot')
+CATALOG_SNAPSHOT_MAX_AGE = float(os.getenv('CATALOG_SNAPSHOT_MAX_AGE', '300'))
+CATALOG_SNAPSHOT_CHECK_INTERVAL = float(os.getenv('CATALOG_SNAPSHOT_CHECK_INTERVAL', '5'))
+
+# Changelists del admin: por encima de estas filas (estimación del planner) no se hace COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'esim_backend.performance': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'esim_backend.urls'
 
 TEMPLATES = [
@@ -120,6 +170,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'esim_backend.wsgi.application'
+ASGI_APPLICATION = 'esim_backend.asgi.application'
+
+# 'wsgi' (workers sync) o 'asgi' (workers uvicorn); ver gunicorn.conf.py
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+# En modo ASGI las vistas que esperan a proveedores se enrutan a su versión async
+ASYNC_PROVIDER_VIEWS = SERVER_MODE == 'asgi'
 
 
 # Database
@@ -140,6 +196,86 @@ DATABASES = {
     )
 }
 
+# Read replicas: DATABASE_REPLICA_URLS="postgres://...,postgres://..."
+# Se registran como replica_1..replica_N y las usa esim_backend.db_router
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+]
+# Una réplica caída o inalcanzable no debe bloquear hilos de request
+DATABASE_REPLICA_CONNECT_TIMEOUT = int(os.getenv('DATABASE_REPLICA_CONNECT_TIMEOUT', '2'))
+DATABASE_REPLICA_STATEMENT_TIMEOUT_MS = int(os.getenv('DATABASE_REPLICA_STATEMENT_TIMEOUT_MS', '30000'))
+for index, replica_url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+    if 'postgresql' in DATABASES[f'replica_{index}']['ENGINE']:
+        replica_options = DATABASES[f'replica_{index}'].setdefault('OPTIONS', {})
+        replica_options.setdefault('connect_timeout', DATABASE_REPLICA_CONNECT_TIMEOUT)
+        replica_options['options'] = (
+            f"{replica_options.get('options', '')} -c statement_timeout={DATABASE_REPLICA_STATEMENT_TIMEOUT_MS}"
+        ).strip()
+
+DATABASE_ROUTERS = ['esim_backend.db_router.ReplicaRouter']
+
+# Lag máximo (segundos) para leer de una réplica y cada cuánto medirlo
+DATABASE_REPLICA_MAX_LAG = float(os.getenv('DATABASE_REPLICA_MAX_LAG', '5'))
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('DATABASE_REPLICA_LAG_CHECK_INTERVAL', '5'))
+
+# Cache en dos niveles (ver esim_backend/tiered_cache.py): L1 en proceso
+# delante de 'shared', que es Redis si hay REDIS_URL y si no la tabla
+# hablaris_cache (python manage.py createcachetable)
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'esim_backend.tiered_cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': int(os.getenv('CACHE_L1_MAX_ENTRIES', '1000')),
+            'L1_TIMEOUT': float(os.getenv('CACHE_L1_TIMEOUT', '30')),
+            'SYNC_INTERVAL': float(os.getenv('CACHE_SYNC_INTERVAL', '1')),
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'hablaris_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+
+# Autenticación con usuario/token en cache y login por email (ver esim_backend/authentication.py)
+AUTHENTICATION_BACKENDS = [
+    'esim_backend.authentication.EmailBackend',
+]
+AUTH_CACHE_TIMEOUT = int(os.getenv('AUTH_CACHE_TIMEOUT', '60'))
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', '4'))
+
+# Login social: verificación local del id_token (ver esim_backend/id_tokens.py)
+GOOGLE_CLIENT_IDS = [c for c in os.getenv('GOOGLE_CLIENT_IDS', os.getenv('GOOGLE_CLIENT_ID', '')).split(',') if c]
+APPLE_CLIENT_IDS = [c for c in os.getenv('APPLE_CLIENT_IDS', '').split(',') if c]
+SOCIAL_AUTH_TIMEOUT = (3.05, float(os.getenv('SOCIAL_AUTH_READ_TIMEOUT', '10')))
+
+# Throttling de login/registro (token bucket en el cache compartido, ver esim_backend/throttling.py)
+LOGIN_THROTTLE_IP_BURST = int(os.getenv('LOGIN_THROTTLE_IP_BURST', '20'))
+LOGIN_THROTTLE_IP_RATE = float(os.getenv('LOGIN_THROTTLE_IP_RATE', '0.2'))  # fichas/segundo
+LOGIN_THROTTLE_ACCOUNT_BURST = int(os.getenv('LOGIN_THROTTLE_ACCOUNT_BURST', '5'))
+LOGIN_THROTTLE_ACCOUNT_RATE = float(os.getenv('LOGIN_THROTTLE_ACCOUNT_RATE', str(1 / 60)))
+
+# Sesiones: SESSION_MODE=db | cached_db | cache | signed_cookies
+SESSION_MODE = os.getenv('SESSION_MODE', 'cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_MODE]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -166,15 +302,21 @@ TIME_ZONE = 'America/Mexico_City'
 USE_I18N = True
 USE_TZ = True
 
-# Static files (CSS, JavaScript, Images) - DESACTIVADO para Railway
+# Static files (CSS, JavaScript, Images)
+# collectstatic (fase release) genera nombres con hash y variantes .gz/.br
+# que sirve StaticAssetMiddleware con cache inmutable
 STATIC_URL = '/static/'
-STATIC_ROOT = None
-
-# NO usar STATICFILES_DIRS para evitar errores
-STATICFILES_DIRS = []
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [BASE_DIR / 'static']
 
-# Desactivar collectstatic
-STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'esim_backend.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -186,13 +328,25 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'esim_backend.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson si está instalado (ver esim_backend/json_codec.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'esim_backend.json_codec.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'esim_backend.json_codec.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Proxy de Railway delante: la IP del cliente es la que añade él a X-Forwarded-For
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '1')),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
@@ -223,11 +377,6 @@ if cors_origins_env:
     additional_origins = [origin.strip() for origin in cors_origins_env.split(',') if origin.strip()]
     CORS_ALLOWED_ORIGINS.extend(additional_origins)
 
-# NO usar whitenoise para simplificar deployment
-# if not DEBUG:
-#     MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
-#     STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
-
 # Comentamos el modelo custom user por ahora - usar el default de Django
 # AUTH_USER_MODEL = 'users.User'
 
@@ -242,10 +391,32 @@ ESIM_API_KEY = os.getenv('ESIM_API_KEY', 'your-esim-api-key')
 STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', 'pk_test_your_stripe_key')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', 'sk_test_your_stripe_key')
 
-# Twilio settings (for SMS)
-TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', 'your_twilio_sid')
-TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', 'your_twilio_token')
+# Twilio settings (for SMS and Super SIM)
+TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
+TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '+1234567890')
+TWILIO_SUPERSIM_FLEET_SID = os.getenv('TWILIO_SUPERSIM_FLEET_SID', '')
+
+# Airalo settings
+AIRALO_CLIENT_ID = os.getenv('AIRALO_CLIENT_ID', '')
+AIRALO_CLIENT_SECRET = os.getenv('AIRALO_CLIENT_SECRET', '')
+AIRALO_BASE_URL = os.getenv('AIRALO_BASE_URL', 'https://partners.airalo.com/api/v2')
+
+# 1GLOBAL settings
+ONEGLOBAL_BASE_URL = os.getenv('ONEGLOBAL_BASE_URL', 'https://api.1global.com')
+ONEGLOBAL_API_KEY = os.getenv('ONEGLOBAL_API_KEY', '')
+ONEGLOBAL_API_SECRET = os.getenv('ONEGLOBAL_API_SECRET', '')
+ONEGLOBAL_PARTNER_ID = os.getenv('ONEGLOBAL_PARTNER_ID', '')
+DEFAULT_NOTIFICATION_EMAIL = os.getenv('DEFAULT_NOTIFICATION_EMAIL', 'soporte@hablaris.com')
+
+# Registro de configuración de proveedores (esim_backend.provider_config)
+# Los archivos .env.twilio / .env.1ot se buscan en estos directorios y se
+# recargan cuando cambia su mtime o cuando un worker de gunicorn recibe la
+# señal indicada (post_worker_init). Solo el directorio padre, como las
+# vistas legacy: los del repo son plantillas
+PROVIDER_CONFIG_DIRS = [BASE_DIR.parent]
+PROVIDER_CONFIG_CHECK_INTERVAL = float(os.getenv('PROVIDER_CONFIG_CHECK_INTERVAL', '2'))
+PROVIDER_CONFIG_RELOAD_SIGNAL = os.getenv('PROVIDER_CONFIG_RELOAD_SIGNAL', 'SIGHUP')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,81 @@
+"""
+Storage de estáticos con hash en el nombre y variantes precomprimidas
+
+collectstatic deja, junto a cada archivo (original y con hash), sus
+versiones .gz y .br para que StaticAssetMiddleware las sirva sin comprimir
+en cada request.
+"""
+
+import gzip
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo se genera .gz
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Formatos que ya vienen comprimidos
+SKIP_EXTENSIONS = {
+    '.gz', '.br', '.zip', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif',
+    '.ico', '.woff', '.woff2', '.mp4', '.webm', '.mp3', '.pdf',
+}
+MIN_COMPRESS_SIZE = 256
+
+
+def compress_file(path: str) -> List[str]:
+    """Escribir path.gz y path.br si reducen el tamaño; devuelve las creadas"""
+    with open(path, 'rb') as source:
+        data = source.read()
+
+    variants = [('.gz', lambda: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda: brotli.compress(data, quality=11)))
+
+    created = []
+    for suffix, compress in variants:
+        compressed = compress()
+        # Solo vale la pena si ahorra al menos un 5%
+        if len(compressed) < len(data) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            created.append(path + suffix)
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return created
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage que además precomprime en gzip y brotli"""
+
+    # Sin manifest (p.ej. antes del primer collectstatic) usar el nombre sin hash
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                processed_names.update((name, hashed_name))
+            yield name, hashed_name, processed
+
+        if not dry_run:
+            self.compress(processed_names)
+
+    def compressible(self, name: str) -> bool:
+        if os.path.splitext(name)[1].lower() in SKIP_EXTENSIONS:
+            return False
+        return self.exists(name) and self.size(name) >= MIN_COMPRESS_SIZE
+
+    def compress(self, names: Iterable[str]) -> int:
+        """Precomprimir en paralelo (zlib y brotli liberan el GIL)"""
+        paths = [self.path(name) for name in sorted(names) if self.compressible(name)]
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 2) as executor:
+            created = sum(len(result) for result in executor.map(compress_file, paths))
+        logger.info(f"{created} variantes comprimidas para {len(paths)} estáticos")
+        return created
@@ -0,0 +1,315 @@
+"""
+Generador de datos sintéticos reproducibles para pruebas de carga
+
+Crea usuarios, países, regiones (con cobertura M2M), planes y eSIMs a gran
+escala. Las tablas grandes se insertan en lotes con executemany o, en
+PostgreSQL, con COPY; nunca instancia un modelo por fila.
+"""
+
+import csv
+import io
+import random
+import time
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from services.pricing.hablaris_pricing import HablarisPricingEngine
+
+from .models import Country, Region, DataPlan, ESim
+
+logger = logging.getLogger(__name__)
+
+# Presets de escala: usuarios, planes, eSIMs
+SCALES = {
+    'small': {'users': 1000, 'plans': 200, 'esims': 10000},
+    'medium': {'users': 20000, 'plans': 1000, 'esims': 100000},
+    'large': {'users': 100000, 'plans': 3000, 'esims': 1000000},
+    'xl': {'users': 500000, 'plans': 5000, 'esims': 5000000},
+}
+
+# Regiones con las claves que usa HablarisPricingEngine.region_factors
+REGIONS = {
+    'europe': 'Europa',
+    'north_america': 'Norteamérica',
+    'latin_america': 'Latinoamérica',
+    'asia_pacific': 'Asia Pacífico',
+    'africa_middle_east': 'África y Medio Oriente',
+    'global': 'Global',
+}
+
+# (código, nombre, bandera, región, popular)
+COUNTRIES = [
+    ('ES', 'España', '🇪🇸', 'europe', True), ('FR', 'Francia', '🇫🇷', 'europe', True),
+    ('IT', 'Italia', '🇮🇹', 'europe', True), ('DE', 'Alemania', '🇩🇪', 'europe', True),
+    ('GB', 'Reino Unido', '🇬🇧', 'europe', True), ('PT', 'Portugal', '🇵🇹', 'europe', False),
+    ('NL', 'Países Bajos', '🇳🇱', 'europe', False), ('GR', 'Grecia', '🇬🇷', 'europe', False),
+    ('CH', 'Suiza', '🇨🇭', 'europe', False), ('TR', 'Turquía', '🇹🇷', 'europe', False),
+    ('US', 'Estados Unidos', '🇺🇸', 'north_america', True), ('CA', 'Canadá', '🇨🇦', 'north_america', True),
+    ('MX', 'México', '🇲🇽', 'latin_america', True), ('BR', 'Brasil', '🇧🇷', 'latin_america', False),
+    ('AR', 'Argentina', '🇦🇷', 'latin_america', False), ('CO', 'Colombia', '🇨🇴', 'latin_america', False),
+    ('CL', 'Chile', '🇨🇱', 'latin_america', False), ('PE', 'Perú', '🇵🇪', 'latin_america', False),
+    ('JP', 'Japón', '🇯🇵', 'asia_pacific', True), ('KR', 'Corea del Sur', '🇰🇷', 'asia_pacific', True),
+    ('TH', 'Tailandia', '🇹🇭', 'asia_pacific', True), ('SG', 'Singapur', '🇸🇬', 'asia_pacific', False),
+    ('AU', 'Australia', '🇦🇺', 'asia_pacific', False), ('ID', 'Indonesia', '🇮🇩', 'asia_pacific', False),
+    ('VN', 'Vietnam', '🇻🇳', 'asia_pacific', False), ('IN', 'India', '🇮🇳', 'asia_pacific', False),
+    ('AE', 'Emiratos Árabes Unidos', '🇦🇪', 'africa_middle_east', True),
+    ('MA', 'Marruecos', '🇲🇦', 'africa_middle_east', False), ('EG', 'Egipto', '🇪🇬', 'africa_middle_east', False),
+    ('ZA', 'Sudáfrica', '🇿🇦', 'africa_middle_east', False),
+]
+
+PLAN_SIZES = [(1, 7), (3, 15), (5, 30), (10, 30), (20, 30), (50, 90)]
+PLAN_CATEGORIES = ['budget', 'standard', 'standard', 'premium', 'premium', 'unlimited']
+
+FIRST_NAMES = ['Lucía', 'Mateo', 'Sofía', 'Hugo', 'Valeria', 'Martín', 'Emma', 'Leo', 'Julia', 'Daniel']
+LAST_NAMES = ['García', 'Rodríguez', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez', 'Díaz', 'Torres', 'Ruiz']
+
+# Reparto de estados al momento de compra (hoy nada los hace expirar)
+ESIM_STATUSES = [('active', 0.80), ('pending', 0.14), ('cancelled', 0.06)]
+ESIM_PROVIDERS = [('twilio', 0.6), ('oneglobal', 0.3), ('airalo', 0.1)]
+
+DEFAULT_PASSWORD = 'Hablaris2025!'
+
+
+class SyntheticDataGenerator:
+    """Genera un dataset realista y reproducible (misma semilla => mismos datos)"""
+
+    def __init__(self, users: int, plans: int, esims: int, seed: int = 42,
+                 prefix: str = 'synthetic_', batch_size: int = 10000,
+                 use_copy: bool = False, anchor: Optional[datetime] = None,
+                 report: Optional[Callable[[str], None]] = None):
+        self.users = users
+        self.plans = plans
+        self.esims = esims
+        self.seed = seed
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.use_copy = use_copy and connection.vendor == 'postgresql'
+        self.anchor = anchor or datetime.now(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.report = report or logger.info
+        self.timings: Dict[str, float] = {}
+
+    # ----- API pública -----
+
+    def generate(self) -> Dict[str, float]:
+        """Generar todas las tablas y devolver los tiempos por paso"""
+        regions = self.timed('regiones y países', self.create_geography)
+        plans = self.timed('planes', lambda: self.create_plans(regions))
+        user_ids = self.timed('usuarios', self.create_users)
+        self.timed('eSIMs', lambda: self.create_esims(user_ids, plans))
+        return self.timings
+
+    def has_previous_data(self) -> bool:
+        return User.objects.filter(username__startswith=self.prefix).exists()
+
+    def flush(self) -> int:
+        """Borrar usuarios sintéticos (y sus eSIMs) de ejecuciones anteriores"""
+        users = User.objects.filter(username__startswith=self.prefix)
+        ids = users.values('pk')
+        # users.delete() cargaría cada usuario para sus post_delete (invalidar
+        # cache por fila). Los sintéticos nunca inician sesión: DELETE directo
+        # de las tablas hijas (todas CASCADE y sin dependientes) y luego usuarios
+        with transaction.atomic():
+            for relation in User._meta.related_objects:
+                relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': ids})._raw_delete(connection.alias)
+            for field in User._meta.many_to_many:
+                through = field.remote_field.through
+                through._base_manager.filter(**{f'{field.m2m_field_name()}__in': ids})._raw_delete(connection.alias)
+            return users._raw_delete(connection.alias)
+
+    def random_stream(self, step: str) -> random.Random:
+        """Secuencia aleatoria propia de cada paso: lo que consuma uno (p. ej.
+        planes que ya existían) no cambia los datos de los siguientes"""
+        return random.Random(f'{self.seed}-{step}')
+
+    # ----- Pasos -----
+
+    def create_geography(self) -> Dict[str, Region]:
+        """Países reales agrupados en regiones (M2M de cobertura)"""
+        existing = set(Country.objects.values_list('code', flat=True))
+        Country.objects.bulk_create([
+            Country(code=code, name=name, flag=flag, is_popular=popular)
+            for code, name, flag, _, popular in COUNTRIES
+            if code not in existing
+        ])
+        countries = {country.code: country for country in Country.objects.all()}
+
+        existing = set(Region.objects.values_list('name', flat=True))
+        Region.objects.bulk_create([Region(name=name) for name in REGIONS.values() if name not in existing])
+        regions = {key: Region.objects.get(name=name) for key, name in REGIONS.items()}
+
+        Through = Region.countries.through
+        linked = set(Through.objects.values_list('region_id', 'country_id'))
+        links = []
+        for code, _, _, region_key, _ in COUNTRIES:
+            for region in (regions[region_key], regions['global']):
+                if (region.id, countries[code].id) not in linked:
+                    links.append(Through(region_id=region.id, country_id=countries[code].id))
+        Through.objects.bulk_create(links, batch_size=self.batch_size)
+        return regions
+
+    def create_plans(self, regions: Dict[str, Region]) -> List[Tuple[int, int, int]]:
+        """Planes por región con precio calculado por el motor de pricing"""
+        missing = self.plans - DataPlan.objects.count()
+        if missing > 0:
+            engine = HablarisPricingEngine()
+            rng = self.random_stream('plans')
+            region_keys = list(regions)
+            new_plans = []
+            for i in range(missing):
+                region_key = region_keys[i % len(region_keys)]
+                size = (i // len(region_keys)) % len(PLAN_SIZES)
+                data_gb, days = PLAN_SIZES[size]
+                wholesale = round(data_gb * rng.uniform(0.9, 1.6) + days * 0.05, 2)
+                pricing = engine.calculate_optimal_price(
+                    wholesale, PLAN_CATEGORIES[size], region_key, data_gb, days
+                )
+                new_plans.append(DataPlan(
+                    region=regions[region_key],
+                    data_gb=data_gb,
+                    duration_days=days,
+                    price=Decimal(str(round(pricing['recommended_price'], 2))),
+                ))
+            DataPlan.objects.bulk_create(new_plans, batch_size=self.batch_size)
+
+        return list(DataPlan.objects.order_by('id').values_list('id', 'data_gb', 'duration_days'))
+
+    def create_users(self) -> List[int]:
+        """Usuarios con contraseña conocida (un solo hash para todos)"""
+        password = make_password(DEFAULT_PASSWORD)
+        rng = self.random_stream('users')
+        columns = ['username', 'email', 'first_name', 'last_name', 'password',
+                   'is_staff', 'is_active', 'is_superuser', 'date_joined']
+
+        def rows():
+            for i in range(self.users):
+                username = f'{self.prefix}{i:07d}'
+                joined = self.anchor - timedelta(seconds=rng.randrange(365 * 86400))
+                yield (
+                    username, f'{username}@example.com',
+                    rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                    password, False, True, False, self.datetime_value(joined),
+                )
+
+        self.insert_rows(User, columns, rows())
+        return list(
+            User.objects.filter(username__startswith=self.prefix)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_esims(self, user_ids: Sequence[int], plans: Sequence[Tuple[int, int, int]]) -> None:
+        """eSIMs compradas durante el último año, con usuarios frecuentes"""
+        columns = ['user_id', 'data_plan_id', 'status', 'data_remaining_gb',
+                   'activated_date', 'expires_date', 'created_at', 'provider', 'provider_esim_id']
+        statuses = [status for status, _ in ESIM_STATUSES]
+        weights = [weight for _, weight in ESIM_STATUSES]
+        providers = [provider for provider, _ in ESIM_PROVIDERS]
+        provider_weights = [weight for _, weight in ESIM_PROVIDERS]
+        rng = self.random_stream('esims')
+
+        def rows():
+            for _ in range(self.esims):
+                # Distribución sesgada: pocos usuarios concentran muchas compras
+                user_id = user_ids[min(int(rng.paretovariate(1.2)) - 1, len(user_ids) - 1)
+                                   if rng.random() < 0.2 else rng.randrange(len(user_ids))]
+                plan_id, data_gb, days = plans[rng.randrange(len(plans))]
+                created = self.anchor - timedelta(seconds=rng.randrange(365 * 86400))
+                status = rng.choices(statuses, weights)[0]
+                activated = expires = None
+                remaining = Decimal(data_gb)
+                if status == 'active':
+                    activated = created + timedelta(hours=rng.randrange(72))
+                    expires = activated + timedelta(days=days)
+                    remaining = Decimal(round(data_gb * rng.random(), 2)).quantize(Decimal('0.01'))
+                provider = rng.choices(providers, provider_weights)[0]
+                yield (
+                    user_id, plan_id, status, self.decimal_value(remaining),
+                    self.datetime_value(activated), self.datetime_value(expires),
+                    self.datetime_value(created),
+                    provider, self.provider_esim_id(rng, provider),
+                )
+
+        self.insert_rows(ESim, columns, rows())
+
+    # ----- Inserción en lotes -----
+
+    def insert_rows(self, model, columns: List[str], rows: Iterable[tuple]) -> int:
+        """Insertar filas en lotes con COPY (PostgreSQL) o executemany"""
+        table = model._meta.db_table
+        quoted = ', '.join(connection.ops.quote_name(column) for column in columns)
+        placeholders = ', '.join(['%s'] * len(columns))
+        total = 0
+        for batch in self.batches(rows):
+            # Un commit por lote: en autocommit cada fila sería una transacción
+            with transaction.atomic():
+                if self.use_copy:
+                    self.copy_batch(table, quoted, batch)
+                else:
+                    with connection.cursor() as cursor:
+                        cursor.executemany(
+                            f'INSERT INTO {connection.ops.quote_name(table)} ({quoted}) VALUES ({placeholders})',
+                            batch
+                        )
+            total += len(batch)
+            self.report(f'{table}: {total} filas')
+        return total
+
+    def copy_batch(self, table: str, quoted_columns: str, batch: List[tuple]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in batch:
+            writer.writerow(['' if value is None else value for value in row])
+        buffer.seek(0)
+
+        sql = f'COPY {connection.ops.quote_name(table)} ({quoted_columns}) FROM STDIN WITH (FORMAT csv)'
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def batches(self, rows: Iterable[tuple]) -> Iterator[List[tuple]]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # ----- Utilidades -----
+
+    def provider_esim_id(self, rng: random.Random, provider: str) -> str:
+        """Identificador con el formato de cada proveedor"""
+        if provider == 'twilio':
+            return f'HS{rng.getrandbits(128):032x}'
+        if provider == 'oneglobal':
+            return f'{rng.getrandbits(64):016x}'
+        return f'8901{rng.randrange(10 ** 16):016d}'
+
+    def datetime_value(self, value: Optional[datetime]):
+        if value is None:
+            return None
+        if self.use_copy:
+            return value.isoformat()
+        return connection.ops.adapt_datetimefield_value(value)
+
+    def decimal_value(self, value: Decimal):
+        if self.use_copy:
+            return str(value)
+        return connection.ops.adapt_decimalfield_value(value, 10, 2)
+
+    def timed(self, name: str, step: Callable):
+        start = time.perf_counter()
+        result = step()
+        self.timings[name] = time.perf_counter() - start
+        self.report(f'⏱️  {name}: {self.timings[name]:.1f}s')
+        return result
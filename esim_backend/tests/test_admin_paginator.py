@@ -0,0 +1,45 @@
+"""
+EstimatedCountPaginator: estimación del planner solo en tablas grandes
+"""
+
+import pytest
+
+from esim_backend import admin as esim_admin
+from esim_backend.admin import EstimatedCountPaginator
+from esim_backend.models import Country
+
+
+@pytest.fixture
+def countries(db):
+    Country.objects.bulk_create([
+        Country(code=f'C{index:02d}', name=f'País {index}', flag='🏳️') for index in range(5)
+    ])
+    return Country.objects.order_by('code')
+
+
+def test_exact_count_without_postgresql(countries):
+    # En SQLite no hay estimación: COUNT(*) normal
+    assert esim_admin.estimated_count(countries) is None
+    assert EstimatedCountPaginator(countries, 2).count == 5
+
+
+def test_estimate_used_above_threshold(countries, monkeypatch, settings):
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+    monkeypatch.setattr(esim_admin, 'estimated_count', lambda queryset: 250000)
+    paginator = EstimatedCountPaginator(countries, 100)
+    assert paginator.count == 250000
+    assert paginator.num_pages == 2500
+
+
+def test_exact_count_below_threshold(countries, monkeypatch, settings):
+    settings.ADMIN_ESTIMATED_COUNT_THRESHOLD = 1000
+    monkeypatch.setattr(esim_admin, 'estimated_count', lambda queryset: 999)
+    assert EstimatedCountPaginator(countries, 2).count == 5
+
+
+def test_lists_are_counted_with_len(monkeypatch):
+    def fail(queryset):
+        raise AssertionError('una lista no se estima')
+
+    monkeypatch.setattr(esim_admin, 'estimated_count', fail)
+    assert EstimatedCountPaginator(list(range(7)), 3).count == 7
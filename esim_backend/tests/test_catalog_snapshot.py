@@ -0,0 +1,98 @@
+"""
+Snapshot del catálogo: ida y vuelta contra las consultas ORM equivalentes
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from esim_backend import catalog_snapshot
+from esim_backend.catalog_snapshot import (
+    CatalogSnapshot, CatalogStore, SnapshotError, build_snapshot, query_countries, query_plans, query_regions,
+)
+from esim_backend.models import Country, DataPlan, Region
+
+
+@pytest.fixture
+def catalog(db):
+    spain = Country.objects.create(code='ES', name='España', flag='🇪🇸', is_popular=True)
+    france = Country.objects.create(code='FR', name='Francia', flag='🇫🇷')
+    japan = Country.objects.create(code='JP', name='Japón', flag='🇯🇵', is_popular=True)
+    europe = Region.objects.create(name='Europa')
+    europe.countries.add(france, spain)
+    asia = Region.objects.create(name='Asia')
+    asia.countries.add(japan)
+    Region.objects.create(name='Vacía')
+    for region, data_gb, days, price in (
+        (europe, 5, 30, '12.50'), (europe, 1, 7, '4.99'), (europe, 20, 30, '29.00'),
+        (asia, 3, 15, '9.90'), (asia, 10, 30, '19.99'),
+    ):
+        DataPlan.objects.create(region=region, data_gb=data_gb, duration_days=days, price=Decimal(price))
+    return {'europe': europe, 'asia': asia}
+
+
+@pytest.fixture
+def snapshot(catalog, tmp_path):
+    return build_snapshot(str(tmp_path / 'catalog.snapshot'))
+
+
+def test_roundtrip_matches_orm(catalog, snapshot):
+    assert snapshot.countries() == query_countries()
+    assert snapshot.countries(popular=True) == query_countries(popular=True)
+    assert snapshot.regions() == query_regions()
+    assert snapshot.plans() == query_plans()
+
+
+@pytest.mark.parametrize('filters', [
+    {'min_data': 5},
+    {'max_days': 15},
+    {'max_price': Decimal('12.50')},
+    {'limit': 2},
+    {'min_data': 3, 'max_price': Decimal('20'), 'limit': 1},
+])
+def test_plan_filters_match_orm(catalog, snapshot, filters):
+    for region in (None, catalog['europe'].pk, catalog['asia'].pk):
+        assert snapshot.plans(region=region, **filters) == query_plans(region=region, **filters)
+
+
+def test_plans_by_region_id(catalog, snapshot):
+    prices = [plan['price'] for plan in snapshot.plans(region=catalog['europe'].pk)]
+    assert prices == [Decimal('4.99'), Decimal('12.50'), Decimal('29.00')]
+    assert snapshot.plans(region=Region.objects.get(name='Vacía').pk) == []
+    assert snapshot.plans(region=999999) == []
+
+
+def test_find_country(snapshot):
+    assert snapshot.find_country('FR')['name'] == 'Francia'
+    assert snapshot.find_country('DE') is None
+
+
+def test_rejects_corrupted_file(snapshot, tmp_path):
+    corrupted = tmp_path / 'corrupted.snapshot'
+    content = bytearray(open(snapshot.path, 'rb').read())
+    content[-1] ^= 0xFF
+    corrupted.write_bytes(bytes(content))
+    with pytest.raises(SnapshotError):
+        CatalogSnapshot(str(corrupted))
+
+    truncated = tmp_path / 'truncated.snapshot'
+    truncated.write_bytes(content[:10])
+    with pytest.raises(SnapshotError):
+        CatalogSnapshot(str(truncated))
+
+
+def test_store_picks_up_new_file(catalog, tmp_path, settings):
+    settings.CATALOG_SNAPSHOT_PATH = str(tmp_path / 'store.snapshot')
+    settings.CATALOG_SNAPSHOT_CHECK_INTERVAL = 0
+    settings.CATALOG_SNAPSHOT_MAX_AGE = 3600
+    store = CatalogStore()
+    assert store.current() is None
+
+    first = store.refresh()
+    assert store.current() is first
+
+    Country.objects.create(code='IT', name='Italia', flag='🇮🇹')
+    build_snapshot(catalog_snapshot.snapshot_path())
+    current = store.current()
+    assert current is not first
+    assert current.find_country('IT') is not None
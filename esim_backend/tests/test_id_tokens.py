@@ -0,0 +1,162 @@
+"""
+Verificación de ID tokens con un JWKS local (sin llamadas a Google/Apple)
+"""
+
+import json
+import time
+
+import pytest
+from django.core.cache import caches
+
+jwt = pytest.importorskip('jwt')
+rsa = pytest.importorskip('cryptography.hazmat.primitives.asymmetric.rsa')
+
+from esim_backend import id_tokens  # noqa: E402
+from esim_backend.id_tokens import IDTokenError, JWKSCache, user_for_claims, verify_id_token  # noqa: E402
+
+CLIENT_ID = 'hablaris-web.apps.googleusercontent.com'
+
+LOCMEM_L2 = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'jwks-l2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'jwks-l2'},
+}
+BROKEN_L2 = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'jwks-l2': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'tabla_que_no_existe'},
+}
+
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=kid, alg='RS256', use='sig')
+    return private_key, jwk
+
+
+@pytest.fixture(scope='module')
+def keys():
+    return {kid: make_key(kid) for kid in ('k1', 'k2')}
+
+
+class StubJWKS:
+    """Sustituye a la descarga HTTP: publica las claves indicadas y cuenta las descargas"""
+
+    def __init__(self, keys, published=('k1',)):
+        self.keys = keys
+        self.published = list(published)
+        self.fetches = 0
+
+    def __call__(self, provider):
+        self.fetches += 1
+        return {'keys': [self.keys[kid][1] for kid in self.published]}, 3600
+
+
+@pytest.fixture
+def stub(keys, settings, monkeypatch):
+    settings.CACHES = LOCMEM_L2
+    caches['jwks-l2'].clear()
+    settings.GOOGLE_CLIENT_IDS = [CLIENT_ID]
+    settings.APPLE_CLIENT_IDS = []
+    stub = StubJWKS(keys)
+    cache = JWKSCache(cache_alias='jwks-l2')
+    monkeypatch.setattr(cache, '_fetch', stub)
+    monkeypatch.setattr(id_tokens, 'jwks_cache', cache)
+    return stub
+
+
+def sign(keys, kid='k1', **overrides):
+    now = int(time.time())
+    claims = {
+        'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'sub': '1234',
+        'iat': now, 'exp': now + 600, 'email': 'ana@example.com', 'email_verified': True,
+    }
+    claims.update(overrides)
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, keys[kid][0], algorithm='RS256', headers={'kid': kid})
+
+
+def test_valid_token(keys, stub):
+    claims = verify_id_token('google', sign(keys), nonce=None)
+    assert claims['sub'] == '1234'
+    verify_id_token('google', sign(keys))
+    assert stub.fetches == 1
+
+
+@pytest.mark.parametrize('overrides, message', [
+    ({'aud': 'otra-app'}, '(?i)audience'),
+    ({'iss': 'https://evil.example.com'}, 'issuer'),
+    ({'exp': int(time.time()) - 3600}, 'expired'),
+    ({'sub': None}, 'sub'),
+    ({'email_verified': False}, 'Email no verificado'),
+    ({'email_verified': 'false'}, 'Email no verificado'),
+])
+def test_rejected_claims(keys, stub, overrides, message):
+    with pytest.raises(IDTokenError, match=message):
+        verify_id_token('google', sign(keys, **overrides))
+
+
+def test_nonce(keys, stub):
+    token = sign(keys, nonce='abc')
+    assert verify_id_token('google', token, nonce='abc')['nonce'] == 'abc'
+    with pytest.raises(IDTokenError, match='Nonce'):
+        verify_id_token('google', token, nonce='otro')
+
+
+def test_bad_signature(keys, stub):
+    header, payload, _ = sign(keys).split('.')
+    forged = '.'.join([header, payload, sign(keys, kid='k2').split('.')[2]])
+    with pytest.raises(IDTokenError):
+        verify_id_token('google', forged)
+
+
+def test_provider_not_configured(keys, stub):
+    with pytest.raises(IDTokenError, match='no configurado'):
+        verify_id_token('apple', sign(keys, iss='https://appleid.apple.com'))
+    with pytest.raises(IDTokenError, match='desconocido'):
+        verify_id_token('facebook', sign(keys))
+
+
+def test_key_rotation_refetches_once(keys, stub):
+    verify_id_token('google', sign(keys))
+    stub.published = ['k1', 'k2']
+
+    # Un kid desconocido no vuelve a descargar antes de JWKS_MIN_REFRESH
+    with pytest.raises(IDTokenError, match='desconocida'):
+        verify_id_token('google', sign(keys, kid='k2'))
+    assert stub.fetches == 1
+
+    id_tokens.jwks_cache._last_fetch['google'] -= id_tokens.JWKS_MIN_REFRESH + 1
+    assert verify_id_token('google', sign(keys, kid='k2'))['sub'] == '1234'
+    assert stub.fetches == 2
+
+    unknown = jwt.encode({'sub': 'x'}, keys['k2'][0], algorithm='RS256', headers={'kid': 'inventado'})
+    for _ in range(3):
+        with pytest.raises(IDTokenError, match='desconocida'):
+            verify_id_token('google', unknown)
+    assert stub.fetches == 2
+
+
+def test_shared_cache_avoids_download_in_other_process(keys, stub, monkeypatch):
+    verify_id_token('google', sign(keys))
+    other_process = JWKSCache(cache_alias='jwks-l2')
+    monkeypatch.setattr(other_process, '_fetch', stub)
+    assert other_process.get_key('google', 'k1') is not None
+    assert stub.fetches == 1
+
+
+@pytest.mark.django_db
+def test_works_without_shared_cache(keys, stub, settings):
+    settings.CACHES = BROKEN_L2
+    assert verify_id_token('google', sign(keys))['sub'] == '1234'
+    assert stub.fetches == 1
+
+
+@pytest.mark.django_db
+def test_user_for_claims_reuses_user_by_email(keys, stub):
+    claims = verify_id_token('google', sign(keys, email='Ana@Example.com', given_name='Ana'))
+    user = user_for_claims(claims)
+    assert user.first_name == 'Ana'
+    assert user_for_claims(claims).pk == user.pk
+
+    with pytest.raises(IDTokenError, match='email'):
+        user_for_claims({'sub': '1234'})
@@ -0,0 +1,81 @@
+"""
+Registro de configuración de proveedores: precedencia y recarga
+"""
+
+import os
+
+import pytest
+
+from esim_backend.provider_config import ProviderConfigRegistry
+
+
+@pytest.fixture
+def env_dir(tmp_path, settings, monkeypatch):
+    settings.PROVIDER_CONFIG_DIRS = [tmp_path]
+    settings.TWILIO_ACCOUNT_SID = 'AC_settings'
+    settings.TWILIO_AUTH_TOKEN = 'token_settings'
+    settings.TWILIO_PHONE_NUMBER = '+34000000000'
+    for key in ('TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'TWILIO_PHONE_NUMBER'):
+        monkeypatch.delenv(key, raising=False)
+    return tmp_path
+
+
+def write_env(path, content, mtime):
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_precedence_env_over_file_over_settings(env_dir, monkeypatch):
+    write_env(env_dir / '.env.twilio', 'TWILIO_ACCOUNT_SID="AC_file"\nTWILIO_AUTH_TOKEN=token_file\n', 1_000_000)
+    monkeypatch.setenv('TWILIO_AUTH_TOKEN', 'token_env')
+
+    config = ProviderConfigRegistry(check_interval=0).get('twilio')
+    assert config['TWILIO_ACCOUNT_SID'] == 'AC_file'
+    assert config['TWILIO_AUTH_TOKEN'] == 'token_env'
+    assert config['TWILIO_PHONE_NUMBER'] == '+34000000000'
+
+
+def test_comments_ignored_and_config_read_only(env_dir):
+    write_env(env_dir / '.env.twilio', '# TWILIO_ACCOUNT_SID=AC_comentado\n', 1_000_000)
+    config = ProviderConfigRegistry(check_interval=0).get('twilio')
+    assert config['TWILIO_ACCOUNT_SID'] == 'AC_settings'
+    with pytest.raises(TypeError):
+        config['TWILIO_ACCOUNT_SID'] = 'otro'
+
+
+def test_unknown_provider_is_empty(env_dir):
+    assert dict(ProviderConfigRegistry(check_interval=0).get('desconocido')) == {}
+
+
+def test_reload_when_mtime_changes(env_dir):
+    env_file = env_dir / '.env.twilio'
+    write_env(env_file, 'TWILIO_ACCOUNT_SID=AC_v1\n', 1_000_000)
+    registry = ProviderConfigRegistry(check_interval=0)
+    assert registry.get('twilio')['TWILIO_ACCOUNT_SID'] == 'AC_v1'
+
+    write_env(env_file, 'TWILIO_ACCOUNT_SID=AC_v2\n', 1_000_100)
+    assert registry.get('twilio')['TWILIO_ACCOUNT_SID'] == 'AC_v2'
+
+    env_file.unlink()
+    assert registry.get('twilio')['TWILIO_ACCOUNT_SID'] == 'AC_settings'
+
+
+def test_mtime_checked_at_most_every_interval(env_dir):
+    env_file = env_dir / '.env.twilio'
+    write_env(env_file, 'TWILIO_ACCOUNT_SID=AC_v1\n', 1_000_000)
+    registry = ProviderConfigRegistry(check_interval=3600)
+    registry.get('twilio')
+
+    write_env(env_file, 'TWILIO_ACCOUNT_SID=AC_v2\n', 1_000_100)
+    assert registry.get('twilio')['TWILIO_ACCOUNT_SID'] == 'AC_v1'
+
+
+def test_request_reload_applies_on_next_get(env_dir, settings):
+    registry = ProviderConfigRegistry(check_interval=3600)
+    assert registry.get('twilio')['TWILIO_ACCOUNT_SID'] == 'AC_settings'
+
+    # Como el handler de la señal: solo marca, no recarga dentro del handler
+    settings.TWILIO_ACCOUNT_SID = 'AC_nuevo'
+    registry.request_reload()
+    assert registry._configs['twilio']['TWILIO_ACCOUNT_SID'] == 'AC_settings'
+    assert registry.get('twilio')['TWILIO_ACCOUNT_SID'] == 'AC_nuevo'
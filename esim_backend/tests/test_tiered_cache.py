@@ -0,0 +1,115 @@
+"""
+TwoTierCache: invalidación del L1 entre procesos y degradación sin L2
+"""
+
+import pytest
+from django.test import override_settings
+
+from esim_backend.tiered_cache import OTHER_PREFIX, TwoTierCache, key_prefix
+
+LOCMEM_L2 = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'l2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tiered-l2'},
+}
+
+# Tabla inexistente: toda operación contra L2 falla como sin createcachetable
+BROKEN_L2 = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'l2': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'tabla_que_no_existe'},
+}
+
+
+def make_cache(**options):
+    """Un TwoTierCache por "proceso"; todos comparten el L2 'l2'"""
+    options = {'SYNC_INTERVAL': 0, 'PUBSUB': False, **options}
+    return TwoTierCache('l2', {'OPTIONS': options})
+
+
+@pytest.fixture
+def shared_l2():
+    with override_settings(CACHES=LOCMEM_L2):
+        yield
+
+
+def test_key_prefix_only_known_prefixes():
+    assert key_prefix('airalo_access_token') == 'airalo'
+    assert key_prefix('auth:user:1') == 'auth'
+    assert key_prefix('django.contrib.sessions.cache3f2a') == OTHER_PREFIX
+    assert key_prefix('abc123', prefixes=('abc123',)) == 'abc123'
+
+
+def test_l1_hit_after_set(shared_l2):
+    cache = make_cache()
+    cache.set('airalo_token', 'tok')
+    assert cache.get('airalo_token') == 'tok'
+    assert cache.get_stats()['airalo']['l1_hits'] == 1
+
+
+def test_write_in_other_process_invalidates_l1(shared_l2):
+    worker_a, worker_b = make_cache(), make_cache()
+    worker_a.set('airalo_token', 'v1')
+    assert worker_b.get('airalo_token') == 'v1'
+
+    worker_a.set('airalo_token', 'v2')
+    assert worker_b.get('airalo_token') == 'v2'
+    assert worker_b.get_stats()['airalo']['invalidations'] == 1
+
+    worker_a.delete('airalo_token')
+    assert worker_b.get('airalo_token') is None
+
+
+def test_own_write_keeps_own_l1(shared_l2):
+    cache = make_cache()
+    cache.set('twilio_a', 1)
+    cache.get('twilio_a')
+    cache.set('twilio_b', 2)
+    assert cache.get('twilio_a') == 1
+    assert cache.get_stats()['twilio'].get('invalidations', 0) == 0
+
+
+def test_other_prefix_bypasses_l1(shared_l2):
+    cache = make_cache()
+    cache.set('session:abc', {'user': 1})
+    assert cache.get('session:abc') == {'user': 1}
+    assert cache.l1_size() == 0
+    assert cache.get_stats()[OTHER_PREFIX]['l2_hits'] == 1
+
+
+def test_l1_values_are_copies(shared_l2):
+    cache = make_cache()
+    cache.set('auth:user:1', {'groups': []})
+    cache.get('auth:user:1')['groups'].append('admin')
+    assert cache.get('auth:user:1') == {'groups': []}
+
+
+def test_first_write_after_clear_starts_generation(shared_l2):
+    worker_a, worker_b = make_cache(), make_cache()
+    worker_a.set('jwks:google', 'k1')
+    worker_b.get('jwks:google')
+    worker_a.clear()
+
+    worker_a.set('jwks:google', 'k2')
+    assert worker_b.get('jwks:google') == 'k2'
+
+
+@pytest.mark.django_db
+def test_degrades_without_l2():
+    with override_settings(CACHES=BROKEN_L2):
+        cache = make_cache()
+        assert cache.get('airalo_token', 'default') == 'default'
+
+        # El valor queda en el L1 de este proceso
+        cache.set('airalo_token', 'tok')
+        assert cache.get('airalo_token') == 'tok'
+        assert cache.has_key('airalo_token')
+        assert cache.add('airalo_token', 'otro') is False
+        assert cache.add('airalo_other', 'nuevo') is True
+
+        cache.set('session:abc', 'x')
+        assert cache.get('session:abc') is None
+        assert cache.touch('airalo_token') is False
+        with pytest.raises(ValueError):
+            cache.incr('airalo_counter')
+        assert cache.delete('airalo_token') is False
+        cache.clear()
+        assert cache.l1_size() == 0
@@ -0,0 +1,119 @@
+"""
+Throttling con token bucket en el cache compartido
+
+Cada identidad (IP, cuenta) tiene un bucket de `capacity` fichas que se
+rellena a `rate` fichas por segundo. El estado vive en el cache compartido
+(L2), no en el L1 de cada proceso, para que el límite sea el mismo para
+todos los workers. Con Redis la operación es atómica (script Lua); con la
+tabla de cache es leer-calcular-escribir y, con ráfagas concurrentes, puede
+dejar pasar alguna petición de más.
+"""
+
+import hashlib
+import math
+import time
+import logging
+from typing import Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucket:
+    """Bucket por identidad: `capacity` fichas, `rate` fichas/segundo"""
+
+    def __init__(self, name: str, capacity: float, rate: float, cache_alias: str = 'shared'):
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def key(self, identity: str) -> str:
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        return f'throttle:{self.name}:{digest}'
+
+    def ttl(self) -> int:
+        # Tiempo para llenarse del todo; después el estado ya no importa
+        return math.ceil(self.capacity / self.rate) + 1
+
+    def consume(self, identity: str, cost: float = 1) -> Tuple[bool, float]:
+        """(permitido, segundos hasta que haya fichas suficientes)"""
+        now = time.time()
+        try:
+            client = self.redis_client()
+            if client is not None:
+                allowed, tokens = client.eval(
+                    TOKEN_BUCKET_LUA, 1, self.cache.make_key(self.key(identity)),
+                    self.capacity, self.rate, now, cost
+                )
+                tokens = float(tokens)
+                allowed = bool(allowed)
+            else:
+                allowed, tokens = self.consume_with_cache(identity, cost, now)
+        except Exception as e:
+            # Si el cache falla no se bloquea a nadie
+            logger.error(f"Throttling {self.name} no disponible: {e}")
+            return True, 0.0
+
+        retry_after = 0.0 if allowed else (cost - tokens) / self.rate
+        return allowed, retry_after
+
+    def consume_with_cache(self, identity: str, cost: float, now: float) -> Tuple[bool, float]:
+        key = self.key(identity)
+        tokens, updated = self.cache.get(key) or (self.capacity, now)
+        tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.cache.set(key, (tokens, now), self.ttl())
+        return allowed, tokens
+
+    def redis_client(self):
+        client = getattr(self.cache, '_cache', None)
+        if client is not None and hasattr(client, 'get_client'):
+            return client.get_client(write=True)
+        return None
+
+    def reset(self, identity: str) -> None:
+        self.cache.delete(self.key(identity))
+
+
+def client_ip(request) -> str:
+    """IP del cliente respetando REST_FRAMEWORK['NUM_PROXIES'] (proxy de Railway)"""
+    return BaseThrottle().get_ident(request)
+
+
+# Buckets de login/registro: ráfagas cortas permitidas, ritmo sostenido bajo
+login_ip_bucket = TokenBucket(
+    'login-ip', getattr(settings, 'LOGIN_THROTTLE_IP_BURST', 20), getattr(settings, 'LOGIN_THROTTLE_IP_RATE', 0.2)
+)
+login_account_bucket = TokenBucket(
+    'login-account', getattr(settings, 'LOGIN_THROTTLE_ACCOUNT_BURST', 5),
+    getattr(settings, 'LOGIN_THROTTLE_ACCOUNT_RATE', 1 / 60)
+)
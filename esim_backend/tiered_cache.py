@@ -0,0 +1,361 @@
+"""
+Backend de cache en dos niveles
+
+L1 es un LRU acotado en memoria del proceso con TTL corto; L2 es un cache
+compartido entre workers y réplicas (Redis si hay REDIS_URL, si no la tabla
+de cache en la base de datos). Las lecturas calientes no salen del proceso y
+el token de Airalo o los catálogos de proveedores se piden una sola vez para
+todos los workers.
+
+Invalidación del L1 de los demás procesos:
+
+- Claves de versión: cada escritura incrementa en L2 la generación de su
+  prefijo; cada proceso la consulta como mucho cada SYNC_INTERVAL segundos y
+  descarta su L1 de ese prefijo si cambió.
+- Pub/sub: si L2 es Redis, además se publica la clave escrita y un hilo por
+  proceso la descarta al instante.
+
+El prefijo de una clave es lo que hay antes del primer ':' o '_'
+('airalo_access_token' -> 'airalo') si está en L1_PREFIXES; también agrupa
+las estadísticas. Las claves con otro prefijo (sesiones incluidas) no pasan
+por L1 y comparten el prefijo 'other'.
+"""
+
+import os
+import pickle
+import re
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict, defaultdict
+from typing import Dict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .instrumentation import record_cache
+from .metrics import count_cache_read
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = '__tiered_generation__:{prefix}'
+DEFAULT_CHANNEL = 'hablaris:cache:invalidate'
+STAT_FIELDS = ('l1_hits', 'l2_hits', 'misses', 'sets', 'deletes', 'invalidations')
+
+# Tipos que se guardan tal cual en L1; el resto se copia vía pickle como LocMemCache
+IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+
+# Prefijos con L1 (OPTIONS['L1_PREFIXES']). Las demás claves (sesiones, claves
+# sin prefijo conocido) van directas a L2 y se cuentan juntas como 'other':
+# sin L1 no hay generación que incrementar ni etiquetas de métricas sin límite
+DEFAULT_L1_PREFIXES = ('airalo', 'twilio', 'oneglobal', 'auth', 'jwks')
+OTHER_PREFIX = 'other'
+
+_MISSING = object()
+
+
+def key_prefix(key: str, prefixes=DEFAULT_L1_PREFIXES) -> str:
+    """Prefijo conocido de la clave o OTHER_PREFIX (nunca la clave entera)"""
+    prefix = re.split(r'[:_]', key, maxsplit=1)[0]
+    return prefix if prefix in prefixes else OTHER_PREFIX
+
+
+class TwoTierCache(BaseCache):
+    """LRU en proceso delante de un cache compartido (alias de CACHES en LOCATION)"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.l2_alias = location or 'shared'
+        self.l1_max_entries = int(options.get('L1_MAX_ENTRIES', 1000))
+        self.l1_timeout = float(options.get('L1_TIMEOUT', 30))
+        self.sync_interval = float(options.get('SYNC_INTERVAL', 1.0))
+        self.channel = options.get('CHANNEL', DEFAULT_CHANNEL)
+        self.pubsub_enabled = options.get('PUBSUB', True)
+        self.l1_prefixes = frozenset(options.get('L1_PREFIXES', DEFAULT_L1_PREFIXES))
+
+        self._lock = threading.Lock()
+        self._l1: OrderedDict = OrderedDict()  # clave -> (valor, expira, prefijo, pickled)
+        self._generations: Dict[str, object] = {}
+        self._synced_at: Dict[str, float] = {}
+        self._stats = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+
+        self._origin = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self._listener = None
+        self._listener_pid = None
+
+    @property
+    def l2(self) -> BaseCache:
+        # caches[] da una conexión por hilo/contexto
+        return caches[self.l2_alias]
+
+    # --- L1 ---
+
+    def _l1_get(self, full_key: str):
+        with self._lock:
+            entry = self._l1.get(full_key)
+            if entry is None:
+                return _MISSING
+            if entry[1] <= time.monotonic():
+                del self._l1[full_key]
+                return _MISSING
+            self._l1.move_to_end(full_key)
+        value, pickled = entry[0], entry[3]
+        return pickle.loads(value) if pickled else value
+
+    def _l1_set(self, full_key: str, value, prefix: str, timeout) -> None:
+        ttl = self.l1_timeout if timeout is None else min(self.l1_timeout, timeout)
+        if ttl <= 0:
+            self._l1_delete(full_key)
+            return
+        pickled = not isinstance(value, IMMUTABLE_TYPES)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if pickled else value
+        with self._lock:
+            self._l1[full_key] = (data, time.monotonic() + ttl, prefix, pickled)
+            self._l1.move_to_end(full_key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, full_key: str) -> None:
+        with self._lock:
+            self._l1.pop(full_key, None)
+
+    def _l1_drop_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for full_key in [k for k, entry in self._l1.items() if entry[2] == prefix]:
+                del self._l1[full_key]
+
+    # --- Invalidación ---
+
+    def _sync(self, prefix: str) -> None:
+        """Descartar el L1 del prefijo si otro proceso escribió en él"""
+        self._ensure_listener()
+        now = time.monotonic()
+        if now - self._synced_at.get(prefix, float('-inf')) < self.sync_interval:
+            return
+        self._synced_at[prefix] = now
+
+        try:
+            generation = self.l2.get(GENERATION_KEY.format(prefix=prefix))
+        except Exception as e:
+            logger.error(f"Cache compartido no disponible: {e}")
+            return
+        previous = self._generations.get(prefix, _MISSING)
+        self._generations[prefix] = generation
+        if previous is not _MISSING and previous != generation:
+            self._l1_drop_prefix(prefix)
+            self._stats[prefix]['invalidations'] += 1
+
+    def _invalidate(self, full_key: str, prefix: str) -> None:
+        """Anunciar una escritura al resto de procesos"""
+        generation_key = GENERATION_KEY.format(prefix=prefix)
+        try:
+            generation = self.l2.incr(generation_key)
+        except ValueError:
+            # Primera escritura del prefijo (o la clave expiró/se vació). add no
+            # pisa la de otro proceso, así que dos escrituras no acaban en el
+            # mismo valor; empezar en la hora y no en 0 evita que tras un clear()
+            # se repita la generación que los demás procesos ya tienen vista
+            self.l2.add(generation_key, time.time_ns(), None)
+            generation = self.l2.incr(generation_key)
+
+        # Si nadie más escribió entretanto, este proceso no necesita vaciar su L1
+        previous = self._generations.get(prefix, _MISSING)
+        if previous is not _MISSING and (previous or 0) + 1 == generation:
+            self._generations[prefix] = generation
+        self._publish(full_key)
+
+    def _redis_client(self):
+        client = getattr(self.l2, '_cache', None)
+        if self.pubsub_enabled and client is not None and hasattr(client, 'get_client'):
+            return client.get_client(write=True)
+        return None
+
+    def _publish(self, full_key: str) -> None:
+        client = self._redis_client()
+        if client is None:
+            return
+        try:
+            client.publish(self.channel, f'{self._origin} {full_key}')
+        except Exception as e:
+            logger.error(f"Error publicando invalidación de cache: {e}")
+
+    def _ensure_listener(self) -> None:
+        """Hilo de pub/sub (uno por proceso; se rearranca tras un fork)"""
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._origin = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+            if self._redis_client() is None:
+                return
+            self._listener = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+            self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    origin, _, full_key = message['data'].decode().partition(' ')
+                    if origin != self._origin:
+                        self._l1_delete(full_key)
+            except Exception as e:
+                # Sin mensajes siguen valiendo las claves de versión; reintentar
+                logger.error(f"Suscripción de invalidación de cache caída: {e}")
+                time.sleep(5)
+
+    # --- API de BaseCache ---
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _prefix(self, key) -> str:
+        return key_prefix(key, self.l1_prefixes)
+
+    def get(self, key, default=None, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        prefix = self._prefix(key)
+        if prefix != OTHER_PREFIX:
+            self._sync(prefix)
+            value = self._l1_get(full_key)
+            if value is not _MISSING:
+                self._stats[prefix]['l1_hits'] += 1
+                record_cache(True)
+                count_cache_read(prefix, 'l1_hit')
+                return value
+
+        try:
+            value = self.l2.get(key, _MISSING, version=version)
+        except Exception as e:
+            # Sin L2 (p.ej. falta createcachetable) se comporta como un fallo
+            logger.error(f"Cache compartido no disponible: {e}")
+            value = _MISSING
+        if value is _MISSING:
+            self._stats[prefix]['misses'] += 1
+            record_cache(False)
+            count_cache_read(prefix, 'miss')
+            return default
+        self._stats[prefix]['l2_hits'] += 1
+        record_cache(True)
+        count_cache_read(prefix, 'l2_hit')
+        if prefix != OTHER_PREFIX:
+            self._l1_set(full_key, value, prefix, None)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        prefix = self._prefix(key)
+        timeout = self._timeout(timeout)
+        try:
+            self.l2.set(key, value, timeout, version=version)
+            if prefix != OTHER_PREFIX:
+                self._invalidate(full_key, prefix)
+        except Exception as e:
+            # Sin L2 el valor queda solo en el L1 de este proceso
+            logger.error(f"Cache compartido no disponible: {e}")
+        if prefix != OTHER_PREFIX:
+            self._l1_set(full_key, value, prefix, timeout)
+        self._stats[prefix]['sets'] += 1
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        prefix = self._prefix(key)
+        timeout = self._timeout(timeout)
+        try:
+            if not self.l2.add(key, value, timeout, version=version):
+                return False
+            if prefix != OTHER_PREFIX:
+                self._invalidate(full_key, prefix)
+        except Exception as e:
+            # Sin L2, como set: el valor queda solo en el L1 si no estaba ya
+            logger.error(f"Cache compartido no disponible: {e}")
+            if prefix == OTHER_PREFIX or self._l1_get(full_key) is not _MISSING:
+                return False
+        if prefix != OTHER_PREFIX:
+            self._l1_set(full_key, value, prefix, timeout)
+        self._stats[prefix]['sets'] += 1
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return self.l2.touch(key, self._timeout(timeout), version=version)
+        except Exception as e:
+            logger.error(f"Cache compartido no disponible: {e}")
+            return False
+
+    def delete(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        prefix = self._prefix(key)
+        self._l1_delete(full_key)
+        try:
+            deleted = self.l2.delete(key, version=version)
+            if prefix != OTHER_PREFIX:
+                self._invalidate(full_key, prefix)
+        except Exception as e:
+            logger.error(f"Cache compartido no disponible: {e}")
+            deleted = False
+        self._stats[prefix]['deletes'] += 1
+        return deleted
+
+    def has_key(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        prefix = self._prefix(key)
+        if prefix != OTHER_PREFIX:
+            self._sync(prefix)
+            if self._l1_get(full_key) is not _MISSING:
+                return True
+        try:
+            return self.l2.has_key(key, version=version)
+        except Exception as e:
+            logger.error(f"Cache compartido no disponible: {e}")
+            return False
+
+    def incr(self, key, delta=1, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        prefix = self._prefix(key)
+        self._l1_delete(full_key)
+        try:
+            value = self.l2.incr(key, delta, version=version)
+        except ValueError:
+            raise
+        except Exception as e:
+            # Sin L2 se comporta como una clave inexistente (ValueError, igual que BaseCache)
+            logger.error(f"Cache compartido no disponible: {e}")
+            raise ValueError(f"Key '{key}' not found") from e
+        if prefix != OTHER_PREFIX:
+            try:
+                self._invalidate(full_key, prefix)
+            except Exception as e:
+                logger.error(f"Cache compartido no disponible: {e}")
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+            self._generations.clear()
+            self._synced_at.clear()
+        # Vaciar L2 borra también las generaciones: los demás procesos ven el cambio
+        try:
+            self.l2.clear()
+        except Exception as e:
+            logger.error(f"Cache compartido no disponible: {e}")
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+    # --- Estadísticas ---
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Aciertos/fallos por prefijo en este proceso"""
+        return {prefix: dict(counts) for prefix, counts in sorted(self._stats.items())}
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+    def l1_size(self) -> int:
+        return len(self._l1)
@@ -1,9 +1,19 @@
 """
 URL configuration for esim_backend project - eSIM Management Platform
 """
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.urls import path
-from . import views
+from . import api_1ot_views, auth_views, views
+
+# Vistas de 1oT: en modo ASGI sus versiones async, para que un worker atienda
+# muchas peticiones mientras espera al proveedor. Solo staff: crean eSIMs de
+# pago en el proveedor
+if settings.ASYNC_PROVIDER_VIEWS:
+    create_1ot_esim, check_1ot_usage = api_1ot_views.create_1ot_esim_async, api_1ot_views.check_1ot_usage_async
+else:
+    create_1ot_esim, check_1ot_usage = api_1ot_views.create_1ot_esim, api_1ot_views.check_1ot_usage
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -11,8 +21,24 @@ urlpatterns = [
     path('store/', views.store, name='store'),
     path('store/auth/', views.store_auth, name='store_auth'),
     path('health/', views.health, name='health'),
+    path('health/live', views.health_live, name='health_live'),
+    path('health/ready', views.health_ready, name='health_ready'),
+    path('metrics', views.metrics, name='metrics'),
+    path('api/catalog/countries/', views.catalog_countries, name='catalog_countries'),
+    path('api/catalog/regions/', views.catalog_regions, name='catalog_regions'),
+    path('api/catalog/plans/', views.catalog_plans, name='catalog_plans'),
     path('admin/', admin.site.urls),
     path('api/ping/', views.health, name='api_ping'),
+    path('api/auth/register/', auth_views.register_view, name='register'),
+    path('api/auth/login/', auth_views.login_view, name='login'),
+    path('api/auth/logout/', auth_views.logout_view, name='logout'),
+    path('api/auth/profile/', auth_views.user_profile, name='user_profile'),
+    path('api/auth/google/', auth_views.google_auth, name='google_auth'),
+    path('api/auth/google/callback', auth_views.google_callback, name='google_callback'),
+    path('api/auth/apple/', auth_views.apple_auth, name='apple_auth'),
+    path('api/1ot/test-credentials/', staff_member_required(api_1ot_views.test_1ot_credentials), name='test_1ot_credentials'),
+    path('api/1ot/esim/create/', staff_member_required(create_1ot_esim), name='create_1ot_esim'),
+    path('api/1ot/esim/usage/<str:esim_id>/', staff_member_required(check_1ot_usage), name='check_1ot_usage'),
     path('create-admin-emergency/', views.create_admin_emergency, name='create_admin_emergency'),  # Vista temporal
     path('admin-simple/', views.admin_login_simple, name='admin_login_simple'),  # Login sin CSRF
     path('emergency-migrate/', views.emergency_migrate, name='emergency_migrate'),  # Migraciones Railway
@@ -1,9 +1,13 @@
-from django.http import JsonResponse, HttpResponse
+from django.http import HttpResponse
+from .json_codec import JsonResponse
 from django.shortcuts import render, redirect
 from django.core.management import call_command
 from django.db import connection
+from django.template.loader import render_to_string
 import io
 
+from .page_cache import CSRF_PLACEHOLDER, cached_page, page_cache
+
 def emergency_migrate(request):
     """Vista de emergencia para aplicar migraciones en Railway"""
     import os
@@ -286,6 +290,7 @@ def emergency_admin(request):
         </div>
         ''')
 
+@cached_page
 def home(request):
     """Vista principal de la landing page"""
     html_content = """<!DOCTYPE html>
@@ -430,6 +435,7 @@ def home(request):
 </html>"""
     return HttpResponse(html_content)
 
+@cached_page
 def shop(request):
     """Vista de la tienda eSIM"""
     html_content = """<!DOCTYPE html>
@@ -468,7 +474,8 @@ def shop(request):
 </html>"""
     return HttpResponse(html_content)
 
-from django.http import JsonResponse, HttpResponse
+from django.http import HttpResponse
+from .json_codec import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
@@ -626,6 +633,82 @@ def health(request):
         "message": "Hablaris eSIM Backend funcionando correctamente"
     })
 
+def health_live(request):
+    """Liveness: el proceso atiende requests (sin tocar dependencias)"""
+    return JsonResponse({"status": "alive"})
+
+def health_ready(request):
+    """Readiness: último resultado de las comprobaciones en segundo plano"""
+    from .readiness import readiness_monitor
+
+    readiness_monitor.ensure_started()
+    ready, detail = readiness_monitor.status()
+    response = JsonResponse(detail, status=200 if ready else 503)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+def catalog_query_int(request, name):
+    value = request.GET.get(name)
+    return int(value) if value not in (None, '') else None
+
+def catalog_countries(request):
+    """Países del catálogo (snapshot compartido o, si no hay, base de datos)"""
+    from .catalog_snapshot import catalog_store, query_countries
+
+    popular = request.GET.get('popular')
+    popular = None if popular is None else popular.lower() in ('1', 'true')
+    snapshot = catalog_store.current()
+    countries = snapshot.countries(popular) if snapshot is not None else query_countries(popular)
+    return JsonResponse({'results': countries})
+
+def catalog_regions(request):
+    """Regiones con los códigos de sus países"""
+    from .catalog_snapshot import catalog_store, query_regions
+
+    snapshot = catalog_store.current()
+    return JsonResponse({'results': snapshot.regions() if snapshot is not None else query_regions()})
+
+def catalog_plans(request):
+    """Planes por región y precio con filtros: region (id), min_data, max_days, max_price"""
+    from decimal import Decimal, InvalidOperation
+    from django.conf import settings
+    from .catalog_snapshot import catalog_store, query_plans
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        filters = {
+            'region': catalog_query_int(request, 'region'),
+            'min_data': catalog_query_int(request, 'min_data'),
+            'max_days': catalog_query_int(request, 'max_days'),
+            'max_price': Decimal(request.GET['max_price']) if request.GET.get('max_price') else None,
+            'limit': min(catalog_query_int(request, 'limit') or page_size, 100),
+        }
+    except (ValueError, InvalidOperation):
+        return JsonResponse({'error': 'Parámetros de filtro inválidos'}, status=400)
+
+    snapshot = catalog_store.current()
+    plans = snapshot.plans(**filters) if snapshot is not None else query_plans(**filters)
+    return JsonResponse({'results': plans})
+
+def metrics(request):
+    """Métricas en formato de exposición de Prometheus (404 sin METRICS_TOKEN)"""
+    from django.conf import settings
+    from django.http import Http404
+    from django.utils.crypto import constant_time_compare
+    from . import metrics as app_metrics
+
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        # Cerrado por defecto: sin token el endpoint no existe
+        raise Http404
+    if not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    if app_metrics.prometheus_client is None:
+        return HttpResponse('prometheus_client no está instalado\n', status=503, content_type='text/plain')
+
+    content, content_type = app_metrics.render_latest()
+    return HttpResponse(content, content_type=content_type)
+
 def store_auth(request):
     """Login oculto para acceso a la tienda en desarrollo"""
     if request.method == 'POST':
@@ -671,12 +754,17 @@ def store_auth(request):
                 </html>
                 ''')
     
+    return page_cache.respond(request, 'store_auth', store_auth_page)
+
+
+def store_auth_page():
+    """HTML del login de la tienda con el marcador CSRF (se cachea precomprimido)"""
     # Template principal o fallback
     try:
-        return render(request, 'store_auth.html')
+        return render_to_string('store_auth.html', {'csrf_token': CSRF_PLACEHOLDER})
     except:
         # HTML inline como fallback
-        return HttpResponse('''
+        return '''
         <!DOCTYPE html>
         <html lang="es">
         <head>
@@ -700,7 +788,7 @@ def store_auth(request):
                 </div>
                 
                 <form method="post" class="space-y-4">
-                    <input type="hidden" name="csrfmiddlewaretoken" value="''' + request.META.get('CSRF_COOKIE', 'dummy') + '''">
+                    <input type="hidden" name="csrfmiddlewaretoken" value="''' + CSRF_PLACEHOLDER + '''">
                     <div>
                         <input type="text" name="username" placeholder="Usuario" value="hablaris_dev" class="w-full px-4 py-3 rounded-lg bg-white/10 border border-white/20 text-white placeholder-gray-400 focus:outline-none focus:border-blue-400" required>
                     </div>
@@ -719,8 +807,9 @@ def store_auth(request):
             </div>
         </body>
         </html>
-        ''')
+        '''
 
+@cached_page
 def store(request):
     """Tienda eSIM funcional con filtros avanzados inspirada en Holafly/Nomad pero mejorada"""
     
@@ -0,0 +1,147 @@
+"""
+Calentamiento del proceso antes de aceptar tráfico
+
+Sin esto el primer request de cada worker paga el import del URLconf, las
+vistas, DRF y los SDKs de proveedores, la compilación de las regex de las
+URLs, la carga de plantillas y la construcción de las páginas del cache de
+páginas. warm_up() lo hace al cargar la aplicación (wsgi.py / asgi.py):
+
+- Con preload_app de gunicorn (gunicorn.conf.py) se ejecuta una sola vez en
+  el master y los workers forkeados comparten esas páginas de memoria
+  (copy-on-write); el snapshot del catálogo (catalog_snapshot.py) queda
+  mapeado antes del fork. Al final cierra las conexiones a la base de datos,
+  que no deben heredarse, y congela el GC (gc.freeze) para que las
+  recolecciones de los workers no escriban en los objetos del arranque y los
+  copien.
+- Sin preload_app cada worker lo ejecuta antes de empezar a aceptar conexiones.
+
+Un fallo en un paso se registra y no impide arrancar. Para ver qué cuesta
+cada import: python manage.py profile_imports
+"""
+
+import gc
+import importlib
+import time
+import logging
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver, get_resolver, resolve
+
+logger = logging.getLogger(__name__)
+
+# Módulos que se importan en el primer request (vistas, DRF, SDKs de proveedores)
+PRELOAD_MODULES = [
+    'esim_backend.urls',
+    'esim_backend.auth_views',
+    'esim_backend.api_1ot_views',
+    'esim_backend.id_tokens',
+    'rest_framework.views',
+    'rest_framework.generics',
+    'rest_framework.serializers',
+    'rest_framework.renderers',
+    'rest_framework.parsers',
+    'services.esim_providers.airalo_service',
+    'services.esim_providers.oneglobal_service',
+    'services.esim_providers.twilio_service',
+    'services.esim_providers.twilio_client_pool',
+    'services.esim_providers.async_http',
+    'services.pricing.hablaris_pricing',
+    # Opcionales: el SDK de Twilio carga sus dominios bajo demanda
+    'twilio.rest',
+    'twilio.rest.supersim',
+    'jwt.algorithms',
+]
+
+# Páginas del cache de páginas que se construyen (y comprimen) al arrancar
+WARMUP_PAGES = ['/', '/shop/', '/store/', '/store/auth/']
+
+
+def preload_modules() -> List[str]:
+    """Importa PRELOAD_MODULES; devuelve los que no están disponibles"""
+    missing = []
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            missing.append(module)
+        except Exception as e:
+            logger.error(f"Error importando {module} en el warmup: {e}")
+    return missing
+
+
+def compile_url_patterns(resolver: URLResolver = None) -> int:
+    """Compila las regex de todas las URLs (Django lo hace en el primer uso)"""
+    resolver = resolver or get_resolver()
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        count += 1
+        if isinstance(pattern, URLResolver):
+            count += compile_url_patterns(pattern)
+    # Índices de reverse() del resolver raíz
+    resolver.reverse_dict
+    return count
+
+
+def build_pages() -> int:
+    """Construye las páginas cacheadas llamando a sus vistas"""
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    built = 0
+    for path in WARMUP_PAGES:
+        try:
+            match = resolve(path)
+            response = match.func(factory.get(path), *match.args, **match.kwargs)
+            if response.status_code == 200:
+                built += 1
+        except Exception as e:
+            logger.error(f"Error construyendo la página {path} en el warmup: {e}")
+    return built
+
+
+def load_catalog_snapshot() -> int:
+    """Snapshot del catálogo (lo genera si falta o está caducado) mapeado en el proceso"""
+    from .catalog_snapshot import catalog_store
+
+    snapshot = catalog_store.refresh(max_age=getattr(settings, 'CATALOG_SNAPSHOT_MAX_AGE', 300))
+    return snapshot.size if snapshot is not None else 0
+
+
+def warm_up(freeze: bool = None) -> Dict[str, float]:
+    """Calienta el proceso y devuelve los ms de cada paso"""
+    timings = {}
+
+    def step(name, func):
+        start = time.perf_counter()
+        try:
+            return func()
+        except Exception as e:
+            logger.error(f"Error en el paso {name} del warmup: {e}")
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    missing = step('modules', preload_modules)
+    patterns = step('urls', compile_url_patterns)
+    pages = step('pages', build_pages)
+    step('catalog', load_catalog_snapshot)
+    connections.close_all()
+
+    if freeze is None:
+        freeze = getattr(settings, 'WARMUP_GC_FREEZE', True)
+    if freeze:
+        step('gc_freeze', lambda: (gc.collect(), gc.freeze()))
+
+    logger.info(
+        f"Warmup en {sum(timings.values()):.0f} ms {timings}: {patterns} URLs, {pages} páginas"
+        + (f", no disponibles: {', '.join(missing)}" if missing else '')
+    )
+    return timings
+
+
+def warm_up_on_boot() -> None:
+    """Llamado desde wsgi.py / asgi.py si WARMUP_ON_BOOT está activo"""
+    if getattr(settings, 'WARMUP_ON_BOOT', False):
+        warm_up()
@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+"""
+Servidor estático del frontend (ver serve_frontend.py en la raíz del repo)
+
+Sirve este directorio, o el build exportado en out/ si existe.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from serve_frontend import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Configuración de gunicorn
+
+SERVER_MODE elige cómo se atienden los requests:
+
+- wsgi (por defecto): workers sync, un request a la vez por worker
+- asgi: workers uvicorn; las vistas async de proveedores (Twilio, 1oT)
+  atienden muchos requests por worker mientras esperan al proveedor
+
+    SERVER_MODE=asgi gunicorn -c gunicorn.conf.py
+"""
+
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# El número de workers sigue saliendo de WEB_CONCURRENCY (lo lee gunicorn)
+
+# La aplicación (y su warmup, ver esim_backend/warmup.py) se carga una vez en
+# el master y los workers forkeados comparten esa memoria. Con preload un HUP
+# al master no recarga el código: para desplegar hay que reiniciar el master.
+# La recarga de proveedores por señal va a los workers (post_worker_init)
+preload_app = os.environ.get('GUNICORN_PRELOAD_APP', 'true').lower() == 'true'
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'esim_backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'esim_backend.wsgi:application'
+
+# Métricas Prometheus multiproceso: cada worker escribe en este directorio y
+# /metrics agrega todos (ver esim_backend/metrics.py)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/hablaris_prometheus')
+
+
+def on_starting(server):
+    # Ficheros de un arranque anterior falsearían los contadores
+    import shutil
+
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def post_worker_init(worker):
+    # Cada worker restablece sus señales al arrancar (Worker.init_signals) y
+    # en el master gunicorn usa SIGHUP para su propio reload: el handler de
+    # recarga de proveedores se instala solo aquí, en cada worker.
+    # kill -HUP <pid del worker> recarga su configuración en el siguiente request
+    from esim_backend.provider_config import provider_config
+
+    provider_config.install_signal_handler()
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,144 @@
+"""
+Harness para probar el router de réplicas con dos bases de datos locales
+
+Por defecto usa dos archivos SQLite temporales (primario + réplica). Para
+probar con PostgreSQL local:
+
+    PRIMARY_DATABASE_URL=postgres://localhost/hablaris_primary \\
+    REPLICA_DATABASE_URL=postgres://localhost/hablaris_replica \\
+    python scripts/simulate_read_replica.py
+
+La "replicación" se simula copiando el primario migrado a la réplica
+(copia de archivo en SQLite, CREATE DATABASE ... TEMPLATE en PostgreSQL).
+Después las escrituras solo llegan al primario, así que la réplica queda
+desfasada y se puede comprobar a qué base va cada lectura.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+TMP_DIR = Path(tempfile.mkdtemp(prefix='hablaris_replica_'))
+PRIMARY_URL = os.getenv('PRIMARY_DATABASE_URL', f"sqlite:///{TMP_DIR / 'primary.sqlite3'}")
+REPLICA_URL = os.getenv('REPLICA_DATABASE_URL', f"sqlite:///{TMP_DIR / 'replica.sqlite3'}")
+
+os.environ['DATABASE_URL'] = PRIMARY_URL
+os.environ['DATABASE_REPLICA_URLS'] = REPLICA_URL
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'esim_backend.settings')
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from esim_backend.db_router import lag_monitor, _pinned_to_primary
+from esim_backend.middleware import ReplicaPinningMiddleware
+from esim_backend.models import Region
+
+REPLICA = 'replica_1'
+failures = []
+
+
+def check(description, condition):
+    print(f"   {'✅' if condition else '❌'} {description}")
+    if not condition:
+        failures.append(description)
+
+
+def snapshot_primary_to_replica():
+    """Copiar el estado actual del primario a la réplica"""
+    primary = settings.DATABASES['default']
+    replica = settings.DATABASES[REPLICA]
+    connections.close_all()
+
+    if primary['ENGINE'].endswith('sqlite3'):
+        shutil.copyfile(primary['NAME'], replica['NAME'])
+    else:
+        with connections['default']._nodb_cursor() as cursor:
+            cursor.execute(f'DROP DATABASE IF EXISTS "{replica["NAME"]}"')
+            cursor.execute(f'CREATE DATABASE "{replica["NAME"]}" TEMPLATE "{primary["NAME"]}"')
+        connections.close_all()
+
+
+def run_request(method, view):
+    """Ejecutar una vista a través de ReplicaPinningMiddleware"""
+    request = getattr(RequestFactory(), method.lower())('/')
+    return ReplicaPinningMiddleware(view)(request)
+
+
+def main():
+    print(f"🗄️  Primario: {PRIMARY_URL}")
+    print(f"🗄️  Réplica:  {REPLICA_URL}")
+
+    call_command('migrate', verbosity=0)
+    Region.objects.create(name='Europa')
+    snapshot_primary_to_replica()
+
+    # A partir de aquí la réplica va "atrasada": no ve esta fila
+    _pinned_to_primary.set(False)
+    Region.objects.create(name='Asia')
+
+    print("\n1️⃣ GET de solo lectura")
+    seen = {}
+
+    def read_view(request):
+        seen['db'] = Region.objects.all().db
+        seen['names'] = sorted(Region.objects.values_list('name', flat=True))
+        return HttpResponse()
+
+    run_request('GET', read_view)
+    check('las lecturas van a la réplica', seen['db'] == REPLICA)
+    check('la réplica todavía no tiene la fila nueva', seen['names'] == ['Europa'])
+
+    print("\n2️⃣ GET que escribe y luego lee")
+
+    def write_then_read_view(request):
+        seen['before'] = Region.objects.all().db
+        Region.objects.create(name='América')
+        seen['after'] = Region.objects.all().db
+        seen['names'] = sorted(Region.objects.values_list('name', flat=True))
+        return HttpResponse()
+
+    run_request('GET', write_then_read_view)
+    check('antes de escribir se lee de la réplica', seen['before'] == REPLICA)
+    check('después de escribir se lee del primario', seen['after'] == 'default')
+    check('el request ve su propia escritura', 'América' in seen['names'])
+
+    print("\n3️⃣ El pin no se filtra al siguiente request")
+    run_request('GET', read_view)
+    check('un GET nuevo vuelve a la réplica', seen['db'] == REPLICA)
+
+    print("\n4️⃣ POST")
+    run_request('POST', read_view)
+    check('los métodos no seguros leen del primario', seen['db'] == 'default')
+
+    print("\n5️⃣ Réplica con lag excesivo")
+    lag_monitor.override(REPLICA, settings.DATABASE_REPLICA_MAX_LAG + 1)
+    run_request('GET', read_view)
+    check('se hace fallback al primario', seen['db'] == 'default')
+    check('el primario tiene todas las filas', seen['names'] == ['América', 'Asia', 'Europa'])
+    lag_monitor.override(REPLICA, None)
+
+    connections.close_all()
+    if PRIMARY_URL.startswith('sqlite'):
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    print()
+    if failures:
+        print(f"❌ {len(failures)} comprobaciones fallaron")
+        sys.exit(1)
+    print("🎉 Router de réplicas funcionando correctamente")
+
+
+if __name__ == '__main__':
+    main()
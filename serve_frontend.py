@@ -1,36 +1,363 @@
 #!/usr/bin/env python
 """
-Simple HTTP server para servir el frontend de eSIM Pro
+Servidor HTTP para servir el frontend de eSIM Pro (demos de staging)
+
+- Un hilo por conexión (ThreadingHTTPServer) con keep-alive HTTP/1.1
+- Cache LRU en memoria de archivos, invalidada por mtime
+- Variantes .br/.gz: las del build si existen, si no se comprimen una vez
+- ETag / Last-Modified / 304 y peticiones Range (206)
+- Fallback SPA a index.html para rutas del cliente
+
+Uso:
+    python serve_frontend.py [--port 3000] [--root frontend/out] [--cache-mb 64]
 """
+import argparse
+import email.utils
+import gzip
+import hashlib
+import mimetypes
 import os
-import sys
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import re
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo gzip
+    brotli = None
+
+BASE_DIR = Path(__file__).resolve().parent
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+MIN_COMPRESS_SIZE = 1024
+MAX_CACHED_FILE = 8 * 1024 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class CachedFile:
+    """Contenido de un archivo y sus variantes comprimidas"""
+
+    def __init__(self, path: Path, stat: os.stat_result):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.data = path.read_bytes()
+        self.content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        self.digest = hashlib.md5(self.data).hexdigest()
+        self.etag = f'"{self.digest}"'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        self.mtime = int(stat.st_mtime)
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    @property
+    def compressible(self) -> bool:
+        return self.size >= MIN_COMPRESS_SIZE and self.content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def etag_for(self, encoding):
+        """ETag de la representación: cada Content-Encoding lleva el suyo"""
+        return f'"{self.digest}-{encoding}"' if encoding else self.etag
+
+    def variant(self, encoding: str):
+        """Bytes en br/gzip: del build si existe, si no comprimidos una vez"""
+        if encoding in self._variants:
+            return self._variants[encoding]
+
+        with self._lock:
+            if encoding not in self._variants:
+                self._variants[encoding] = self._load_variant(encoding)
+            return self._variants[encoding]
+
+    def _load_variant(self, encoding: str):
+        suffix = '.br' if encoding == 'br' else '.gz'
+        prebuilt = self.path.with_name(self.path.name + suffix)
+        if prebuilt.exists() and prebuilt.stat().st_mtime_ns >= self.mtime_ns:
+            return prebuilt.read_bytes()
+        if not self.compressible:
+            return None
+        if encoding == 'br':
+            return brotli.compress(self.data, quality=11) if brotli else None
+        return gzip.compress(self.data, 9, mtime=0)
+
+    @property
+    def cached_bytes(self) -> int:
+        return len(self.data) + sum(len(data) for data in self._variants.values() if data)
+
+
+class FileCache:
+    """LRU de archivos en memoria con límite de bytes totales"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, path: Path, stat: os.stat_result):
+        key = str(path)
+        with self._lock:
+            cached = self._files.get(key)
+            if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                self._files.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        self.misses += 1
+        cached = CachedFile(path, stat)
+        with self._lock:
+            self._files[key] = cached
+            self._files.move_to_end(key)
+            self._evict()
+        return cached
+
+    def _evict(self):
+        total = sum(cached.cached_bytes for cached in self._files.values())
+        while total > self.max_bytes and len(self._files) > 1:
+            _, evicted = self._files.popitem(last=False)
+            total -= evicted.cached_bytes
+
+
+def accepted_encodings(header: str):
+    encodings = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if name and params.strip() not in ('q=0', 'q=0.0'):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def parse_range(header: str, size: int):
+    """(inicio, fin) inclusivo de un Range simple; None si no aplica, False si es insatisfacible"""
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class FrontendHandler(BaseHTTPRequestHandler):
+    """Archivos estáticos del frontend con cache, compresión y rangos"""
+    protocol_version = 'HTTP/1.1'
+    server_version = 'HablarisFrontend/1.0'
+    disable_nagle_algorithm = True
+    root: Path = BASE_DIR / 'frontend'
+    cache: FileCache = None
+    spa_fallback = True
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def handle_request(self, send_body):
+        try:
+            path, is_fallback = self.resolve(urlsplit(self.path).path)
+        except ValueError:  # p. ej. %00 en la ruta
+            return self.send_plain(HTTPStatus.BAD_REQUEST, b'Bad Request', send_body)
+        if path is None:
+            return self.send_plain(HTTPStatus.NOT_FOUND, b'Not Found', send_body)
 
-class CustomHandler(SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=str(Path(__file__).parent / "frontend"), **kwargs)
-
-def serve():
-    port = 3000
-    server_address = ('', port)
-    
-    # Cambiar al directorio frontend
-    frontend_dir = Path(__file__).parent / "frontend"
-    if not frontend_dir.exists():
-        print(f"❌ Error: Directorio frontend no encontrado en {frontend_dir}")
+        stat = path.stat()
+        if stat.st_size > MAX_CACHED_FILE:
+            return self.send_large_file(path, stat, send_body)
+
+        cached = self.cache.get(path, stat)
+        body, encoding = cached.data, None
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+        for candidate in ('br', 'gzip'):
+            variant = cached.variant(candidate) if candidate in accepted else None
+            if variant is not None:
+                body, encoding = variant, candidate
+                break
+
+        if self.not_modified(cached, encoding):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(cached, is_fallback, encoding)
+            self.send_header('Content-Length', '0')
+            return self.end_headers()
+
+        # Los rangos siempre se sirven sobre la representación sin comprimir
+        range_header = self.headers.get('Range')
+        if range_header and self.range_applies(cached):
+            byte_range = parse_range(range_header, cached.size)
+            if byte_range is False:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{cached.size}')
+                self.send_header('Content-Length', '0')
+                return self.end_headers()
+            if byte_range:
+                start, end = byte_range
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header('Content-Range', f'bytes {start}-{end}/{cached.size}')
+                return self.send_body(cached, cached.data[start:end + 1], None, is_fallback, send_body)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_body(cached, body, encoding, is_fallback, send_body)
+
+    def resolve(self, url_path):
+        """Archivo a servir y si es el fallback SPA"""
+        relative = unquote(url_path).strip('/')
+        candidates = [relative, f'{relative}.html', f'{relative}/index.html'] if relative else ['index.html']
+        for candidate in candidates:
+            path = (self.root / candidate).resolve()
+            if path.is_relative_to(self.root) and path.is_file():
+                return path, False
+
+        # Rutas del cliente (sin extensión) caen en index.html
+        index = self.root / 'index.html'
+        if self.spa_fallback and not Path(relative).suffix and index.is_file():
+            return index, True
+        return None, False
+
+    def not_modified(self, cached, encoding):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or cached.etag_for(encoding) in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return cached.mtime <= since
+        return False
+
+    def range_applies(self, cached):
+        """If-Range: solo servir el rango si el cliente tiene la versión actual sin comprimir"""
+        if_range = self.headers.get('If-Range')
+        if not if_range:
+            return True
+        # Una fecha no distingue variantes: con br/gzip posibles solo vale el ETag
+        validators = (cached.etag,) if cached.compressible else (cached.etag, cached.last_modified)
+        return if_range.strip() in validators
+
+    def cache_control(self, cached, is_fallback):
+        relative = cached.path.relative_to(self.root).as_posix()
+        if relative.startswith('_next/static/'):
+            return 'public, max-age=31536000, immutable'
+        if is_fallback or cached.content_type == 'text/html':
+            return 'no-cache'
+        return 'public, max-age=3600'
+
+    def send_validators(self, cached, is_fallback, encoding=None):
+        self.send_header('ETag', cached.etag_for(encoding))
+        self.send_header('Last-Modified', cached.last_modified)
+        self.send_header('Cache-Control', self.cache_control(cached, is_fallback))
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def send_body(self, cached, body, encoding, is_fallback, send_body):
+        self.send_header('Content-Type', cached.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Accept-Ranges', 'bytes')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_validators(cached, is_fallback, encoding)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_large_file(self, path, stat, send_body):
+        """Archivos grandes fuera del cache: sendfile directo desde disco"""
+        start, end = 0, stat.st_size - 1
+        byte_range = parse_range(self.headers.get('Range', ''), stat.st_size)
+        if byte_range is False:
+            return self.send_plain(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, b'', send_body)
+        if byte_range:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{stat.st_size}')
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', mimetypes.guess_type(path.name)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Last-Modified', email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.end_headers()
+        if send_body:
+            self.wfile.flush()
+            with open(path, 'rb') as file:
+                self.connection.sendfile(file, start, end - start + 1)
+
+    def send_plain(self, status, body, send_body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FrontendServer(ThreadingHTTPServer):
+    daemon_threads = True
+    verbose = True
+
+
+def default_root() -> Path:
+    """Build exportado de Next.js (frontend/out) si existe, si no frontend/"""
+    exported = BASE_DIR / 'frontend' / 'out'
+    return exported if exported.exists() else BASE_DIR / 'frontend'
+
+
+def make_server(root: Path, port: int, cache_mb: int = 64, spa_fallback: bool = True,
+                host: str = '', verbose: bool = True) -> FrontendServer:
+    handler = type('Handler', (FrontendHandler,), {
+        'root': root.resolve(),
+        'cache': FileCache(cache_mb * 1024 * 1024),
+        'spa_fallback': spa_fallback,
+    })
+    server = FrontendServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+
+def serve(root: Path = None, port: int = None, cache_mb: int = 64, spa_fallback: bool = True):
+    root = root or default_root()
+    port = port or int(os.getenv('PORT', 3000))
+
+    if not root.exists():
+        print(f"❌ Error: Directorio frontend no encontrado en {root}")
         return
-    
-    httpd = HTTPServer(server_address, CustomHandler)
+
+    httpd = make_server(root, port, cache_mb, spa_fallback)
     print(f"🚀 Servidor frontend iniciado en http://localhost:{port}")
-    print(f"📁 Sirviendo archivos desde: {frontend_dir}")
+    print(f"📁 Sirviendo archivos desde: {root}")
+    print(f"🧠 Cache en memoria: {cache_mb} MB | brotli: {'sí' if brotli else 'no'} | SPA: {'sí' if spa_fallback else 'no'}")
     print("✋ Presiona Ctrl+C para detener el servidor")
-    
+
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n🛑 Servidor detenido")
         httpd.server_close()
 
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor estático del frontend de eSIM Pro')
+    parser.add_argument('--port', type=int, help='Puerto (por defecto $PORT o 3000)')
+    parser.add_argument('--root', type=Path, help='Directorio a servir (por defecto frontend/out o frontend/)')
+    parser.add_argument('--cache-mb', type=int, default=64, help='Tamaño máximo del cache en memoria')
+    parser.add_argument('--no-spa', action='store_true', help='Desactivar el fallback a index.html')
+    options = parser.parse_args()
+    serve(options.root, options.port, options.cache_mb, not options.no_spa)
+
+
 if __name__ == "__main__":
-    serve()
+    main()
@@ -3,22 +3,40 @@ Servicio de integración con Airalo eSIM Provider
 Documentación: https://partners.airalo.com/api-docs
 """
 
-import requests
 import logging
 from typing import Dict, List, Optional
-from django.conf import settings
 from django.core.cache import cache
+from esim_backend.json_codec import response_json
+from esim_backend.provider_config import get_provider_config
+from .http_session import ProviderSession
 
 logger = logging.getLogger(__name__)
 
+# Instancia global de la sesión HTTP de airalo
+provider_session = ProviderSession('airalo')
+
 class AiraloService:
     """Servicio para integración con Airalo eSIM Provider"""
     
     def __init__(self):
-        self.base_url = "https://partners.airalo.com/api/v2"
-        self.client_id = settings.AIRALO_CLIENT_ID
-        self.client_secret = settings.AIRALO_CLIENT_SECRET
         self.access_token = None
+    
+    @property
+    def config(self):
+        """Configuración actual de Airalo (registro de proveedores)"""
+        return get_provider_config('airalo')
+    
+    @property
+    def base_url(self) -> str:
+        return self.config.get('AIRALO_BASE_URL') or "https://partners.airalo.com/api/v2"
+    
+    @property
+    def client_id(self) -> str:
+        return self.config.get('AIRALO_CLIENT_ID', '')
+    
+    @property
+    def client_secret(self) -> str:
+        return self.config.get('AIRALO_CLIENT_SECRET', '')
         
     def authenticate(self) -> bool:
         """Autenticación con Airalo API"""
@@ -36,14 +54,14 @@ class AiraloService:
                 'client_secret': self.client_secret
             }
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}/token",
                 data=auth_data,
                 headers={'Content-Type': 'application/x-www-form-urlencoded'}
             )
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = response_json(response)
                 self.access_token = token_data.get('access_token')
                 expires_in = token_data.get('expires_in', 3600)
                 
@@ -71,17 +89,27 @@ class AiraloService:
     def get_countries(self) -> List[Dict]:
         """Obtener lista de países disponibles"""
         try:
+            cache_key = 'airalo_countries'
+            cached_data = cache.get(cache_key)
+            if cached_data:
+                return cached_data
+            
             if not self.authenticate():
                 return []
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/countries",
-                headers=self.get_headers()
+                headers=self.get_headers(),
+                timeout=30
             )
             
             if response.status_code == 200:
-                data = response.json()
-                return data.get('data', [])
+                data = response_json(response)
+                countries = data.get('data', [])
+                
+                # Cache por 6 horas
+                cache.set(cache_key, countries, 21600)
+                return countries
             else:
                 logger.error(f"Error obteniendo países: {response.status_code}")
                 return []
@@ -93,6 +121,11 @@ class AiraloService:
     def get_packages(self, country_code: str = None) -> List[Dict]:
         """Obtener paquetes eSIM disponibles"""
         try:
+            cache_key = f'airalo_packages_{country_code or "all"}'
+            cached_data = cache.get(cache_key)
+            if cached_data:
+                return cached_data
+            
             if not self.authenticate():
                 return []
             
@@ -102,15 +135,20 @@ class AiraloService:
             if country_code:
                 params['country'] = country_code
             
-            response = requests.get(
+            response = provider_session.get(
                 url,
                 headers=self.get_headers(),
-                params=params
+                params=params,
+                timeout=30
             )
             
             if response.status_code == 200:
-                data = response.json()
-                return data.get('data', [])
+                data = response_json(response)
+                packages = data.get('data', [])
+                
+                # Cache por 2 horas
+                cache.set(cache_key, packages, 7200)
+                return packages
             else:
                 logger.error(f"Error obteniendo paquetes: {response.status_code}")
                 return []
@@ -131,14 +169,14 @@ class AiraloService:
                 'description': f'Hablaris eSIM Order - {package_id}'
             }
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}/orders",
                 headers=self.get_headers(),
                 json=order_data
             )
             
             if response.status_code == 201:
-                order = response.json()
+                order = response_json(response)
                 logger.info(f"Orden creada exitosamente: {order.get('data', {}).get('id')}")
                 return order.get('data')
             else:
@@ -155,13 +193,13 @@ class AiraloService:
             if not self.authenticate():
                 return None
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/orders/{order_id}",
                 headers=self.get_headers()
             )
             
             if response.status_code == 200:
-                return response.json().get('data')
+                return response_json(response).get('data')
             else:
                 logger.error(f"Error obteniendo orden: {response.status_code}")
                 return None
@@ -176,13 +214,13 @@ class AiraloService:
             if not self.authenticate():
                 return None
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/sims/{esim_id}",
                 headers=self.get_headers()
             )
             
             if response.status_code == 200:
-                return response.json().get('data')
+                return response_json(response).get('data')
             else:
                 logger.error(f"Error obteniendo eSIM: {response.status_code}")
                 return None
@@ -197,13 +235,13 @@ class AiraloService:
             if not self.authenticate():
                 return None
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/sims/{esim_id}/usage",
                 headers=self.get_headers()
             )
             
             if response.status_code == 200:
-                return response.json().get('data')
+                return response_json(response).get('data')
             else:
                 logger.error(f"Error obteniendo uso: {response.status_code}")
                 return None
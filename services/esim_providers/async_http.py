@@ -0,0 +1,92 @@
+"""
+Cliente HTTP asíncrono compartido para las vistas async de proveedores
+Con httpx reutiliza un AsyncClient (keep-alive) por event loop; sin httpx
+delega en requests dentro de un hilo para no bloquear el loop
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+import logging
+
+import requests
+from asgiref.sync import sync_to_async
+
+from esim_backend.instrumentation import timed
+from esim_backend.metrics import observe_provider_call
+
+try:
+    import httpx
+except ImportError:  # httpx es opcional; sin él se usa requests en un hilo
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+class AsyncHTTP:
+    """Peticiones HTTP awaitables con conexiones reutilizadas"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        # Un AsyncClient solo puede usarse desde el loop que lo creó
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get_client(self):
+        """AsyncClient del event loop actual, o None si httpx no está instalado"""
+        if httpx is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._clients.get(loop)
+                if client is None or client.is_closed:
+                    client = httpx.AsyncClient(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=MAX_CONNECTIONS,
+                            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+                        )
+                    )
+                    self._clients[loop] = client
+        return client
+
+    async def request(self, method: str, url: str, provider: str = 'external', **kwargs):
+        """Respuesta con la interfaz común de requests/httpx (status_code, json(), text)"""
+        kwargs.setdefault('timeout', self.timeout)
+        client = self.get_client()
+        status = 'error'
+        start = time.perf_counter()
+        with timed('provider'):
+            try:
+                if client is not None:
+                    response = await client.request(method, url, **kwargs)
+                else:
+                    response = await sync_to_async(requests.request, thread_sensitive=False)(method, url, **kwargs)
+                status = response.status_code
+                return response
+            finally:
+                observe_provider_call(provider, method, url, status, time.perf_counter() - start)
+
+    async def get(self, url: str, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Cerrar el cliente del loop actual (p.ej. en el shutdown del worker)"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+# Instancia global del cliente HTTP asíncrono
+async_http = AsyncHTTP()
@@ -0,0 +1,41 @@
+"""
+Sesiones HTTP de los servicios de proveedores (una por proveedor)
+Reutilizan conexiones keep-alive entre llamadas y cada petición cuenta como
+tiempo de proveedor en la instrumentación del request y en la métrica
+hablaris_provider_request_seconds
+"""
+
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from esim_backend.instrumentation import timed
+from esim_backend.metrics import observe_provider_call
+
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+
+class ProviderSession(requests.Session):
+    """requests.Session instrumentada y sin cookies (se comparte entre hilos y clientes)"""
+
+    def __init__(self, provider: str):
+        super().__init__()
+        self.provider = provider
+        self.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        status = 'error'
+        start = time.perf_counter()
+        with timed('provider'):
+            try:
+                response = super().request(method, url, *args, **kwargs)
+                status = response.status_code
+                return response
+            finally:
+                observe_provider_call(self.provider, method, url, status, time.perf_counter() - start)
@@ -6,22 +6,42 @@ API Documentation: https://www.1global.com/developers
 import requests
 import logging
 from typing import Dict, List, Optional
-from django.conf import settings
 from django.core.cache import cache
+from esim_backend.json_codec import response_json
+from esim_backend.provider_config import get_provider_config
+from .http_session import ProviderSession
 import hashlib
 import hmac
 import time
 
 logger = logging.getLogger(__name__)
 
+# Instancia global de la sesión HTTP de oneglobal
+provider_session = ProviderSession('oneglobal')
+
 class OneGlobalService:
     """Servicio para integración con 1GLOBAL eSIM Provider"""
     
-    def __init__(self):
-        self.base_url = settings.ONEGLOBAL_BASE_URL
-        self.api_key = settings.ONEGLOBAL_API_KEY
-        self.api_secret = settings.ONEGLOBAL_API_SECRET
-        self.partner_id = settings.ONEGLOBAL_PARTNER_ID
+    @property
+    def config(self):
+        """Configuración actual de 1GLOBAL (registro de proveedores)"""
+        return get_provider_config('oneglobal')
+    
+    @property
+    def base_url(self) -> str:
+        return self.config.get('ONEGLOBAL_BASE_URL', '')
+    
+    @property
+    def api_key(self) -> str:
+        return self.config.get('ONEGLOBAL_API_KEY', '')
+    
+    @property
+    def api_secret(self) -> str:
+        return self.config.get('ONEGLOBAL_API_SECRET', '')
+    
+    @property
+    def partner_id(self) -> str:
+        return self.config.get('ONEGLOBAL_PARTNER_ID', '')
         
     def generate_signature(self, method: str, endpoint: str, payload: str = "") -> str:
         """Generar firma HMAC para autenticación"""
@@ -59,14 +79,14 @@ class OneGlobalService:
                 return cached_data
             
             headers = self.get_headers('GET', endpoint)
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 timeout=30
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = response_json(response)
                 destinations = data.get('destinations', [])
                 
                 # Cache por 6 horas
@@ -97,7 +117,7 @@ class OneGlobalService:
                 return cached_data
             
             headers = self.get_headers('GET', endpoint)
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 params=params,
@@ -105,7 +125,7 @@ class OneGlobalService:
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = response_json(response)
                 products = data.get('products', [])
                 
                 # Procesar y enriquecer datos
@@ -158,13 +178,13 @@ class OneGlobalService:
                 'product_id': product_id,
                 'quantity': quantity,
                 'customer_reference': f'hablaris_{int(time.time())}',
-                'notification_email': customer_email or settings.DEFAULT_NOTIFICATION_EMAIL
+                'notification_email': customer_email or self.config.get('DEFAULT_NOTIFICATION_EMAIL', '')
             }
             
             payload_str = requests.utils.quote(str(payload))
             headers = self.get_headers('POST', endpoint, payload_str)
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 json=payload,
@@ -172,7 +192,7 @@ class OneGlobalService:
             )
             
             if response.status_code == 201:
-                order_data = response.json()
+                order_data = response_json(response)
                 logger.info(f"Orden 1GLOBAL creada: {order_data.get('order_id')}")
                 return order_data
             else:
@@ -189,14 +209,14 @@ class OneGlobalService:
             endpoint = f'/v1/orders/{order_id}'
             headers = self.get_headers('GET', endpoint)
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 timeout=30
             )
             
             if response.status_code == 200:
-                return response.json()
+                return response_json(response)
             else:
                 logger.error(f"Error obteniendo orden: {response.status_code}")
                 return None
@@ -211,14 +231,14 @@ class OneGlobalService:
             endpoint = f'/v1/esims/{esim_id}'
             headers = self.get_headers('GET', endpoint)
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 timeout=30
             )
             
             if response.status_code == 200:
-                esim_data = response.json()
+                esim_data = response_json(response)
                 
                 # Formatear datos para uso interno
                 formatted_data = {
@@ -258,14 +278,14 @@ class OneGlobalService:
             endpoint = f'/v1/esims/{esim_id}/usage'
             headers = self.get_headers('GET', endpoint)
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 timeout=30
             )
             
             if response.status_code == 200:
-                usage_data = response.json()
+                usage_data = response_json(response)
                 
                 # Procesar estadísticas
                 processed_usage = {
@@ -310,7 +330,7 @@ class OneGlobalService:
             endpoint = f'/v1/esims/{esim_id}/suspend'
             headers = self.get_headers('POST', endpoint)
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 timeout=30
@@ -328,7 +348,7 @@ class OneGlobalService:
             endpoint = f'/v1/esims/{esim_id}/reactivate'
             headers = self.get_headers('POST', endpoint)
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
                 timeout=30
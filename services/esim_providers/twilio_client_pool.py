@@ -0,0 +1,151 @@
+"""
+Pool de clientes del SDK de Twilio a nivel de proceso
+Reutiliza el cliente (y su sesión HTTP keep-alive) entre requests y cachea la
+Fleet de Super SIM ya resuelta para no consultarla en cada creación de SIM
+"""
+
+import contextvars
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from esim_backend.instrumentation import timed
+from esim_backend.metrics import observe_provider_call
+
+try:
+    from twilio.http.http_client import TwilioHttpClient
+    from twilio.rest import Client
+except ImportError:  # El SDK es opcional; las vistas informan si falta
+    Client = None
+    TwilioHttpClient = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLEET_NAME = 'hablaris_fleet'
+DEFAULT_FLEET_DATA_LIMIT = 1073741824  # 1GB en bytes
+DEFAULT_REQUEST_TIMEOUT = 10  # segundos por llamada HTTP a Twilio
+
+
+if TwilioHttpClient is not None:
+    class TimedTwilioHttpClient(TwilioHttpClient):
+        """Cliente HTTP del SDK que cuenta como tiempo de proveedor"""
+
+        def request(self, method, url, *args, **kwargs):
+            status = 'error'
+            start = time.perf_counter()
+            with timed('provider'):
+                try:
+                    response = super().request(method, url, *args, **kwargs)
+                    status = response.status_code
+                    return response
+                finally:
+                    observe_provider_call('twilio', method, url, status, time.perf_counter() - start)
+
+
+class TwilioClientPool:
+    """Clientes Twilio reutilizables y cache de Fleets resueltas"""
+
+    def __init__(self, max_workers: int = 8):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Tuple[str, object]] = {}
+        self._fleets: Dict[str, str] = {}
+        # Un lock por cuenta: resolver una Fleet (llamadas a Twilio) no bloquea
+        # get_client ni las demás cuentas
+        self._fleet_locks: Dict[str, threading.Lock] = {}
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def get_client(self, account_sid: str, auth_token: str):
+        """Cliente Twilio compartido para estas credenciales"""
+        if Client is None:
+            raise ImportError('twilio no está instalado')
+
+        entry = self._clients.get(account_sid)
+        if entry and entry[0] == auth_token:
+            return entry[1]
+
+        with self._lock:
+            entry = self._clients.get(account_sid)
+            if entry and entry[0] == auth_token:
+                return entry[1]
+
+            # Credenciales nuevas o rotadas: reemplazar cliente y Fleet cacheada
+            client = Client(account_sid, auth_token, http_client=TimedTwilioHttpClient(timeout=self.request_timeout))
+            self._clients[account_sid] = (auth_token, client)
+            self._fleets.pop(account_sid, None)
+            return client
+
+    def resolve_fleet(self, client, account_sid: str, configured_fleet_sid: str = '') -> str:
+        """SID de la Fleet a usar: configurada, cacheada, existente o nueva"""
+        if configured_fleet_sid:
+            return configured_fleet_sid
+
+        fleet_sid = self._fleets.get(account_sid)
+        if fleet_sid:
+            return fleet_sid
+
+        with self._fleet_lock(account_sid):
+            fleet_sid = self._fleets.get(account_sid)
+            if fleet_sid:
+                return fleet_sid
+
+            fleets = client.supersim.v1.fleets.list(limit=1)
+            if fleets:
+                fleet_sid = fleets[0].sid
+                logger.info(f"Usando fleet existente: {fleet_sid}")
+            else:
+                fleet = client.supersim.v1.fleets.create(
+                    unique_name=DEFAULT_FLEET_NAME,
+                    data_enabled=True,
+                    data_limit=DEFAULT_FLEET_DATA_LIMIT
+                )
+                fleet_sid = fleet.sid
+                logger.info(f"Fleet creada: {fleet_sid}")
+
+            with self._lock:
+                self._fleets[account_sid] = fleet_sid
+            return fleet_sid
+
+    def _fleet_lock(self, account_sid: str) -> threading.Lock:
+        with self._lock:
+            return self._fleet_locks.setdefault(account_sid, threading.Lock())
+
+    def invalidate_fleet(self, account_sid: str) -> None:
+        """Olvidar la Fleet cacheada (p.ej. si Twilio la rechaza)"""
+        with self._lock:
+            self._fleets.pop(account_sid, None)
+
+    @property
+    def request_timeout(self) -> float:
+        """Límite de cada llamada al SDK (y de la espera de sus futures)"""
+        return float(getattr(settings, 'TWILIO_REQUEST_TIMEOUT', DEFAULT_REQUEST_TIMEOUT))
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Pool de hilos acotado para llamadas concurrentes al SDK"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers,
+                        thread_name_prefix='twilio'
+                    )
+        return self._executor
+
+    def submit(self, func, *args) -> Future:
+        """executor.submit conservando el contexto (instrumentación del request)"""
+        return self.executor.submit(contextvars.copy_context().run, func, *args)
+
+    def clear(self) -> None:
+        """Vaciar clientes y Fleets cacheadas"""
+        with self._lock:
+            self._clients.clear()
+            self._fleets.clear()
+
+
+# Instancia global del pool
+twilio_client_pool = TwilioClientPool()
@@ -4,27 +4,47 @@ Documentación: https://www.twilio.com/docs/iot/supersim
 Ideal para testing y MVP de Hablaris
 """
 
-import requests
 import logging
 from typing import Dict, List, Optional
-from django.conf import settings
 from django.core.cache import cache
+from esim_backend.json_codec import response_json
+from esim_backend.provider_config import get_provider_config
+from .http_session import ProviderSession
 import base64
 
 logger = logging.getLogger(__name__)
 
+# Instancia global de la sesión HTTP de twilio
+provider_session = ProviderSession('twilio')
+
 class TwilioSuperSimService:
     """Servicio para integración con Twilio Super SIM"""
     
     def __init__(self):
-        self.account_sid = settings.TWILIO_ACCOUNT_SID
-        self.auth_token = settings.TWILIO_AUTH_TOKEN
-        self.fleet_sid = settings.TWILIO_SUPERSIM_FLEET_SID
         self.base_url = f"https://supersim.twilio.com/v1"
-        
-        # Crear credenciales base64 para auth
+    
+    @property
+    def config(self):
+        """Configuración actual de Twilio (registro de proveedores)"""
+        return get_provider_config('twilio')
+    
+    @property
+    def account_sid(self) -> str:
+        return self.config.get('TWILIO_ACCOUNT_SID', '')
+    
+    @property
+    def auth_token(self) -> str:
+        return self.config.get('TWILIO_AUTH_TOKEN', '')
+    
+    @property
+    def fleet_sid(self) -> str:
+        return self.config.get('TWILIO_SUPERSIM_FLEET_SID', '')
+    
+    @property
+    def auth_header(self) -> str:
+        """Credenciales base64 para auth"""
         credentials = f"{self.account_sid}:{self.auth_token}"
-        self.auth_header = base64.b64encode(credentials.encode()).decode()
+        return base64.b64encode(credentials.encode()).decode()
     
     def get_headers(self) -> Dict[str, str]:
         """Headers para requests autenticados"""
@@ -43,14 +63,14 @@ class TwilioSuperSimService:
             if cached_plans:
                 return cached_plans
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/RatePlans",
                 headers=self.get_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = response_json(response)
                 plans = data.get('rate_plans', [])
                 
                 # Procesar y formatear planes
@@ -96,7 +116,7 @@ class TwilioSuperSimService:
             if rate_plan_sid:
                 data['RatePlan'] = rate_plan_sid
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}/Sims",
                 headers=self.get_headers(),
                 data=data,
@@ -104,7 +124,7 @@ class TwilioSuperSimService:
             )
             
             if response.status_code == 201:
-                sim_data = response.json()
+                sim_data = response_json(response)
                 
                 # Formatear respuesta para uso interno
                 formatted_sim = {
@@ -135,14 +155,14 @@ class TwilioSuperSimService:
     def get_sim_details(self, sim_sid: str) -> Optional[Dict]:
         """Obtener detalles de una SIM específica"""
         try:
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/Sims/{sim_sid}",
                 headers=self.get_headers(),
                 timeout=30
             )
             
             if response.status_code == 200:
-                sim_data = response.json()
+                sim_data = response_json(response)
                 
                 # Obtener información adicional
                 usage_data = self.get_sim_usage(sim_sid)
@@ -185,7 +205,7 @@ class TwilioSuperSimService:
                 'Granularity': granularity  # hour, day, all
             }
             
-            response = requests.get(
+            response = provider_session.get(
                 f"{self.base_url}/Sims/{sim_sid}/UsageRecords",
                 headers=self.get_headers(),
                 params=params,
@@ -193,7 +213,7 @@ class TwilioSuperSimService:
             )
             
             if response.status_code == 200:
-                usage_data = response.json()
+                usage_data = response_json(response)
                 usage_records = usage_data.get('usage_records', [])
                 
                 # Procesar datos de uso
@@ -243,7 +263,7 @@ class TwilioSuperSimService:
                 'Status': status
             }
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}/Sims/{sim_sid}",
                 headers=self.get_headers(),
                 data=data,
@@ -271,7 +291,7 @@ class TwilioSuperSimService:
             if from_number:
                 data['From'] = from_number
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}/Sims/{sim_sid}/SmsMessages",
                 headers=self.get_headers(),
                 data=data,
@@ -331,7 +351,7 @@ class TwilioSuperSimService:
             if international_roaming:
                 data['InternationalRoaming'] = international_roaming
             
-            response = requests.post(
+            response = provider_session.post(
                 f"{self.base_url}/RatePlans",
                 headers=self.get_headers(),
                 data=data,
@@ -339,7 +359,7 @@ class TwilioSuperSimService:
             )
             
             if response.status_code == 201:
-                plan_data = response.json()
+                plan_data = response_json(response)
                 logger.info(f"Plan Twilio creado: {plan_data.get('sid')}")
                 return plan_data
             else: